@@ -1,6 +1,7 @@
 import logging
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant
 from homeassistant.helpers import config_validation as cv
 import voluptuous as vol
 
@@ -9,9 +10,26 @@ from .const import (
     DEFAULT_SCAN_INTERVAL,
     CONF_PRINTING_SCAN_INTERVAL,
     DEFAULT_PRINTING_SCAN_INTERVAL,
+    CONF_CONCURRENT_PROBES,
+    DEFAULT_CONCURRENT_PROBES,
+    CONF_TIMELAPSE,
+    DEFAULT_TIMELAPSE,
+    CONF_TIMELAPSE_INTERVAL,
+    DEFAULT_TIMELAPSE_INTERVAL,
     SERVICE_MOVE_RELATIVE,
+    SERVICE_STREAM_GCODE,
+    SERVICE_UPLOAD_FILE,
+    SERVICE_ANALYZE_GCODE,
+    ATTR_MD5,
+    ATTR_SCRIPT,
+    ATTR_WINDOW,
+    ATTR_STOP_ON_ERROR,
+    GCODE_STREAM_WINDOW,
+    GCODE_STREAM_MAX_WINDOW,
 )
 from .coordinator import FlashforgeDataUpdateCoordinator
+from .file_upload import UPLOAD_EXTENSIONS, UPLOAD_PRINTER_ROOT, upload_file_name
+from .gcode_stream import iter_file, iter_script
 from homeassistant.core import ServiceCall # For type hinting
 
 _LOGGER = logging.getLogger(__name__)
@@ -55,6 +73,13 @@ SERVICE_RESTORE_FACTORY_SETTINGS = "restore_factory_settings" # Existing
 
 # Platforms
 PLATFORMS = ["sensor", "camera", "binary_sensor", "number", "select", "button"]
+try:
+    # The image platform (print preview) needs Home Assistant 2023.7 or later.
+    from homeassistant.components.image import ImageEntity  # noqa: F401
+except ImportError:
+    _LOGGER.debug("Image entities are not supported by this Home Assistant version")
+else:
+    PLATFORMS.append("image")
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
@@ -88,17 +113,41 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         entry.data.get(CONF_PRINTING_SCAN_INTERVAL, DEFAULT_PRINTING_SCAN_INTERVAL)
     )
 
+    # One connection per TCP probe, run concurrently (for firmware without pipelining)
+    concurrent_probes = entry.options.get(
+        CONF_CONCURRENT_PROBES, DEFAULT_CONCURRENT_PROBES
+    )
+
+    # Timelapse recording of prints; an interval of 0 takes one frame per layer
+    timelapse = entry.options.get(CONF_TIMELAPSE, DEFAULT_TIMELAPSE)
+    timelapse_interval = entry.options.get(
+        CONF_TIMELAPSE_INTERVAL, DEFAULT_TIMELAPSE_INTERVAL
+    )
+
     coordinator = FlashforgeDataUpdateCoordinator(
         hass,
         host=host,
         serial_number=serial_number,
         check_code=check_code,
         regular_scan_interval=scan_interval, # Pass as regular_scan_interval
-        printing_scan_interval=printing_scan_interval # Pass new printing_scan_interval
+        printing_scan_interval=printing_scan_interval, # Pass new printing_scan_interval
+        concurrent_probes=concurrent_probes,
+        timelapse=timelapse,
+        timelapse_interval=timelapse_interval,
     )
 
     await coordinator.async_refresh()
 
+    if coordinator.timelapse is not None:
+        # Entries are not unloaded when Home Assistant stops; finish a running
+        # recording so that its index is written.
+        async def async_finish_timelapse(event: Event) -> None:
+            await coordinator.timelapse.async_close()
+
+        entry.async_on_unload(
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_finish_timelapse)
+        )
+
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
@@ -311,6 +360,89 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _LOGGER.info(f"Service '{SERVICE_MOVE_RELATIVE}' called with offsets: x={x}, y={y}, z={z}, feedrate={feedrate}")
         await coordinator.move_relative(x=x, y=y, z=z, feedrate=feedrate)
 
+    SERVICE_STREAM_GCODE_SCHEMA = vol.All(
+        vol.Schema(
+            {
+                vol.Exclusive(ATTR_SCRIPT, "source"): cv.string,
+                vol.Exclusive(ATTR_FILE_PATH, "source"): cv.string,
+                vol.Optional(ATTR_WINDOW, default=GCODE_STREAM_WINDOW): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=GCODE_STREAM_MAX_WINDOW)
+                ),
+                vol.Optional(ATTR_STOP_ON_ERROR, default=True): cv.boolean,
+            }
+        ),
+        cv.has_at_least_one_key(ATTR_SCRIPT, ATTR_FILE_PATH),
+    )
+    async def handle_stream_gcode(call: ServiceCall) -> None:
+        """Handle the stream_gcode service call (a script or a local file)."""
+        coordinator: FlashforgeDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+        file_path = call.data.get(ATTR_FILE_PATH)
+        if file_path is not None:
+            if not hass.config.is_allowed_path(file_path):
+                _LOGGER.error(
+                    f"Service '{SERVICE_STREAM_GCODE}': {file_path} is not in an allowed directory "
+                    "(see allowlist_external_dirs)."
+                )
+                return
+            lines = iter_file(hass.async_add_executor_job, file_path)
+            source = file_path
+        else:
+            lines = iter_script(call.data[ATTR_SCRIPT])
+            source = "script"
+        _LOGGER.info(f"Service '{SERVICE_STREAM_GCODE}' called for {source}.")
+        # Failed lines and read errors are logged and kept in the diagnostics.
+        await coordinator.stream_gcode(
+            lines, source, call.data[ATTR_WINDOW], call.data[ATTR_STOP_ON_ERROR]
+        )
+
+    SERVICE_UPLOAD_FILE_SCHEMA = vol.Schema(
+        {
+            vol.Required(ATTR_FILE_PATH): cv.string,
+            vol.Optional(ATTR_MD5): vol.Match(r"^[0-9a-fA-F]{32}$"),
+        }
+    )
+    async def handle_upload_file(call: ServiceCall) -> None:
+        """Handle the upload_file service call (a local .gcode/.gx file)."""
+        coordinator: FlashforgeDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+        file_path = call.data[ATTR_FILE_PATH]
+        if not hass.config.is_allowed_path(file_path):
+            _LOGGER.error(
+                f"Service '{SERVICE_UPLOAD_FILE}': {file_path} is not in an allowed directory "
+                "(see allowlist_external_dirs)."
+            )
+            return
+        if not file_path.lower().endswith(UPLOAD_EXTENSIONS):
+            _LOGGER.error(
+                f"Service '{SERVICE_UPLOAD_FILE}': {file_path} is not a printable file "
+                f"({', '.join(UPLOAD_EXTENSIONS)})."
+            )
+            return
+        _LOGGER.info(f"Service '{SERVICE_UPLOAD_FILE}' called for {file_path}.")
+        # Progress is shown by the upload sensors; the outcome is logged.
+        await coordinator.upload_file(file_path, call.data.get(ATTR_MD5))
+
+    async def handle_analyze_gcode(call: ServiceCall) -> None:
+        """Handle the analyze_gcode service call (a local .gcode/.gx file)."""
+        coordinator: FlashforgeDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+        file_path = call.data[ATTR_FILE_PATH]
+        if not hass.config.is_allowed_path(file_path):
+            _LOGGER.error(
+                f"Service '{SERVICE_ANALYZE_GCODE}': {file_path} is not in an allowed directory "
+                "(see allowlist_external_dirs)."
+            )
+            return
+        if not file_path.lower().endswith(UPLOAD_EXTENSIONS):
+            _LOGGER.error(
+                f"Service '{SERVICE_ANALYZE_GCODE}': {file_path} is not a printable file "
+                f"({', '.join(UPLOAD_EXTENSIONS)})."
+            )
+            return
+        _LOGGER.info(f"Service '{SERVICE_ANALYZE_GCODE}' called for {file_path}.")
+        # Shown for the printer file of the same name, as if it was uploaded from here.
+        await coordinator.analyze_gcode(
+            file_path, f"{UPLOAD_PRINTER_ROOT}{upload_file_name(file_path)}"
+        )
+
     # Register all services
     hass.services.async_register(DOMAIN, SERVICE_PAUSE_PRINT, handle_pause_print)
     hass.services.async_register(
@@ -418,6 +550,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.services.async_register(DOMAIN, SERVICE_START_BED_LEVELING, handle_start_bed_leveling)
     hass.services.async_register(DOMAIN, SERVICE_READ_SETTINGS_FROM_EEPROM, handle_read_settings_from_eeprom)
     hass.services.async_register(DOMAIN, SERVICE_MOVE_RELATIVE, handle_move_relative, schema=SERVICE_MOVE_RELATIVE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_STREAM_GCODE, handle_stream_gcode, schema=SERVICE_STREAM_GCODE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_UPLOAD_FILE, handle_upload_file, schema=SERVICE_UPLOAD_FILE_SCHEMA)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ANALYZE_GCODE,
+        handle_analyze_gcode,
+        schema=vol.Schema({vol.Required(ATTR_FILE_PATH): cv.string}),
+    )
 
     return True
 
@@ -434,7 +574,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: FlashforgeDataUpdateCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_close()
         if not hass.data[DOMAIN]:  # If this was the last entry for this domain
             _LOGGER.info(
                 "Last entry for domain %s unloaded; unregistering services.", DOMAIN
@@ -458,6 +599,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 SERVICE_START_BED_LEVELING,
                 SERVICE_READ_SETTINGS_FROM_EEPROM,
                 SERVICE_MOVE_RELATIVE,
+                SERVICE_STREAM_GCODE,
+                SERVICE_UPLOAD_FILE,
+                SERVICE_ANALYZE_GCODE,
             ]
             for service_name in all_service_names:
                 if service_name:
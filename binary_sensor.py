@@ -64,12 +64,24 @@ from .const import (
     API_ATTR_BED_LEVELING_STATUS,
     NAME_BED_LEVELING,
     ICON_BED_LEVELING,
+    API_ATTR_DETAIL,
+    DATA_KEY_CONNECTION_STATE,
 )
 from .coordinator import FlashforgeDataUpdateCoordinator
 from .entity import FlashforgeEntity
 
 _LOGGER = logging.getLogger(__name__)
 
+# Print job details exposed as attributes of the printing sensor
+PRINT_JOB_ATTRIBUTES = (
+    API_ATTR_PRINT_FILE_NAME,
+    API_ATTR_PRINT_PROGRESS,
+    API_ATTR_PRINT_LAYER,
+    API_ATTR_TARGET_PRINT_LAYER,
+    API_ATTR_PRINT_DURATION,
+    API_ATTR_ESTIMATED_TIME,
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: Callable
@@ -269,6 +281,29 @@ class FlashforgeBinarySensor(FlashforgeEntity, BinarySensorEntity):
         self._connection_status_sensor = connection_status_sensor
         self._error_sensor = error_sensor
         self._is_top_level = is_top_level
+        self._data_keys = self._watched_data_keys()
+
+    def _watched_data_keys(self) -> frozenset:
+        """Return the coordinator data keys that is_on and the attributes read."""
+        if self._connection_status_sensor:
+            return frozenset({DATA_KEY_CONNECTION_STATE})
+        if self._is_printing_sensor:
+            return frozenset(
+                f"{API_ATTR_DETAIL}.{key}"
+                for key in (API_ATTR_STATUS, *PRINT_JOB_ATTRIBUTES)
+            )
+        if self._error_sensor:
+            return frozenset(
+                {
+                    f"{API_ATTR_DETAIL}.{API_ATTR_ERROR_CODE}",
+                    f"{API_ATTR_DETAIL}.{API_ATTR_STATUS}",
+                }
+            )
+        if self._detail_attribute:
+            if self._is_top_level:
+                return frozenset({self._detail_attribute})
+            return frozenset({f"{API_ATTR_DETAIL}.{self._detail_attribute}"})
+        return frozenset()
 
     @property
     def is_on(self) -> bool:
@@ -374,16 +409,7 @@ class FlashforgeBinarySensor(FlashforgeEntity, BinarySensorEntity):
 
         # Add print job details for printing sensor
         if self._is_printing_sensor and self.is_on:
-            # Define which attributes to include
-            print_job_attrs = [
-                API_ATTR_PRINT_FILE_NAME,
-                API_ATTR_PRINT_PROGRESS,
-                API_ATTR_PRINT_LAYER,
-                API_ATTR_TARGET_PRINT_LAYER,
-                API_ATTR_PRINT_DURATION,
-                API_ATTR_ESTIMATED_TIME,
-            ]
-            for attr_key in print_job_attrs:
+            for attr_key in PRINT_JOB_ATTRIBUTES:
                 if attr_key in detail:
                     # Convert printProgress to percentage
                     if (
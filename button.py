@@ -77,6 +77,9 @@ async def async_setup_entry(
 class FlashforgeButtonEntity(FlashforgeEntity, ButtonEntity):
     """Base class for Flashforge button entities."""
 
+    # Buttons show no coordinator data; only availability changes are written.
+    _data_keys = frozenset()
+
     def __init__(
         self,
         coordinator: FlashforgeDataUpdateCoordinator,
@@ -1,7 +1,12 @@
 import logging
+from collections import OrderedDict
 from typing import Callable
 
+from aiohttp import web
+
 from homeassistant import config_entries, core
+from homeassistant.components.camera import Image
+from homeassistant.components.camera.img_util import scale_jpeg_camera_image
 from homeassistant.components.mjpeg.camera import MjpegCamera
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
@@ -11,9 +16,12 @@ from .const import (
     API_ATTR_IP_ADDR,
     API_ATTR_FIRMWARE_VERSION,
     API_ATTR_MODEL,
-    MJPEG_DEFAULT_PORT,
-    MJPEG_STREAM_PATH,
     MJPEG_DUMMY_URL,
+    MJPEG_FRAME_TIMEOUT,
+    MJPEG_SNAPSHOT_MAX_AGE,
+    MJPEG_SNAPSHOT_TIMEOUT,
+    MJPEG_SNAPSHOT_KEEP_ALIVE,
+    MJPEG_SCALED_SNAPSHOT_CACHE_SIZE,
 )
 from .coordinator import FlashforgeDataUpdateCoordinator
 
@@ -55,28 +63,14 @@ class FlashforgeAdventurer5MCamera(CoordinatorEntity, MjpegCamera):
         name = "Flashforge Adventurer 5M PRO Camera"
 
         # Determine initial stream URL
-        initial_mjpeg_url = None
-        camera_stream_url_from_api = detail.get(API_ATTR_CAMERA_STREAM_URL)
-        ip_addr_from_api = detail.get(API_ATTR_IP_ADDR)
-
-        if camera_stream_url_from_api:
-            initial_mjpeg_url = camera_stream_url_from_api
-            _LOGGER.debug("Using 'cameraStreamUrl' from API: %s", initial_mjpeg_url)
-        elif ip_addr_from_api:
-            initial_mjpeg_url = (
-                f"http://{ip_addr_from_api}:{MJPEG_DEFAULT_PORT}{MJPEG_STREAM_PATH}"
-            )
-            _LOGGER.debug(
-                "'cameraStreamUrl' missing, using fallback URL constructed from ipAddr: %s",
-                initial_mjpeg_url,
-            )
-        else:
+        initial_mjpeg_url = coordinator.camera_stream_url
+        if initial_mjpeg_url is None:
             _LOGGER.warning(
                 "Coordinator does not have '%s' or '%s' in detail data. Camera will be unavailable initially.",
                 API_ATTR_CAMERA_STREAM_URL,
                 API_ATTR_IP_ADDR,
             )
-            # MjpegCamera will be initialized with mjpeg_url=None
+            # MjpegCamera will be initialized with the dummy URL
 
         MjpegCamera.__init__(
             self,
@@ -86,6 +80,10 @@ class FlashforgeAdventurer5MCamera(CoordinatorEntity, MjpegCamera):
         )
         self._attr_unique_id = f"flashforge_{serial_number}_camera"
         self._attr_is_streaming = True
+        # (width, height) -> (frame sequence number, scaled JPEG)
+        self._scaled_snapshots: OrderedDict[tuple[int, int], tuple[int, bytes]] = (
+            OrderedDict()
+        )
 
         # CRITICAL: Assign device_info, do NOT return it
         self._attr_device_info = {
@@ -101,37 +99,77 @@ class FlashforgeAdventurer5MCamera(CoordinatorEntity, MjpegCamera):
         }
 
     @property
-    def stream_source(self) -> str | None:
-        """Return the camera stream URL for Home Assistant."""
-        # This property is called by MjpegCamera base class logic.
-        # It should return a valid URL if available, or None/dummy if not.
-        # The _mjpeg_url attribute of the MjpegCamera class is what's actively used.
-        # This property effectively tells the base class what the *current* best source is.
-        detail = (
-            self.coordinator.data.get("detail", {}) if self.coordinator.data else {}
-        )
-        camera_stream_url_from_api = detail.get(API_ATTR_CAMERA_STREAM_URL)
-        ip_addr_from_api = detail.get(API_ATTR_IP_ADDR)
-
-        if camera_stream_url_from_api:
-            return camera_stream_url_from_api
-        elif ip_addr_from_api:
-            fallback_url = (
-                f"http://{ip_addr_from_api}:{MJPEG_DEFAULT_PORT}{MJPEG_STREAM_PATH}"
-            )
-            _LOGGER.debug(
-                "No '%s' in API, using fallback URL: %s",
-                API_ATTR_CAMERA_STREAM_URL,
-                fallback_url,
-            )
-            return fallback_url
-        else:
+    def _upstream_url(self) -> str:
+        """Return the printer's camera stream URL, or the dummy URL if unknown."""
+        # The URL logic lives in the coordinator, which also feeds the shared
+        # camera connection (see mjpeg_proxy.py). It is only used to decide
+        # whether the camera is available; viewers never connect to it.
+        url = self.coordinator.camera_stream_url
+        if url is None:
             _LOGGER.debug(
-                "No '%s' or '%s' in API data for stream_source. Returning dummy URL.",
+                "No '%s' or '%s' in API data for the camera. Using dummy URL.",
                 API_ATTR_CAMERA_STREAM_URL,
                 API_ATTR_IP_ADDR,
             )
             return MJPEG_DUMMY_URL  # Indicates no valid current source
+        return url
+
+    async def stream_source(self) -> str | None:
+        """Return None so that Home Assistant does not open its own stream.
+
+        Given the printer's URL, the stream component would connect to the
+        camera directly, bypassing the shared connection. Viewers get the
+        MJPEG stream from handle_async_mjpeg_stream instead.
+        """
+        return None
+
+    async def handle_async_mjpeg_stream(
+        self, request: web.Request
+    ) -> web.StreamResponse | None:
+        """Serve the stream from the shared camera connection.
+
+        The printer's camera server only handles a few clients, so viewers do
+        not connect to it themselves.
+        """
+        if not self.available:
+            return None
+        return await self.coordinator.camera_proxy.async_handle_stream(
+            request, MJPEG_FRAME_TIMEOUT
+        )
+
+    async def async_camera_image(
+        self, width: int | None = None, height: int | None = None
+    ) -> bytes | None:
+        """Return the newest frame of the shared camera connection.
+
+        Dashboard tiles and notifications ask for snapshots every few seconds;
+        they are served from memory instead of opening a stream each time.
+        Scaled copies are kept per requested size until the next frame.
+        """
+        if not self.available:
+            return None
+        snapshot = await self.coordinator.camera_proxy.async_snapshot(
+            MJPEG_SNAPSHOT_MAX_AGE, MJPEG_SNAPSHOT_TIMEOUT, MJPEG_SNAPSHOT_KEEP_ALIVE
+        )
+        if snapshot is None:
+            return None
+        sequence, image = snapshot
+        # Home Assistant only scales JPEGs when both sizes are given.
+        if width is None or height is None:
+            return image
+        size = (width, height)
+        cached = self._scaled_snapshots.get(size)
+        if cached is not None and cached[0] == sequence:
+            self._scaled_snapshots.move_to_end(size)
+            return cached[1]
+        scaled = await self.hass.async_add_executor_job(
+            scale_jpeg_camera_image, Image("image/jpeg", image), width, height
+        )
+        self._scaled_snapshots[size] = (sequence, scaled)
+        self._scaled_snapshots.move_to_end(size)
+        while len(self._scaled_snapshots) > MJPEG_SCALED_SNAPSHOT_CACHE_SIZE:
+            self._scaled_snapshots.popitem(last=False)
+        return scaled
 
     @property
     def available(self) -> bool:
@@ -156,7 +194,7 @@ class FlashforgeAdventurer5MCamera(CoordinatorEntity, MjpegCamera):
     def _handle_coordinator_update(self) -> None:
         """Update stream URL and device info if coordinator data changes."""
         # Get the current best stream source based on coordinator data
-        new_url_candidate = self.stream_source
+        new_url_candidate = self._upstream_url
 
         # If the new candidate is the dummy URL, it means no valid source is currently available.
         # In this case, we might want to set _mjpeg_url to None or the dummy URL
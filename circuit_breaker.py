@@ -0,0 +1,104 @@
+"""Circuit breaker for polling a printer that may be switched off.
+
+While the printer answers, the breaker is closed and the coordinator polls
+normally. After a number of consecutive failed polls it opens: full polls
+(with their retries, backoff and timeouts) stop, and the coordinator only
+checks whether a TCP connection can be made, at an interval that grows while
+the printer stays unreachable. When that check succeeds the breaker is
+half-open and one full poll is tried; success closes the breaker again,
+failure re-opens it.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Optional
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Tracks consecutive poll failures and the probe interval while open."""
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        probe_interval: float,
+        max_probe_interval: float,
+        backoff_factor: float,
+    ) -> None:
+        """Initialize a closed breaker."""
+        self._failure_threshold = failure_threshold
+        self._initial_probe_interval = probe_interval
+        self._max_probe_interval = max_probe_interval
+        self._backoff_factor = backoff_factor
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.probe_interval = probe_interval
+        self.opened_at: Optional[float] = None
+        self.open_count = 0
+        self.failed_probe_count = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while full polls are suspended."""
+        return self.state == STATE_OPEN
+
+    @property
+    def is_half_open(self) -> bool:
+        """Return True while one trial poll decides whether to close."""
+        return self.state == STATE_HALF_OPEN
+
+    def record_success(self) -> bool:
+        """Record a successful poll. Returns True if this closed the breaker."""
+        was_closed = self.state == STATE_CLOSED
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.probe_interval = self._initial_probe_interval
+        self.opened_at = None
+        return not was_closed
+
+    def record_failure(self) -> bool:
+        """
+        Record a failed poll or probe. Returns True if this opened the breaker.
+
+        While open or half-open every failure lengthens the probe interval.
+        """
+        self.consecutive_failures += 1
+        if self.state == STATE_CLOSED:
+            if self.consecutive_failures < self._failure_threshold:
+                return False
+            self.state = STATE_OPEN
+            self.probe_interval = self._initial_probe_interval
+            self.opened_at = time.monotonic()
+            self.open_count += 1
+            return True
+
+        self.state = STATE_OPEN
+        self.failed_probe_count += 1
+        self.probe_interval = min(
+            self._max_probe_interval, self.probe_interval * self._backoff_factor
+        )
+        return False
+
+    def attempt_reset(self) -> None:
+        """Allow one trial poll after a successful probe."""
+        if self.state == STATE_OPEN:
+            self.state = STATE_HALF_OPEN
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot for diagnostics."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "probe_interval_seconds": self.probe_interval,
+            "open_for_seconds": (
+                round(time.monotonic() - self.opened_at, 1)
+                if self.opened_at is not None
+                else None
+            ),
+            "open_count": self.open_count,
+            "failed_probe_count": self.failed_probe_count,
+        }
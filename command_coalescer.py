@@ -0,0 +1,135 @@
+"""Coalescing of rapidly repeated setpoint and motion commands.
+
+Dragging a temperature or fan slider, or clicking a jog button repeatedly,
+issues a burst of commands of which only the net effect matters. While one
+command of a kind is queued for the printer's M-code connection (see
+command_scheduler.py), further commands of the same kind are folded into
+it instead of being queued behind it:
+
+- setpoints (M104, M140, M106/M107) keep only the latest value;
+- moves are merged: relative jog offsets are added up, absolute targets are
+  updated per axis. Moves that cannot be merged (a jog after an absolute
+  move) are queued separately, in order.
+
+The pending command is rendered, as a macro (see macros.py), only when it is
+its turn, and every caller whose request was folded into it gets its
+result. Commands already on the wire are never changed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from .command_scheduler import PRIORITY_INTERACTIVE, CommandScheduler
+from .macros import Macro
+from .metrics import (
+    COUNTER_COALESCED_DROPPED,
+    COUNTER_COALESCED_MERGED,
+    PollMetrics,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Renders a pending value as the macro to send
+Renderer = Callable[[Any], Macro]
+# Combines a pending value with a newer one; None if they cannot be combined
+Merger = Callable[[Any, Any], Optional[Any]]
+
+
+@dataclass
+class _PendingCommand:
+    """A queued command of one kind, still open for newer values."""
+
+    value: Any
+    render: Renderer
+    task: Optional[asyncio.Task] = None
+
+
+class CommandCoalescer:
+    """Folds bursts of commands of the same kind into one queued command per kind."""
+
+    def __init__(self, scheduler: CommandScheduler, metrics: PollMetrics) -> None:
+        """Initialize a coalescer sending through the given scheduler."""
+        self._scheduler = scheduler
+        self._metrics = metrics
+        # Kind -> the command of that kind still waiting for its turn
+        self._pending: dict[str, _PendingCommand] = {}
+
+    async def submit(
+        self,
+        key: str,
+        value: Any,
+        render: Renderer,
+        merge: Optional[Merger] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> bool:
+        """
+        Queues a command of kind ``key``, or folds it into the queued one.
+
+        Without ``merge`` the newer value replaces the queued one (the older
+        command is dropped). With ``merge`` both values are combined; if it
+        returns None the command is queued on its own behind the other one.
+
+        Returns True if the command that was finally sent succeeded.
+        """
+        pending = self._pending.get(key)
+        if pending is not None:
+            if merge is None:
+                pending.value = value
+                pending.render = render
+                self._metrics.increment(f"{COUNTER_COALESCED_DROPPED}.{key}")
+                return await asyncio.shield(pending.task)
+            merged = merge(pending.value, value)
+            if merged is not None:
+                pending.value = merged
+                self._metrics.increment(f"{COUNTER_COALESCED_MERGED}.{key}")
+                return await asyncio.shield(pending.task)
+
+        pending = _PendingCommand(value, render)
+        self._pending[key] = pending
+        # The send runs as its own task, so cancelling one caller does not
+        # take the commands of the others that were folded into it.
+        pending.task = asyncio.ensure_future(self._send(key, pending, priority))
+        return await asyncio.shield(pending.task)
+
+    async def _send(self, key: str, pending: _PendingCommand, priority: int) -> bool:
+        action = key
+
+        def build() -> Macro:
+            nonlocal action
+            # From here on the command is fixed; newer values start a new one.
+            if self._pending.get(key) is pending:
+                del self._pending[key]
+            macro = pending.render(pending.value)
+            action = macro.name
+            _LOGGER.info(
+                f"Attempting to {action} using TCP command(s): {[c.strip() for c in macro.steps + macro.rollback]}"
+            )
+            return macro
+
+        try:
+            result = await self._scheduler.run_macro(build, priority)
+        except Exception as e:
+            _LOGGER.error(f"Exception during {action} TCP command: {e}", exc_info=True)
+            return False
+        finally:
+            if self._pending.get(key) is pending:
+                del self._pending[key]
+
+        if result.success:
+            _LOGGER.info(
+                f"Successfully sent {action} command. Response: {result.response or 'N/A'}"
+            )
+            return True
+        _LOGGER.error(
+            f"Failed to send {action} command (failed step: {result.failed_step}). "
+            f"Response/Error: {result.response or 'N/A'}"
+        )
+        return False
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot for diagnostics."""
+        return {"pending": sorted(self._pending)}
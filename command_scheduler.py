@@ -0,0 +1,236 @@
+"""Priority scheduling of M-code exchanges for one printer.
+
+The printer has a single M-code port, and the coordinator's persistent
+connection to it carries both polling probes and service commands. Without
+ordering, a command issued while a poll's probe batch is queued or running
+waits behind it, up to the batch's full timeout. The scheduler orders access
+to that connection by priority class instead of arrival:
+
+- safety: commands that stop or pause the machine (M112, M25)
+- interactive: service calls and entity changes (jogs, setpoints, light, ...)
+- background: polling probes (M661, M114, M119, M420)
+
+Equal priorities keep their arrival order. An exchange already on the wire
+is never interrupted. A macro (see macros.py) holds the connection for all
+of its steps, so nothing else runs between them.
+
+Safety commands do not share that connection at all: they use a second,
+dedicated connection that is opened ahead of time and never closed for being
+idle, so an emergency stop leaves within one round trip even while a slow
+probe batch is in flight. If the dedicated connection cannot be opened, a
+safety command falls back to the head of the shared queue.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Callable, Optional, Union
+
+from .flashforge_tcp import FlashforgeTCPClient
+from .macros import Macro, MacroResult
+from .metrics import (
+    COUNTER_COMMANDS,
+    COUNTER_SAFETY_LANE_FALLBACKS,
+    PHASE_QUEUE_WAIT,
+    PollMetrics,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_SAFETY = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {
+    PRIORITY_SAFETY: "safety",
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+class CommandScheduler:
+    """Orders M-code exchanges on the shared connection and keeps a safety lane open."""
+
+    def __init__(
+        self,
+        client: FlashforgeTCPClient,
+        safety_client: FlashforgeTCPClient,
+        metrics: PollMetrics,
+    ) -> None:
+        """Initialize a scheduler for a shared and a dedicated safety connection."""
+        self._client = client
+        self._safety_client = safety_client
+        self._metrics = metrics
+        self._busy = False
+        # (priority, arrival sequence, future resolved when it is that waiter's turn)
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._warmup_task: Optional[asyncio.Task] = None
+
+    @property
+    def queued(self) -> dict[str, int]:
+        """Number of exchanges waiting for the shared connection, per priority class."""
+        counts = dict.fromkeys(PRIORITY_NAMES.values(), 0)
+        for priority, _, future in self._waiters:
+            if not future.done():
+                counts[PRIORITY_NAMES[priority]] += 1
+        return counts
+
+    async def send_commands(
+        self,
+        commands: Union[list[str], Callable[[], list[str]]],
+        priority: int,
+        response_terminator: str = "ok\r\n",
+        raw: bool = False,
+    ) -> list[tuple[bool, Union[str, bytes]]]:
+        """
+        Sends commands once it is their turn; see FlashforgeTCPClient.send_commands.
+
+        Safety commands go out on the dedicated connection, opening it first if
+        needed, and only queue for the shared one if that fails.
+
+        ``commands`` may also be a callable returning the commands. It is called
+        only when it is their turn, so a caller can keep updating what will be
+        sent while it waits (see command_coalescer.py).
+        """
+        name = PRIORITY_NAMES[priority]
+        if priority == PRIORITY_SAFETY:
+            if await self._safety_client.connect():
+                self._metrics.observe(f"{PHASE_QUEUE_WAIT}.{name}", 0.0)
+                commands = self._build(commands, name)
+                return await self._safety_client.send_commands(
+                    commands, response_terminator, raw
+                )
+            _LOGGER.warning(
+                "Safety connection to the printer could not be opened; "
+                "sending ahead of other queued commands instead"
+            )
+            self._metrics.increment(COUNTER_SAFETY_LANE_FALLBACKS)
+
+        started = time.monotonic()
+        await self._acquire(priority)
+        try:
+            self._metrics.observe(
+                f"{PHASE_QUEUE_WAIT}.{name}", time.monotonic() - started
+            )
+            commands = self._build(commands, name)
+            return await self._client.send_commands(commands, response_terminator, raw)
+        finally:
+            self._release()
+
+    async def send_command(
+        self,
+        command: str,
+        priority: int,
+        response_terminator: str = "ok\r\n",
+        raw: bool = False,
+    ) -> tuple[bool, Union[str, bytes]]:
+        """Sends one command once it is its turn; see send_commands."""
+        results = await self.send_commands(
+            [command], priority, response_terminator, raw
+        )
+        return results[0]
+
+    async def run_macro(
+        self, macro: Union[Macro, Callable[[], Macro]], priority: int
+    ) -> MacroResult:
+        """
+        Runs a macro in one turn on the shared connection; see macros.py.
+
+        Steps are sent one at a time and each must be acknowledged before the
+        next; rollback steps always run afterwards. ``macro`` may be a callable
+        that builds it when it is its turn, as for send_commands.
+        """
+        name = PRIORITY_NAMES[priority]
+        started = time.monotonic()
+        await self._acquire(priority)
+        try:
+            self._metrics.observe(
+                f"{PHASE_QUEUE_WAIT}.{name}", time.monotonic() - started
+            )
+            if callable(macro):
+                macro = macro()
+            self._metrics.increment(
+                f"{COUNTER_COMMANDS}.{name}", len(macro.steps) + len(macro.rollback)
+            )
+            result = MacroResult(macro.name)
+            try:
+                for index, command in enumerate(macro.steps):
+                    acknowledged, response = await self._client.send_command(
+                        command, macro.response_terminator
+                    )
+                    result.steps.append((command, acknowledged, response))
+                    if not acknowledged:
+                        result.skipped = [c.strip() for c in macro.steps[index + 1 :]]
+                        break
+            finally:
+                # Also after a failed step or a cancelled caller: leave the
+                # printer in the state the rest of the integration expects.
+                for command in macro.rollback:
+                    acknowledged, response = await self._client.send_command(
+                        command, macro.response_terminator
+                    )
+                    result.rollback.append((command, acknowledged, response))
+            return result
+        finally:
+            self._release()
+
+    def _build(
+        self, commands: Union[list[str], Callable[[], list[str]]], name: str
+    ) -> list[str]:
+        """Resolves deferred commands and counts them for their priority class."""
+        if callable(commands):
+            commands = commands()
+        self._metrics.increment(f"{COUNTER_COMMANDS}.{name}", len(commands))
+        return commands
+
+    async def _acquire(self, priority: int) -> None:
+        """Waits until the shared connection is free and no higher priority waits."""
+        if not self._busy:
+            self._busy = True
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The turn was handed over just as the waiter was cancelled.
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        """Hands the shared connection to the next waiter, skipping cancelled ones."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._busy = False
+
+    def ensure_safety_lane(self) -> None:
+        """Opens the safety connection in the background unless it is already open."""
+        if self._safety_client.is_connected or (
+            self._warmup_task is not None and not self._warmup_task.done()
+        ):
+            return
+        self._warmup_task = asyncio.ensure_future(self._safety_client.connect())
+
+    def close(self) -> None:
+        """Closes the safety connection (the shared one belongs to the caller)."""
+        if self._warmup_task is not None:
+            self._warmup_task.cancel()
+            self._warmup_task = None
+        self._safety_client.close()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot for diagnostics."""
+        return {
+            "safety_lane_connected": self._safety_client.is_connected,
+            "safety_lane_connections": self._safety_client.connect_count,
+            "busy": self._busy,
+            "queued": self.queued,
+        }
@@ -23,12 +23,19 @@ from homeassistant import config_entries, exceptions
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.const import CONF_HOST, CONF_SCAN_INTERVAL
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .const import (
     DOMAIN,
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_PRINTING_SCAN_INTERVAL,
     CONF_PRINTING_SCAN_INTERVAL,
+    CONF_CONCURRENT_PROBES,
+    CONF_TIMELAPSE,
+    CONF_TIMELAPSE_INTERVAL,
+    DEFAULT_CONCURRENT_PROBES,
+    DEFAULT_TIMELAPSE,
+    DEFAULT_TIMELAPSE_INTERVAL,
     DEFAULT_PORT,
     DEFAULT_HOST,
     TIMEOUT_CONNECTION_TEST,
@@ -93,6 +100,15 @@ class FlashforgeOptionsFlow(config_entries.OptionsFlow):
             CONF_PRINTING_SCAN_INTERVAL,
             DEFAULT_PRINTING_SCAN_INTERVAL
         )
+        current_concurrent_probes = self.config_entry.options.get(
+            CONF_CONCURRENT_PROBES, DEFAULT_CONCURRENT_PROBES
+        )
+        current_timelapse = self.config_entry.options.get(
+            CONF_TIMELAPSE, DEFAULT_TIMELAPSE
+        )
+        current_timelapse_interval = self.config_entry.options.get(
+            CONF_TIMELAPSE_INTERVAL, DEFAULT_TIMELAPSE_INTERVAL
+        )
 
         # Build the options schema
         options_schema = vol.Schema(
@@ -103,6 +119,13 @@ class FlashforgeOptionsFlow(config_entries.OptionsFlow):
                 vol.Required(
                     CONF_PRINTING_SCAN_INTERVAL, default=current_printing_scan_interval
                 ): vol.All(vol.Coerce(int), vol.Range(min=1, max=15)),
+                vol.Required(
+                    CONF_CONCURRENT_PROBES, default=current_concurrent_probes
+                ): bool,
+                vol.Required(CONF_TIMELAPSE, default=current_timelapse): bool,
+                vol.Required(
+                    CONF_TIMELAPSE_INTERVAL, default=current_timelapse_interval
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
             }
         )
 
@@ -313,77 +336,77 @@ class FlashforgeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             try:
                 timeout_seconds = TIMEOUT_CONNECTION_TEST
 
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        url,
-                        json=payload,
-                        timeout=aiohttp.ClientTimeout(total=timeout_seconds),
-                    ) as resp:
-                        if resp.status in (401, 403):
-                            _LOGGER.error(
-                                "Authentication failed with status: %s for host %s",
-                                resp.status,
-                                host,
-                            )
-                            raise InvalidAuth("Authentication failed")
-
-                        resp.raise_for_status()  # Raises ClientResponseError for 4xx/5xx
-                        text_data = await resp.text()
-
-                        try:
-                            data = json.loads(text_data)
-                        except json.JSONDecodeError as e:
-                            _LOGGER.error("Invalid JSON response from %s: %s", host, e)
-                            _LOGGER.debug("Raw response text: %s", text_data)
-                            raise InvalidAuth(f"Invalid response format: {e}")
-
-                        # Log the full response for debugging
-                        _LOGGER.debug("Printer response from %s: %s", host, data)
-
-                        # Check if we have the basic structure for validation
-                        has_all_required = all(field in data for field in REQUIRED_RESPONSE_FIELDS)
+                session = async_get_clientsession(hass)
+                async with session.post(
+                    url,
+                    json=payload,
+                    timeout=aiohttp.ClientTimeout(total=timeout_seconds),
+                ) as resp:
+                    if resp.status in (401, 403):
+                        _LOGGER.error(
+                            "Authentication failed with status: %s for host %s",
+                            resp.status,
+                            host,
+                        )
+                        raise InvalidAuth("Authentication failed")
+
+                    resp.raise_for_status()  # Raises ClientResponseError for 4xx/5xx
+                    text_data = await resp.text()
+
+                    try:
+                        data = json.loads(text_data)
+                    except json.JSONDecodeError as e:
+                        _LOGGER.error("Invalid JSON response from %s: %s", host, e)
+                        _LOGGER.debug("Raw response text: %s", text_data)
+                        raise InvalidAuth(f"Invalid response format: {e}")
+
+                    # Log the full response for debugging
+                    _LOGGER.debug("Printer response from %s: %s", host, data)
+
+                    # Check if we have the basic structure for validation
+                    has_all_required = all(field in data for field in REQUIRED_RESPONSE_FIELDS)
+                    
+                    if not has_all_required:
+                        _LOGGER.warning(
+                            "Response from %s missing some expected fields. Expected: %s, Got keys: %s",
+                            host,
+                            REQUIRED_RESPONSE_FIELDS,
+                            list(data.keys()),
+                        )
+                        # Check if we at least have a "detail" field with valid data
+                        # This handles different printer models (Pro vs non-Pro)
+                        if "detail" in data and isinstance(data.get("detail"), dict):
+                            detail = data.get("detail", {})
+                            # Check if detail has at least status field
+                            if "status" in detail:
+                                _LOGGER.info(
+                                    "Connection test to %s successful (alternate response structure)",
+                                    host,
+                                )
+                                return  # Success for non-Pro models with minimal structure
                         
-                        if not has_all_required:
-                            _LOGGER.warning(
-                                "Response from %s missing some expected fields. Expected: %s, Got keys: %s",
-                                host,
-                                REQUIRED_RESPONSE_FIELDS,
-                                list(data.keys()),
-                            )
-                            # Check if we at least have a "detail" field with valid data
-                            # This handles different printer models (Pro vs non-Pro)
-                            if "detail" in data and isinstance(data.get("detail"), dict):
-                                detail = data.get("detail", {})
-                                # Check if detail has at least status field
-                                if "status" in detail:
-                                    _LOGGER.info(
-                                        "Connection test to %s successful (alternate response structure)",
-                                        host,
-                                    )
-                                    return  # Success for non-Pro models with minimal structure
-                            
-                            # If we don't have enough data, fail authentication
-                            _LOGGER.error(
-                                "Invalid response structure from %s, missing required fields",
-                                host,
-                            )
-                            raise InvalidAuth("Invalid response structure")
-
-                        # Standard validation for Pro models
-                        if data.get("code") != 0:
-                            error_msg = data.get(
-                                "message", "Unknown error from printer"
-                            )
-                            _LOGGER.error(
-                                "Printer at %s returned error code %s: %s", 
-                                host, 
-                                data.get("code"),
-                                error_msg
-                            )
-                            raise InvalidAuth(f"Printer error: {error_msg}")
-
-                        _LOGGER.info("Connection test to %s successful", host)
-                        return  # Success
+                        # If we don't have enough data, fail authentication
+                        _LOGGER.error(
+                            "Invalid response structure from %s, missing required fields",
+                            host,
+                        )
+                        raise InvalidAuth("Invalid response structure")
+
+                    # Standard validation for Pro models
+                    if data.get("code") != 0:
+                        error_msg = data.get(
+                            "message", "Unknown error from printer"
+                        )
+                        _LOGGER.error(
+                            "Printer at %s returned error code %s: %s", 
+                            host, 
+                            data.get("code"),
+                            error_msg
+                        )
+                        raise InvalidAuth(f"Printer error: {error_msg}")
+
+                    _LOGGER.info("Connection test to %s successful", host)
+                    return  # Success
 
             except (
                 asyncio.TimeoutError
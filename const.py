@@ -15,12 +15,57 @@ DEFAULT_HOST = "printer.local"
 
 # Configuration keys
 CONF_PRINTING_SCAN_INTERVAL = "printing_scan_interval"
+CONF_CONCURRENT_PROBES = "concurrent_probes"
+DEFAULT_CONCURRENT_PROBES = False
+CONF_TIMELAPSE = "timelapse"
+DEFAULT_TIMELAPSE = False
+CONF_TIMELAPSE_INTERVAL = "timelapse_interval"
+DEFAULT_TIMELAPSE_INTERVAL = 0  # seconds; 0 takes one frame per layer
 
 # Timeout settings (in seconds)
 TIMEOUT_API_CALL = 10
 TIMEOUT_COMMAND = 5
 TIMEOUT_CONNECTION_TEST = 5
 
+# Circuit breaker for a switched-off printer: after this many consecutive
+# failed polls, full polls stop and only a TCP connect to the HTTP port is
+# tried, at an interval growing from the initial to the maximum value.
+CIRCUIT_FAILURE_THRESHOLD = 2
+CIRCUIT_PROBE_INTERVAL = 30  # seconds
+CIRCUIT_MAX_PROBE_INTERVAL = 300  # seconds
+CIRCUIT_PROBE_BACKOFF_FACTOR = 2
+CIRCUIT_PROBE_TIMEOUT = 2  # seconds
+
+# Poll deadline: a whole poll (the /detail request and every M-code probe) gets
+# this fraction of the current update interval, but at least the minimum.
+# Probes still running at the deadline are cancelled and keep their previous,
+# now stale, values until a later poll refreshes them.
+POLL_DEADLINE_FRACTION = 0.8
+POLL_DEADLINE_MIN = 1.5  # seconds
+
+# Adaptive timeouts: request timeouts follow each endpoint's smoothed round-trip
+# time and its variance (see rtt.py) within these bounds, in seconds. Until the
+# first round trip is measured the fixed TIMEOUT_* values above apply. M-code
+# replies get a higher floor because the firmware acknowledges some commands
+# only after starting to execute them; after the echo, the wait for 'ok' never
+# drops below TIMEOUT_COMMAND (see flashforge_tcp.py).
+RTT_MIN_TIMEOUT_HTTP = 1.0
+RTT_MIN_TIMEOUT_MCODE = 2.0
+RTT_MAX_TIMEOUT = 30.0
+# Hedged /detail requests: once this many latencies were observed, a request
+# still running after the given percentile of them gets a second, identical
+# request on the other pooled connection, and the first answer wins.
+HEDGE_MIN_SAMPLES = 20
+HEDGE_PERCENTILE = 0.95
+
+# HTTP connection pooling for the coordinator's shared session
+HTTP_KEEPALIVE_TIMEOUT = 30  # seconds an idle keep-alive connection is kept
+HTTP_CONNECTION_LIMIT = 2  # max simultaneous connections to one printer
+
+# M-code (TCP) reply reading
+MCODE_READ_SIZE = 8192  # bytes requested per socket read
+MCODE_MAX_RESPONSE_SIZE = 1024 * 1024  # largest reply buffered (M661 listings can be large)
+
 # Retry settings
 MAX_RETRIES = 3
 RETRY_DELAY = 2  # seconds
@@ -85,6 +130,7 @@ API_ATTR_ESTIMATED_TIME = "estimatedTime"
 API_ATTR_FIRMWARE_VERSION = "firmwareVersion"
 API_ATTR_IP_ADDR = "ipAddr"
 API_ATTR_CAMERA_STREAM_URL = "cameraStreamUrl"
+API_ATTR_REMAINING_DISK_SPACE = "remainingDiskSpace"  # Change signal for the file list cache
 API_ATTR_MODEL = "model"  # From camera.py device_info
 API_ATTR_DETAIL = "detail"  # For accessing the nested detail object
 
@@ -92,11 +138,91 @@ API_ATTR_DETAIL = "detail"  # For accessing the nested detail object
 MJPEG_DEFAULT_PORT = 8080
 MJPEG_STREAM_PATH = "/?action=stream"
 MJPEG_DUMMY_URL = "http://0.0.0.0/"
+# Shared camera stream (see mjpeg_proxy.py)
+MJPEG_PROXY_BUFFER_SIZE = 2 * 1024 * 1024  # Bytes of recent frames kept for viewers
+MJPEG_MAX_FRAME_SIZE = 1024 * 1024  # Larger frames are dropped
+MJPEG_CONNECT_TIMEOUT = 5  # Seconds
+MJPEG_READ_TIMEOUT = 10  # Seconds without data before reconnecting
+MJPEG_RECONNECT_DELAY = 1  # Seconds, doubled after each failed attempt
+MJPEG_MAX_RECONNECT_DELAY = 30  # Seconds
+MJPEG_IDLE_TIMEOUT = 10  # Seconds the camera stays connected after the last viewer leaves
+MJPEG_FRAME_TIMEOUT = 30  # Seconds a viewer waits for a frame before its stream ends
+MJPEG_SNAPSHOT_MAX_AGE = 2  # Seconds a buffered frame is served as a snapshot
+MJPEG_SNAPSHOT_TIMEOUT = 5  # Seconds to wait for a fresh frame
+MJPEG_SNAPSHOT_KEEP_ALIVE = 60  # Seconds the camera stays connected after a snapshot
+MJPEG_SCALED_SNAPSHOT_CACHE_SIZE = 4  # Scaled snapshot sizes kept
+
+# Timelapse recordings (see timelapse.py), below the configuration directory
+TIMELAPSE_DIRECTORY = "flashforge_timelapse"
+# Seconds without /detail after which a running recording is finished
+TIMELAPSE_OFFLINE_GRACE = 300
 
 # TCP Command Path Prefixes (for M23 start print command)
 TCP_CMD_PRINT_FILE_PREFIX_USER = "0:/user/"
 TCP_CMD_PRINT_FILE_PREFIX_ROOT = "0:/"
 
+# TCP telemetry query commands (sent together as one pipelined batch)
+CMD_PRINTABLE_FILES = "~M661\r\n"
+CMD_COORDINATES = "~M114\r\n"
+CMD_ENDSTOP_STATUS = "~M119\r\n"
+CMD_BED_LEVELING_STATUS = "~M420\r\n"
+
+# Tiered polling: TCP telemetry probes and how often each is refreshed (seconds).
+# The HTTP /detail status (temperatures, progress) is fetched on every poll;
+# these slower-moving values are only re-queried once their interval elapsed
+# or when a command requests them (see coordinator.request_tcp_probe).
+# None means "fetch once, then only on request" (see file_list.py triggers).
+PROBE_PRINTABLE_FILES = "printable_files"
+PROBE_COORDINATES = "coordinates"
+PROBE_ENDSTOPS = "endstops"
+PROBE_BED_LEVELING = "bed_leveling"
+PROBE_REFRESH_INTERVALS = {
+    PROBE_PRINTABLE_FILES: None,
+    PROBE_COORDINATES: 10,
+    PROBE_ENDSTOPS: 10,
+    PROBE_BED_LEVELING: 300,
+}
+# Concurrent probe mode (for firmware that needs one connection per command):
+# each due probe gets its own connection and runs alongside the /detail call,
+# with at most this many M-code connections open to one printer at a time.
+TCP_PROBE_CONCURRENCY = 4
+
+# G-code streaming (stream_gcode service): lines awaiting their 'ok' at a time,
+# and how long to wait for one. Moves and homing are acknowledged only once
+# the printer's planner has room for them, so the wait can be long.
+GCODE_STREAM_WINDOW = 4
+GCODE_STREAM_MAX_WINDOW = 32
+GCODE_STREAM_ACK_TIMEOUT = 60  # seconds
+
+# File uploads (upload_file service): how long the printer may take to answer
+# once the whole file is sent (it writes the file to flash first), and how
+# often progress is pushed to the upload sensors while a file is sent.
+UPLOAD_REPLY_TIMEOUT = 120  # seconds
+UPLOAD_PROGRESS_INTERVAL = 1.0  # seconds
+
+# G-code analysis (print time and filament estimates, see gcode_analysis.py).
+# Motion defaults apply until a file sets its own feed rate or M204 value.
+GCODE_ANALYSIS_ACCELERATION = 5000.0  # mm/s²
+GCODE_ANALYSIS_JUNCTION_SPEED = 5.0  # mm/s
+GCODE_ANALYSIS_FEED_RATE = 3000.0  # mm/min
+FILAMENT_DIAMETER = 1.75  # mm
+FILAMENT_DENSITY = 1.24  # g/cm³ (PLA)
+# Analyses kept in memory, by file content hash
+GCODE_ANALYSIS_CACHE_SIZE = 32
+# Total size of the preview images kept in memory (see thumbnails.py)
+THUMBNAIL_CACHE_BYTES = 8 * 1024 * 1024
+
+# Modes of queued moves; only moves of the same mode are merged while queued
+MOVE_MODE_ABSOLUTE = "absolute"
+MOVE_MODE_RELATIVE = "relative"
+
+# Change detection: entities name the coordinator data they show as top-level
+# keys or "detail.<key>" paths, and skip state writes when none of them changed.
+# The connection state is not part of the data but is tracked under this key.
+DATA_KEY_CONNECTION_STATE = "connection_state"
+# Likewise for G-code analyses, which the file picker shows per file.
+DATA_KEY_FILE_ANALYSIS = "file_analysis"
+
 # Endstop Sensor Constants
 # These API_ATTR keys are placeholders for how we'll store parsed M119 output in coordinator.data
 API_ATTR_X_ENDSTOP_STATUS = "x_endstop_status"
@@ -137,6 +263,9 @@ SERVICE_START_PRINT = "start_print"
 SERVICE_SET_EXTRUDER_TEMPERATURE = "set_extruder_temperature"
 SERVICE_SET_BED_TEMPERATURE = "set_bed_temperature"
 SERVICE_SET_FAN_SPEED = "set_fan_speed"
+SERVICE_STREAM_GCODE = "stream_gcode"
+SERVICE_UPLOAD_FILE = "upload_file"
+SERVICE_ANALYZE_GCODE = "analyze_gcode"
 
 # Device identity constants
 MANUFACTURER = "Flashforge"
@@ -164,3 +293,7 @@ MAX_FAN_SPEED = 255.0
 ATTR_TEMPERATURE = "temperature"
 ATTR_SPEED = "speed"
 ATTR_FILE_PATH = "file_path"
+ATTR_SCRIPT = "script"
+ATTR_WINDOW = "window"
+ATTR_STOP_ON_ERROR = "stop_on_error"
+ATTR_MD5 = "md5"
@@ -9,11 +9,13 @@ from __future__ import annotations
 import asyncio
 import logging
 import re  # For parsing M114
+import time
 from datetime import timedelta
-from typing import Any, Optional, List # Added List
+from typing import Any, AsyncIterator, Callable, Iterable, Optional, List # Added List
 
 import aiohttp
 
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from .const import (
@@ -23,9 +25,25 @@ from .const import (
     ENDPOINT_DETAIL,
     TIMEOUT_API_CALL,
     TIMEOUT_COMMAND as COORDINATOR_COMMAND_TIMEOUT,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_CONNECTION_LIMIT,
+    MCODE_READ_SIZE,
+    MCODE_MAX_RESPONSE_SIZE,
     MAX_RETRIES,
     RETRY_DELAY,
     BACKOFF_FACTOR,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_PROBE_INTERVAL,
+    CIRCUIT_MAX_PROBE_INTERVAL,
+    CIRCUIT_PROBE_BACKOFF_FACTOR,
+    CIRCUIT_PROBE_TIMEOUT,
+    POLL_DEADLINE_FRACTION,
+    POLL_DEADLINE_MIN,
+    RTT_MIN_TIMEOUT_HTTP,
+    RTT_MIN_TIMEOUT_MCODE,
+    RTT_MAX_TIMEOUT,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
     CONNECTION_STATE_UNKNOWN,
     CONNECTION_STATE_CONNECTED,
     CONNECTION_STATE_DISCONNECTED,
@@ -44,11 +62,109 @@ from .const import (
     API_ATTR_Z_ENDSTOP_STATUS,
     API_ATTR_FILAMENT_ENDSTOP_STATUS,
     API_ATTR_BED_LEVELING_STATUS,
+    CMD_PRINTABLE_FILES,
+    CMD_COORDINATES,
+    CMD_ENDSTOP_STATUS,
+    CMD_BED_LEVELING_STATUS,
+    PROBE_PRINTABLE_FILES,
+    PROBE_COORDINATES,
+    PROBE_ENDSTOPS,
+    PROBE_BED_LEVELING,
+    PROBE_REFRESH_INTERVALS,
+    API_ATTR_REMAINING_DISK_SPACE,
+    DEFAULT_CONCURRENT_PROBES,
+    TCP_PROBE_CONCURRENCY,
+    GCODE_STREAM_ACK_TIMEOUT,
+    GCODE_STREAM_WINDOW,
+    MOVE_MODE_ABSOLUTE,
+    MOVE_MODE_RELATIVE,
+    UPLOAD_PROGRESS_INTERVAL,
+    UPLOAD_REPLY_TIMEOUT,
+    GCODE_ANALYSIS_ACCELERATION,
+    GCODE_ANALYSIS_JUNCTION_SPEED,
+    GCODE_ANALYSIS_FEED_RATE,
+    GCODE_ANALYSIS_CACHE_SIZE,
+    THUMBNAIL_CACHE_BYTES,
+    API_ATTR_CAMERA_STREAM_URL,
+    API_ATTR_IP_ADDR,
+    MJPEG_DEFAULT_PORT,
+    MJPEG_STREAM_PATH,
+    MJPEG_PROXY_BUFFER_SIZE,
+    MJPEG_MAX_FRAME_SIZE,
+    MJPEG_CONNECT_TIMEOUT,
+    MJPEG_READ_TIMEOUT,
+    MJPEG_RECONNECT_DELAY,
+    MJPEG_MAX_RECONNECT_DELAY,
+    MJPEG_IDLE_TIMEOUT,
+    MJPEG_SNAPSHOT_MAX_AGE,
+    MJPEG_SNAPSHOT_TIMEOUT,
+    DEFAULT_TIMELAPSE,
+    DEFAULT_TIMELAPSE_INTERVAL,
+    TIMELAPSE_DIRECTORY,
+    TIMELAPSE_OFFLINE_GRACE,
+    PAUSED_STATE,
+    API_ATTR_PRINT_LAYER,
+    API_ATTR_PRINT_FILE_NAME,
+    FILAMENT_DIAMETER,
+    FILAMENT_DENSITY,
+    DATA_KEY_CONNECTION_STATE,
+    DATA_KEY_FILE_ANALYSIS,
 )
-from .flashforge_tcp import FlashforgeTCPClient
+from .circuit_breaker import CircuitBreaker
+from .command_coalescer import CommandCoalescer
+from .command_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_SAFETY,
+    CommandScheduler,
+)
+from .file_list import PrintableFileCache, file_listing_end, parse_file_listing
+from .file_upload import (
+    ENDPOINT_UPLOAD,
+    UploadProgress,
+    upload_file,
+    upload_file_name,
+)
+from .flashforge_tcp import FlashforgeTCPClient, decode_response
+from .gcode_analysis import (
+    GcodeAnalysis,
+    GcodeAnalysisCache,
+    MotionModel,
+    analyze_file,
+    file_md5,
+)
+from .gcode_stream import GcodeStreamResult, stream_gcode
+from .macros import Macro, MacroResult
+from .mjpeg_proxy import MjpegProxy
+from .metrics import (
+    COUNTER_CANCELLED_PROBES,
+    COUNTER_DETAIL_FAILURES,
+    COUNTER_DETAIL_RETRIES,
+    COUNTER_HEDGE_WINS,
+    COUNTER_HEDGED_REQUESTS,
+    COUNTER_HTTP_BYTES_RECEIVED,
+    COUNTER_POLL_OVERRUNS,
+    COUNTER_POLLS,
+    COUNTER_PROBE_FAILURES,
+    COUNTER_SKIPPED_TICKS,
+    COUNTER_SUPPRESSED_WRITES,
+    COUNTER_TCP_BYTES_RECEIVED,
+    PHASE_DETAIL,
+    PHASE_ENTITY_UPDATE,
+    PHASE_PARSE,
+    PHASE_POLL,
+    PHASE_TCP_BATCH,
+    PollMetrics,
+)
+from .rtt import RttEstimator
+from .timelapse import TimelapseRecorder
+from .thumbnails import ThumbnailCache, extract_thumbnail
 
 _LOGGER = logging.getLogger(__name__)
 
+# Replies whose binary payload follows the 'ok' line, possibly in later packets
+MCODE_REPLY_FRAMERS = {"M661": file_listing_end}
+
 
 class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
     def __init__(
@@ -59,6 +175,9 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
         check_code: str,
         regular_scan_interval: int = DEFAULT_SCAN_INTERVAL, # Renamed
         printing_scan_interval: int = DEFAULT_PRINTING_SCAN_INTERVAL, # Added
+        concurrent_probes: bool = DEFAULT_CONCURRENT_PROBES,
+        timelapse: bool = DEFAULT_TIMELAPSE,
+        timelapse_interval: int = DEFAULT_TIMELAPSE_INTERVAL,
     ):
         super().__init__(
             hass,
@@ -75,16 +194,309 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
         self.data: dict[str, Any] = (
             {}
         )  # This is first populated by the base class after _async_update_data
+        # Smoothed round-trip times per endpoint; request timeouts derive from
+        # them. All M-code connections to this printer share one estimator.
+        self._mcode_rtt = RttEstimator(
+            COORDINATOR_COMMAND_TIMEOUT, RTT_MIN_TIMEOUT_MCODE, RTT_MAX_TIMEOUT
+        )
+        self._http_rtt: dict[str, RttEstimator] = {}
+        # One long-lived M-code connection shared by polling probes and commands,
+        # so a poll does not pay a TCP handshake per query.
+        self._tcp_client = FlashforgeTCPClient(
+            self.host,
+            DEFAULT_MCODE_PORT,
+            persistent=True,
+            read_size=MCODE_READ_SIZE,
+            max_response_size=MCODE_MAX_RESPONSE_SIZE,
+            rtt=self._mcode_rtt,
+            reply_framers=MCODE_REPLY_FRAMERS,
+        )
+        # Pooled keep-alive HTTP session for /detail polls and HTTP commands,
+        # created lazily inside the event loop.
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        # Tiered polling state: monotonic time each TCP probe last succeeded,
+        # and probes explicitly requested for the next poll.
+        self._probe_last_run: dict[str, float] = {}
+        self._requested_probes: set[str] = set()
+        # Probes cancelled at a poll deadline; their values are from an older poll.
+        self.stale_probes: set[str] = set()
+        # Monotonic time by which the running poll must finish (None outside polls)
+        self._poll_deadline: Optional[float] = None
+        # Parsed M661 listing, only re-fetched when a change trigger fires.
+        self.file_cache = PrintableFileCache()
+        # Concurrent probe mode: one connection per probe, run alongside /detail,
+        # limited per printer by the semaphore.
+        self.concurrent_probes = concurrent_probes
+        self._probe_semaphore = asyncio.Semaphore(TCP_PROBE_CONCURRENCY)
+        # Per-phase latency histograms and failure/byte counters (diagnostics)
+        self.metrics = PollMetrics()
+        # Orders M-codes on the shared connection by priority and keeps a second
+        # connection open for emergency stop and pause; see command_scheduler.py
+        self.command_scheduler = CommandScheduler(
+            self._tcp_client,
+            FlashforgeTCPClient(
+                self.host,
+                DEFAULT_MCODE_PORT,
+                persistent=True,
+                idle_timeout=None,
+                rtt=self._mcode_rtt,
+            ),
+            self.metrics,
+        )
+        # Folds bursts of setpoint and move commands; see command_coalescer.py
+        self.command_coalescer = CommandCoalescer(self.command_scheduler, self.metrics)
+        # One G-code stream at a time, on its own connection; the latest result
+        # is kept for the diagnostics.
+        self._gcode_stream_lock = asyncio.Lock()
+        self.last_gcode_stream: Optional[GcodeStreamResult] = None
+        # One file upload at a time; its progress is pushed to the upload
+        # sensors through their own listeners, not a coordinator update.
+        self._upload_lock = asyncio.Lock()
+        self.upload_progress: Optional[UploadProgress] = None
+        self._upload_listeners: list[Callable[[], None]] = []
+        self._upload_progress_pushed = 0.0
+        # Print time and filament estimates of local files, by content hash,
+        # and which printer file each belongs to; see gcode_analysis.py
+        self.gcode_analyses = GcodeAnalysisCache(GCODE_ANALYSIS_CACHE_SIZE)
+        # Preview images of the same files; see thumbnails.py
+        self.thumbnails = ThumbnailCache(THUMBNAIL_CACHE_BYTES)
+        self._motion_model = MotionModel(
+            acceleration=GCODE_ANALYSIS_ACCELERATION,
+            junction_speed=GCODE_ANALYSIS_JUNCTION_SPEED,
+            feed_rate=GCODE_ANALYSIS_FEED_RATE,
+            filament_diameter=FILAMENT_DIAMETER,
+            filament_density=FILAMENT_DENSITY,
+        )
+        # The one camera connection, shared by all viewers; see mjpeg_proxy.py
+        self.camera_proxy = MjpegProxy(
+            lambda: self.camera_stream_url,
+            ring_bytes=MJPEG_PROXY_BUFFER_SIZE,
+            max_frame_size=MJPEG_MAX_FRAME_SIZE,
+            connect_timeout=MJPEG_CONNECT_TIMEOUT,
+            read_timeout=MJPEG_READ_TIMEOUT,
+            reconnect_delay=MJPEG_RECONNECT_DELAY,
+            max_reconnect_delay=MJPEG_MAX_RECONNECT_DELAY,
+            idle_timeout=MJPEG_IDLE_TIMEOUT,
+        )
+        # Records prints from that connection when enabled; see timelapse.py
+        self.timelapse: Optional[TimelapseRecorder] = (
+            TimelapseRecorder(
+                self.camera_proxy,
+                lambda func, *args: self.hass.async_add_executor_job(func, *args),
+                hass.config.path(TIMELAPSE_DIRECTORY, serial_number),
+                interval=timelapse_interval,
+                snapshot_max_age=MJPEG_SNAPSHOT_MAX_AGE,
+                snapshot_timeout=MJPEG_SNAPSHOT_TIMEOUT,
+            )
+            if timelapse
+            else None
+        )
+        # When /detail last arrived, to finish a recording once the printer is gone
+        self._timelapse_detail_seen: Optional[float] = None
+        # Data keys that changed in the latest poll (None: treat all as changed)
+        self.changed_keys: Optional[frozenset[str]] = None
+        # Stops full polls while the printer is off; see circuit_breaker.py
+        self.circuit_breaker = CircuitBreaker(
+            CIRCUIT_FAILURE_THRESHOLD,
+            CIRCUIT_PROBE_INTERVAL,
+            CIRCUIT_MAX_PROBE_INTERVAL,
+            CIRCUIT_PROBE_BACKOFF_FACTOR,
+        )
+        self.http_connections_created = 0
+        self.http_connections_reused = 0
+
+    async def async_close(self) -> None:
+        """Close connections held by the coordinator (called on entry unload)."""
+        self._tcp_client.close()
+        self.command_scheduler.close()
+        if self.timelapse is not None:
+            # Writes the index of a running recording before the camera closes
+            await self.timelapse.async_close()
+        await self.camera_proxy.async_close()
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self._http_session = None
+
+    @property
+    def connection_stats(self) -> dict[str, int]:
+        """Counters showing how often HTTP and TCP connections were reused."""
+        return {
+            "http_connections_created": self.http_connections_created,
+            "http_connections_reused": self.http_connections_reused,
+            "tcp_connections_created": self._tcp_client.connect_count,
+            "tcp_connections_reused": self._tcp_client.reuse_count,
+            "tcp_timeouts": self._tcp_client.timeout_count,
+        }
+
+    @property
+    def camera_stream_url(self) -> Optional[str]:
+        """MJPEG stream URL reported by the printer, or built from its IP address."""
+        detail = (self.data or {}).get(API_ATTR_DETAIL) or {}
+        if detail.get(API_ATTR_CAMERA_STREAM_URL):
+            return detail[API_ATTR_CAMERA_STREAM_URL]
+        if detail.get(API_ATTR_IP_ADDR):
+            return f"http://{detail[API_ATTR_IP_ADDR]}:{MJPEG_DEFAULT_PORT}{MJPEG_STREAM_PATH}"
+        return None
+
+    @property
+    def tcp_probe_status(self) -> dict[str, dict[str, Any]]:
+        """Refresh interval, age of the last success and pending request per TCP probe."""
+        now = time.monotonic()
+        return {
+            probe: {
+                "refresh_interval_seconds": interval,
+                "seconds_since_last_success": (
+                    round(now - self._probe_last_run[probe], 1)
+                    if probe in self._probe_last_run
+                    else None
+                ),
+                "requested": probe in self._requested_probes,
+                "stale": probe in self.stale_probes,
+            }
+            for probe, interval in PROBE_REFRESH_INTERVALS.items()
+        }
+
+    @property
+    def rtt_status(self) -> dict[str, dict[str, Any]]:
+        """Smoothed round-trip time, variance and current timeout per endpoint."""
+        status = {"mcode": self._mcode_rtt.as_dict()}
+        for endpoint, estimator in sorted(self._http_rtt.items()):
+            status[endpoint] = estimator.as_dict()
+        return status
+
+    def _http_rtt_for(self, endpoint: str, initial_timeout: float) -> RttEstimator:
+        """Return the round-trip estimator of an HTTP endpoint, creating it if needed."""
+        estimator = self._http_rtt.get(endpoint)
+        if estimator is None:
+            estimator = self._http_rtt[endpoint] = RttEstimator(
+                initial_timeout, RTT_MIN_TIMEOUT_HTTP, RTT_MAX_TIMEOUT
+            )
+        return estimator
+
+    @property
+    def poll_budget(self) -> Optional[float]:
+        """Seconds a poll may take at the current update interval (None: unbounded)."""
+        if not self.update_interval:
+            return None
+        return max(
+            POLL_DEADLINE_MIN,
+            self.update_interval.total_seconds() * POLL_DEADLINE_FRACTION,
+        )
+
+    def _time_left(self, limit: Optional[float] = None) -> Optional[float]:
+        """
+        Return the seconds left until the poll deadline, capped at limit.
+
+        Returns limit unchanged (None: no limit) outside a poll.
+        """
+        if self._poll_deadline is None:
+            return limit
+        left = max(0.0, self._poll_deadline - time.monotonic())
+        return left if limit is None else min(limit, left)
+
+    def _mark_probes_stale(self, probes: Iterable[str]) -> None:
+        """Records probes cancelled at the poll deadline; they keep their previous values."""
+        probes = list(probes)
+        self.stale_probes.update(probes)
+        for probe in probes:
+            self.metrics.increment(f"{COUNTER_CANCELLED_PROBES}.{probe}")
+        _LOGGER.debug(f"Poll deadline reached; cancelled TCP probes {probes}, keeping their previous values")
+
+    def data_changed(self, keys: Iterable[str]) -> bool:
+        """
+        Return True if any of the given data keys changed in the latest poll.
+
+        Keys are top-level data keys or "detail.<key>" paths, as produced by
+        _diff_data.
+        """
+        if self.changed_keys is None:
+            return True
+        for key in keys:
+            if key in self.changed_keys:
+                return True
+            parent, _, _ = key.partition(".")
+            if parent != key and parent in self.changed_keys:
+                return True
+        return False
+
+    def record_suppressed_write(self) -> None:
+        """Count an entity state write skipped because its data was unchanged."""
+        self.metrics.increment(COUNTER_SUPPRESSED_WRITES)
+
+    @staticmethod
+    def _diff_data(
+        old: Optional[dict[str, Any]], new: Optional[dict[str, Any]]
+    ) -> Optional[frozenset[str]]:
+        """
+        Return the keys whose values differ between two polls.
+
+        Top-level keys are compared directly; inside the detail object each
+        key is reported as "detail.<key>". Returns None when there is nothing
+        to compare against, meaning everything should be treated as changed.
+        """
+        if not old or not new:
+            return None
+        changed = {
+            key
+            for key in old.keys() | new.keys()
+            if key != API_ATTR_DETAIL and old.get(key) != new.get(key)
+        }
+        old_detail = old.get(API_ATTR_DETAIL)
+        new_detail = new.get(API_ATTR_DETAIL)
+        if isinstance(old_detail, dict) and isinstance(new_detail, dict):
+            changed.update(
+                f"{API_ATTR_DETAIL}.{key}"
+                for key in old_detail.keys() | new_detail.keys()
+                if old_detail.get(key) != new_detail.get(key)
+            )
+        elif old_detail != new_detail:
+            changed.add(API_ATTR_DETAIL)
+        return frozenset(changed)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify entities of new data, timing the fan-out for the metrics."""
+        started = time.monotonic()
+        super().async_update_listeners()
+        self.metrics.observe(PHASE_ENTITY_UPDATE, time.monotonic() - started)
+
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Return the coordinator's shared HTTP session, creating it if needed."""
+        if self._http_session is None or self._http_session.closed:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_end.append(
+                self._on_http_connection_created
+            )
+            trace_config.on_connection_reuseconn.append(
+                self._on_http_connection_reused
+            )
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=HTTP_CONNECTION_LIMIT,
+                    keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                ),
+                trace_configs=[trace_config],
+            )
+        return self._http_session
+
+    async def _on_http_connection_created(self, session, context, params) -> None:
+        self.http_connections_created += 1
+
+    async def _on_http_connection_reused(self, session, context, params) -> None:
+        self.http_connections_reused += 1
 
     async def _send_tcp_command(
-        self, command: str, action: str, response_terminator: str = "ok\r\n"
+        self,
+        command: str,
+        action: str,
+        response_terminator: str = "ok\r\n",
+        priority: int = PRIORITY_INTERACTIVE,
     ) -> tuple[bool, str]:
         """Helper method to send a TCP command and handle common logic."""
-        tcp_client = FlashforgeTCPClient(self.host, DEFAULT_MCODE_PORT)
         _LOGGER.info(f"Attempting to {action} using TCP command: {command.strip()}")
         try:
-            success, response = await tcp_client.send_command(
-                command, response_terminator=response_terminator
+            success, response = await self.command_scheduler.send_command(
+                command, priority, response_terminator=response_terminator
             )
             if success:
                 _LOGGER.info(
@@ -100,246 +512,422 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
             _LOGGER.error(f"Exception during {action} TCP command: {e}", exc_info=True)
             return False, str(e)
 
-    async def _fetch_bed_leveling_status(self) -> dict:
-        """Fetches and parses bed leveling status from M420 command."""
-        status_data = {API_ATTR_BED_LEVELING_STATUS: None}
-        command = "~M420\r\n"
-        action = "FETCH BED LEVELING STATUS (M420)"
-
-        tcp_client = FlashforgeTCPClient(self.host, DEFAULT_MCODE_PORT)
-        _LOGGER.debug(f"Attempting to {action} using TCP command: {command.strip()}")
+    async def run_macro(
+        self, macro: Macro, priority: int = PRIORITY_INTERACTIVE
+    ) -> MacroResult:
+        """
+        Runs several M/G-codes as one uninterrupted sequence (see macros.py).
 
+        Each step must be acknowledged before the next is sent; after a failed
+        step the rest is skipped, but the macro's rollback steps still run.
+        """
+        _LOGGER.info(
+            f"Attempting to {macro.name} using TCP commands: {[c.strip() for c in macro.steps]}"
+            + (f", then {[c.strip() for c in macro.rollback]}" if macro.rollback else "")
+        )
         try:
-            success, response = await tcp_client.send_command(command, response_terminator="ok\r\n")
-            if success and response:
-                _LOGGER.debug(f"Raw response for {action}: {response}")
-                response_lower = response.lower()
-                if "bed leveling is on" in response_lower:
-                    status_data[API_ATTR_BED_LEVELING_STATUS] = True
-                elif "bed leveling is off" in response_lower:
-                    status_data[API_ATTR_BED_LEVELING_STATUS] = False
-                else:
-                    _LOGGER.debug(f"Could not determine bed leveling status from M420 response: {response[:200]}")
-                _LOGGER.debug(f"Parsed bed leveling data: {status_data}")
-            elif success:
-                _LOGGER.warning(f"{action} command sent, but no parseable data in response: {response}")
-            else:
-                _LOGGER.error(f"Failed to send {action} command. Response/Error: {response}")
+            result = await self.command_scheduler.run_macro(macro, priority)
         except Exception as e:
-            _LOGGER.error(f"Exception during {action} TCP command: {e}", exc_info=True)
+            _LOGGER.error(f"Exception during {macro.name} TCP commands: {e}", exc_info=True)
+            return MacroResult(macro.name, skipped=[c.strip() for c in macro.steps])
 
-        if hasattr(tcp_client, '_writer') and tcp_client._writer and not tcp_client._writer.is_closing():
-            tcp_client.close()
+        if result.success:
+            _LOGGER.info(
+                f"Successfully sent {macro.name} commands. Response: {result.response or 'N/A'}"
+            )
+        else:
+            _LOGGER.error(
+                f"Failed to run {macro.name}: step {result.failed_step or 'N/A'} failed, "
+                f"skipped {result.skipped}, rollback {'ok' if result.rollback_ok else 'FAILED'}. "
+                f"Response/Error: {result.response or 'N/A'}"
+            )
+        return result
 
-        return status_data
+    def request_tcp_probe(self, *probes: str) -> None:
+        """
+        Marks TCP probes to be refreshed on the next poll regardless of their tier.
 
-    async def _fetch_endstop_status(self) -> dict:
-        """Fetches and parses endstop status from M119 command."""
-        endstop_data = {
-            API_ATTR_X_ENDSTOP_STATUS: None,
-            API_ATTR_Y_ENDSTOP_STATUS: None,
-            API_ATTR_Z_ENDSTOP_STATUS: None,
-            API_ATTR_FILAMENT_ENDSTOP_STATUS: None, # Initialize, will remain None if not reported
-        }
-        action = "FETCH ENDSTOP STATUS (M119)"
-        command = "~M119\r\n"
+        Use this after commands that are known to change slow-moving data, e.g.
+        bed leveling (M420) after G29.
+        """
+        self._requested_probes.update(probes)
 
-        tcp_client = FlashforgeTCPClient(self.host, DEFAULT_MCODE_PORT)
-        _LOGGER.debug(f"Attempting to {action} using TCP command: {command.strip()}")
+    def _due_tcp_probes(self) -> list[str]:
+        """
+        Returns the TCP probes whose refresh interval has elapsed or that were requested.
 
-        try:
-            success, response = await tcp_client.send_command(command, response_terminator="ok\r\n")
-            if success and response:
-                _LOGGER.debug(f"Raw response for {action}: {response}")
-                # Marlin typically responds with one line per endstop, e.g.:
-                # x_min:open
-                # y_min:open
-                # z_min:TRIGGERED
-                # filament:open (or some other key for filament sensor)
-                lines = response.lower().split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if "x_min:" in line:
-                        endstop_data[API_ATTR_X_ENDSTOP_STATUS] = "triggered" in line
-                    elif "y_min:" in line:
-                        endstop_data[API_ATTR_Y_ENDSTOP_STATUS] = "triggered" in line
-                    elif "z_min:" in line:
-                        endstop_data[API_ATTR_Z_ENDSTOP_STATUS] = "triggered" in line
-                    # Adjust "filament" based on actual M119 output key for filament sensor
-                    elif "filament" in line:
-                        endstop_data[API_ATTR_FILAMENT_ENDSTOP_STATUS] = "triggered" in line
-
-                _LOGGER.debug(f"Parsed endstop data: {endstop_data}")
-
-            elif success:
-                _LOGGER.warning(f"{action} command sent, but no parseable data in response: {response}")
-            else:
-                _LOGGER.error(f"Failed to send {action} command. Response/Error: {response}")
+        Probes with an interval of None run once and afterwards only on request.
+        """
+        now = time.monotonic()
+        due = []
+        for probe, interval in PROBE_REFRESH_INTERVALS.items():
+            last_run = self._probe_last_run.get(probe)
+            if (
+                probe in self._requested_probes
+                or last_run is None
+                or (interval is not None and now - last_run >= interval)
+            ):
+                due.append(probe)
+        return due
+
+    def invalidate_printable_files(self, reason: str) -> None:
+        """Marks the cached file list stale so M661 is re-fetched on the next poll."""
+        _LOGGER.debug(f"Printable file list refresh requested: {reason}")
+        self.request_tcp_probe(PROBE_PRINTABLE_FILES)
+
+    def _check_file_list_triggers(self, fresh_data: dict[str, Any]) -> None:
+        """Requests an M661 re-list when the fresh /detail data suggests the file list changed."""
+        detail = fresh_data.get(API_ATTR_DETAIL)
+        if not isinstance(detail, dict):
+            return
+
+        # Cheap change signal: free disk space moves whenever files are added or
+        # removed. A running upload moves it too; the new file is added to the
+        # cache directly when the upload completes.
+        if not self._upload_lock.locked() and self.file_cache.signal_changed(
+            detail.get(API_ATTR_REMAINING_DISK_SPACE)
+        ):
+            self.invalidate_printable_files("free disk space changed")
+
+        previous_detail = self.data.get(API_ATTR_DETAIL) if self.data else None
+        previous_status = (
+            previous_detail.get(API_ATTR_STATUS)
+            if isinstance(previous_detail, dict)
+            else None
+        )
+        if (
+            previous_status in PRINTING_STATES
+            and detail.get(API_ATTR_STATUS) not in PRINTING_STATES
+        ):
+            self.invalidate_printable_files("print finished")
 
-        except Exception as e:
-            _LOGGER.error(f"Exception during {action} TCP command: {e}", exc_info=True)
+    def _update_timelapse(self, fresh_data: Optional[dict[str, Any]]) -> None:
+        """
+        Starts, feeds or finishes the timelapse recording from the fresh /detail data.
 
-        # Ensure client is closed if send_command itself had an issue before its own finally
-        # This check is a bit defensive as send_command should always close.
-        if hasattr(tcp_client, '_writer') and tcp_client._writer and not tcp_client._writer.is_closing():
-            tcp_client.close()
+        A recording is finished once /detail has been unavailable for
+        TIMELAPSE_OFFLINE_GRACE seconds, so that a printer switched off
+        mid-print does not leave it open until the integration unloads.
+        """
+        detail = fresh_data.get(API_ATTR_DETAIL) if fresh_data else None
+        now = time.monotonic()
+        if not isinstance(detail, dict):
+            if (
+                self.timelapse.recording
+                and self._timelapse_detail_seen is not None
+                and now - self._timelapse_detail_seen >= TIMELAPSE_OFFLINE_GRACE
+            ):
+                _LOGGER.info(
+                    f"No printer status for {TIMELAPSE_OFFLINE_GRACE}s; finishing the timelapse recording"
+                )
+                self.timelapse.update(
+                    printing=False, paused=False, layer=None, print_file=None
+                )
+            return
+        self._timelapse_detail_seen = now
+        status = detail.get(API_ATTR_STATUS)
+        self.timelapse.update(
+            printing=status in PRINTING_STATES,
+            paused=status == PAUSED_STATE,
+            layer=detail.get(API_ATTR_PRINT_LAYER),
+            print_file=detail.get(API_ATTR_PRINT_FILE_NAME),
+        )
 
-        return endstop_data
+    def _tcp_probe_table(self) -> dict[str, tuple[str, Any, bool]]:
+        """Returns probe name -> (command, parser, parser takes raw bytes), in batch order."""
+        return {
+            PROBE_PRINTABLE_FILES: (CMD_PRINTABLE_FILES, self._parse_printable_files_list, True),
+            PROBE_COORDINATES: (CMD_COORDINATES, self._parse_coordinates, False),
+            PROBE_ENDSTOPS: (CMD_ENDSTOP_STATUS, self._parse_endstop_status, False),
+            PROBE_BED_LEVELING: (CMD_BED_LEVELING_STATUS, self._parse_bed_leveling_status, False),
+        }
+
+    def _record_probe_success(self, probe: str, finished_at: float) -> None:
+        """Marks a probe as freshly run so it is not due again before its interval."""
+        self._probe_last_run[probe] = finished_at
+        self._requested_probes.discard(probe)
+        self.stale_probes.discard(probe)
 
-    async def _fetch_printable_files_list(self) -> list[str]:
+    async def _fetch_tcp_telemetry(
+        self, probes: Optional[list[str]] = None
+    ) -> dict[str, Any]:
         """
-        Fetches the list of printable files using TCP M-code ~M661.
-        Expected M661 response format (observed):
-        CMD M661 Received.\r\nok\r\n  (optional prefix, may vary or be absent)
-        DD\x00\x00\x00\x1b::\xa3\xa3\x00\x00\x00/data/user/filament_config/ASA.txt::\x00\x00\x00/data/user/filament_config/PETG.txt...
-        (The "DD..." part might be specific to some firmware/printer responses, separator seems to be "::\x00\x00\x00")
-        The actual file paths start with /data/
+        Runs the given TCP probes (default: all) as one pipelined batch.
+
+        The queries are written to the M-code port in a single write and
+        their replies are split per command by the TCP client, so the sweep
+        costs about one round trip instead of one per probe. M661's binary file
+        listing trails its 'ok' and is read up to its announced entry count
+        (see file_list.file_listing_end), whether it is first, last or alone
+        in the batch. Replies are fetched as raw bytes; only the text
+        probes are decoded, the M661 listing is parsed from the bytes.
+
+        Returns:
+            A dict keyed by probe name ("printable_files", "coordinates",
+            "endstops", "bed_leveling") holding the parsed value of each probe
+            whose command succeeded. Failed probes are left out so that the
+            caller keeps their previous values and retries them on the next poll.
         """
-        tcp_client = FlashforgeTCPClient(self.host, DEFAULT_MCODE_PORT)
-        command = "~M661\r\n"
-        action = "FETCH PRINTABLE FILES"
-        files_list = []
+        probe_table = self._tcp_probe_table()
+        selected = [
+            probe for probe in probe_table if probes is None or probe in probes
+        ]
+        if not selected:
+            return {}
+
+        commands = [probe_table[probe][0] for probe in selected]
+        _LOGGER.debug(
+            f"Attempting to FETCH TCP TELEMETRY using batched TCP commands: {[c.strip() for c in commands]}"
+        )
+        started = time.monotonic()
+        results = await self.command_scheduler.send_commands(
+            commands, PRIORITY_BACKGROUND, raw=True
+        )
+        now = time.monotonic()
+        self.metrics.observe(PHASE_TCP_BATCH, now - started)
+
+        telemetry: dict[str, Any] = {}
+        for probe, (success, response) in zip(selected, results):
+            _, parser, binary = probe_table[probe]
+            success, parsed = self._parse_probe_reply(
+                probe, parser, binary, success, response
+            )
+            if success:
+                telemetry[probe] = parsed
+                self._record_probe_success(probe, now)
+        self.metrics.observe(PHASE_PARSE, time.monotonic() - now)
+        return telemetry
+
+    def _parse_probe_reply(
+        self, probe: str, parser, binary: bool, success: bool, response: bytes
+    ) -> tuple[bool, Any]:
+        """
+        Parses a raw probe reply and counts its bytes and failures.
+
+        An M661 listing that holds fewer entries than its header announced
+        parses to None and counts as a failed probe, so the cached file list
+        is kept and the probe stays requested for the next poll.
+        """
+        self.metrics.increment(COUNTER_TCP_BYTES_RECEIVED, len(response))
+        parsed = parser(success, response if binary else decode_response(response))
+        if success and probe == PROBE_PRINTABLE_FILES and parsed is None:
+            success = False
+        if not success:
+            self.metrics.increment(f"{COUNTER_PROBE_FAILURES}.{probe}")
+        return success, parsed
+
+    async def _fetch_tcp_telemetry_concurrently(
+        self, probes: Optional[list[str]] = None
+    ) -> dict[str, Any]:
+        """
+        Runs the given TCP probes (default: all) at the same time, each on its own connection.
 
-        _LOGGER.debug(f"Attempting to {action} using TCP command: {command.strip()}")
+        For firmware that needs a connection per command: the sweep then takes
+        about as long as the slowest probe instead of the sum of all of them.
+        At most TCP_PROBE_CONCURRENCY connections are open to the printer at
+        once. The duration of each probe is recorded in the metrics under the
+        probe name.
 
-        try:
-            success, response = await tcp_client.send_command(
-                command, response_terminator="ok\r\n"
+        Returns:
+            The same dict as _fetch_tcp_telemetry.
+        """
+        probe_table = self._tcp_probe_table()
+        selected = [
+            probe for probe in probe_table if probes is None or probe in probes
+        ]
+        if not selected:
+            return {}
+        _LOGGER.debug(f"Attempting to FETCH TCP TELEMETRY concurrently: {selected}")
+        tasks = {
+            probe: asyncio.ensure_future(
+                self._run_tcp_probe(probe, *probe_table[probe])
+            )
+            for probe in selected
+        }
+        # Probes still running at the poll deadline are cancelled
+        _, pending = await asyncio.wait(tasks.values(), timeout=self._time_left())
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            self._mark_probes_stale(
+                probe for probe, task in tasks.items() if task in pending
             )
 
-            if success and response:
-                _LOGGER.debug(f"Raw response for {action}: {response}")
+        telemetry: dict[str, Any] = {}
+        now = time.monotonic()
+        for probe, task in tasks.items():
+            if task in pending:
+                continue
+            if task.exception() is not None:
+                _LOGGER.error(f"TCP probe '{probe}' failed: {task.exception()}")
+                self.metrics.increment(f"{COUNTER_PROBE_FAILURES}.{probe}")
+                continue
+            success, parsed = task.result()
+            if success:
+                telemetry[probe] = parsed
+                self._record_probe_success(probe, now)
+        return telemetry
+
+    async def _run_tcp_probe(
+        self, probe: str, command: str, parser, binary: bool
+    ) -> tuple[bool, Any]:
+        """Sends one probe command on a dedicated connection and parses the reply."""
+        async with self._probe_semaphore:
+            client = FlashforgeTCPClient(
+                self.host,
+                DEFAULT_MCODE_PORT,
+                read_size=MCODE_READ_SIZE,
+                max_response_size=MCODE_MAX_RESPONSE_SIZE,
+                rtt=self._mcode_rtt,
+                # M661 is sent alone here; its listing trails the 'ok'
+                reply_framers=MCODE_REPLY_FRAMERS,
+            )
+            started = time.monotonic()
+            success, response = await client.send_command(command, raw=True)
+            self.metrics.observe(probe, time.monotonic() - started)
+        started = time.monotonic()
+        success, parsed = self._parse_probe_reply(
+            probe, parser, binary, success, response
+        )
+        self.metrics.observe(PHASE_PARSE, time.monotonic() - started)
+        return success, parsed
 
-                payload_str = response
-                # Remove known prefixes like "CMD M661 Received.\r\nok\r\n"
-                # The client might have already stripped some part of it if "ok\r\n" was found early.
-                # A more robust way is to find where the actual data starts.
-                # The Wireshark log showed "D\xaa\xaaD\x00\x00\x00\x1b::\xa3\xa3\x00\x00\x00//data/..."
-                # and the first part of the logged payload was "DD\x00\x00\x00\x1b::\xa3\xa3\x00\x00\x00//data/..."
-                # This suggests the actual file data starts after the first "ok\r\n".
-                # Let's assume `payload_str` contains the data after "ok\r\n".
+    def _parse_bed_leveling_status(self, success: bool, response: str) -> dict:
+        """Parses bed leveling status from an M420 response."""
+        status_data = {API_ATTR_BED_LEVELING_STATUS: None}
+        action = "FETCH BED LEVELING STATUS (M420)"
 
-                prefix_to_strip = "CMD M661 Received.\r\nok\r\n"
-                if response.startswith(prefix_to_strip):
-                    payload_str = response[len(prefix_to_strip) :]
-                elif response.startswith("ok\r\n"):
-                    payload_str = response[len("ok\r\n") :]
+        if success and response:
+            _LOGGER.debug(f"Raw response for {action}: {response}")
+            response_lower = response.lower()
+            if "bed leveling is on" in response_lower:
+                status_data[API_ATTR_BED_LEVELING_STATUS] = True
+            elif "bed leveling is off" in response_lower:
+                status_data[API_ATTR_BED_LEVELING_STATUS] = False
+            else:
+                _LOGGER.debug(f"Could not determine bed leveling status from M420 response: {response[:200]}")
+            _LOGGER.debug(f"Parsed bed leveling data: {status_data}")
+        elif success:
+            _LOGGER.warning(f"{action} command sent, but no parseable data in response: {response}")
+        else:
+            _LOGGER.error(f"Failed to send {action} command. Response/Error: {response}")
 
-                _LOGGER.debug(
-                    f"Payload for M661 parsing after stripping initial 'ok': '{payload_str[:200]}...'"
-                )  # Log start of payload
+        return status_data
 
-                # Separator after UTF-8 decoding with errors='ignore' (drops £)
-                separator = "::\x00\x00\x00"  # Per observation
-                parts = payload_str.split(separator)
-                _LOGGER.debug(
-                    f"Splitting M661 payload with separator '{repr(separator)}'. Number of parts: {len(parts)}. First few parts if any: {parts[:5]}"
-                )
+    def _parse_endstop_status(self, success: bool, response: str) -> dict:
+        """Parses endstop status from an M119 response."""
+        endstop_data = {
+            API_ATTR_X_ENDSTOP_STATUS: None,
+            API_ATTR_Y_ENDSTOP_STATUS: None,
+            API_ATTR_Z_ENDSTOP_STATUS: None,
+            API_ATTR_FILAMENT_ENDSTOP_STATUS: None, # Initialize, will remain None if not reported
+        }
+        action = "FETCH ENDSTOP STATUS (M119)"
 
-                if len(parts) <= 1 and payload_str:
-                    _LOGGER.warning(
-                        "M661 parsing: Separator '%s' not found or produced no splits in non-empty payload: %s",
-                        repr(separator),
-                        payload_str[:100] + "...",
-                    )
+        if success and response:
+            _LOGGER.debug(f"Raw response for {action}: {response}")
+            # Marlin typically responds with one line per endstop, e.g.:
+            # x_min:open
+            # y_min:open
+            # z_min:TRIGGERED
+            # filament:open (or some other key for filament sensor)
+            lines = response.lower().split('\n')
+            for line in lines:
+                line = line.strip()
+                if "x_min:" in line:
+                    endstop_data[API_ATTR_X_ENDSTOP_STATUS] = "triggered" in line
+                elif "y_min:" in line:
+                    endstop_data[API_ATTR_Y_ENDSTOP_STATUS] = "triggered" in line
+                elif "z_min:" in line:
+                    endstop_data[API_ATTR_Z_ENDSTOP_STATUS] = "triggered" in line
+                # Adjust "filament" based on actual M119 output key for filament sensor
+                elif "filament" in line:
+                    endstop_data[API_ATTR_FILAMENT_ENDSTOP_STATUS] = "triggered" in line
+
+            _LOGGER.debug(f"Parsed endstop data: {endstop_data}")
+
+        elif success:
+            _LOGGER.warning(f"{action} command sent, but no parseable data in response: {response}")
+        else:
+            _LOGGER.error(f"Failed to send {action} command. Response/Error: {response}")
 
-                for part in parts:
-                    path_start_index = part.find("/data/")
-                    if path_start_index != -1:
-                        file_path = part[path_start_index:]
-                        _LOGGER.debug(
-                            f"M661 parsing - Extracted file_path candidate: '{file_path}'"
-                        )
-                        if file_path:
-                            cleaned_path = "".join(
-                                filter(lambda x: x.isprintable(), file_path)
-                            ).strip()
-                            _LOGGER.debug(
-                                f"M661 parsing - Cleaned path: '{cleaned_path}', Starts with /data/ and ends with .gcode/.gx: {cleaned_path.startswith('/data/') and cleaned_path.endswith(('.gcode', '.gx'))}"
-                            )
-                            if cleaned_path.startswith(
-                                "/data/"
-                            ) and cleaned_path.endswith((".gcode", ".gx")):
-                                files_list.append(cleaned_path)
-                    else:
-                        if (
-                            part.strip()
-                        ):  # Log only if part contains something other than whitespace
-                            _LOGGER.debug(
-                                "M661 parsing: '/data/' not found in part: '%s'",
-                                part[:100] + "...",
-                            )
-
-                if files_list:
-                    _LOGGER.info(f"Successfully parsed file list: {files_list}")
-                else:
-                    _LOGGER.warning(
-                        "File list parsing resulted in empty list. This may be due to an unexpected response format, "
-                        "no files on printer, or parsing issues. Raw payload sample after prefix: %s",
-                        payload_str[:200] + "...",
-                    )
+        return endstop_data
 
-            elif (
-                success
-            ):  # Command sent, but response might be empty or not what we expected
-                _LOGGER.warning(
-                    f"{action} command sent, but no valid file list data in response: '{response[:200]}...'"
-                )
-            else:
-                _LOGGER.error(
-                    f"Failed to send {action} command. Response/Error: {response}"
-                )
+    def _parse_printable_files_list(
+        self, success: bool, response: bytes
+    ) -> Optional[list[str]]:
+        """
+        Parses the list of printable files from a raw M661 response.
+        Expected M661 response format (observed):
+        CMD M661 Received.\r\nok\r\n  (prefix, skipped by the parser)
+        D\xaa\xaaD\x00\x00\x00\x1b::\xa3\xa3\x00\x00\x00\x1f/data/user/model.gcode::\xa3\xa3...
+        Only paths below /data/ ending in .gcode/.gx are returned; see
+        file_list.parse_file_listing for the framing. Returns None when the
+        listing holds fewer entries than its header announced, so that the
+        caller keeps the cached list instead of storing a partial one.
+        """
+        action = "FETCH PRINTABLE FILES"
+        if not success:
+            _LOGGER.error(
+                f"Failed to send {action} command. Response/Error: {decode_response(response)}"
+            )
+            return []
 
-            return files_list
+        try:
+            files_list, complete = parse_file_listing(response)
         except Exception as e:
-            _LOGGER.error(f"Exception during {action} TCP command: {e}", exc_info=True)
+            _LOGGER.error(f"Exception while parsing {action} response: {e}", exc_info=True)
             return []
 
-    async def _fetch_coordinates(self) -> Optional[dict[str, float]]:
-        """Fetches and parses the printer's X,Y,Z coordinates using M-code ~M114."""
-        tcp_client = FlashforgeTCPClient(self.host, DEFAULT_MCODE_PORT)
-        command = "~M114\r\n"
+        if not complete:
+            _LOGGER.warning(
+                f"{action} response was incomplete ({len(files_list)} printable files parsed "
+                f"from {len(response)} bytes); keeping the previous list and retrying"
+            )
+            return None
+        if files_list:
+            _LOGGER.debug(f"Successfully parsed file list ({len(files_list)} files)")
+        else:
+            _LOGGER.warning(
+                "File list parsing resulted in empty list. This may be due to an unexpected response format, "
+                f"no files on printer, or parsing issues. Raw response sample: {response[:200]!r}"
+            )
+        return files_list
+
+    def _parse_coordinates(self, success: bool, response: str) -> Optional[dict[str, float]]:
+        """Parses the printer's X,Y,Z coordinates from an M114 response."""
         action = "FETCH COORDINATES"
         coordinates = {}
         # conversion_factor = 2.54 # Removed, assuming M114 reports in mm
 
-        _LOGGER.debug(f"Attempting to {action} using TCP command: {command.strip()}")
+        if success and response:
+            _LOGGER.debug(f"Raw response for {action}: {response}")
 
-        try:
-            success, response = await tcp_client.send_command(
-                command, response_terminator="ok\r\n"
-            )
-            if success and response:
-                _LOGGER.debug(f"Raw response for {action}: {response}")
-
-                match_x = re.search(r"X:([+-]?\d+\.?\d*)", response)
-                match_y = re.search(r"Y:([+-]?\d+\.?\d*)", response)
-                match_z = re.search(r"Z:([+-]?\d+\.?\d*)", response)
-
-                if match_x:
-                    coordinates["x"] = float(match_x.group(1))
-                if match_y:
-                    coordinates["y"] = float(match_y.group(1))
-                if match_z:
-                    coordinates["z"] = float(match_z.group(1))
-
-                if "x" in coordinates and "y" in coordinates and "z" in coordinates:
-                    _LOGGER.debug(f"Successfully parsed coordinates: {coordinates}")
-                    return coordinates
-                else:
-                    _LOGGER.warning(
-                        f"Could not parse all X,Y,Z coordinates from M114 response: {response}. Parsed: {coordinates}"
-                    )
-                    return None
+            match_x = re.search(r"X:([+-]?\d+\.?\d*)", response)
+            match_y = re.search(r"Y:([+-]?\d+\.?\d*)", response)
+            match_z = re.search(r"Z:([+-]?\d+\.?\d*)", response)
+
+            if match_x:
+                coordinates["x"] = float(match_x.group(1))
+            if match_y:
+                coordinates["y"] = float(match_y.group(1))
+            if match_z:
+                coordinates["z"] = float(match_z.group(1))
+
+            if "x" in coordinates and "y" in coordinates and "z" in coordinates:
+                _LOGGER.debug(f"Successfully parsed coordinates: {coordinates}")
+                return coordinates
             else:
-                _LOGGER.error(
-                    f"Failed to send {action} command. Response/Error: {response}"
+                _LOGGER.warning(
+                    f"Could not parse all X,Y,Z coordinates from M114 response: {response}. Parsed: {coordinates}"
                 )
                 return None
-        except Exception as e:
-            _LOGGER.error(f"Exception during {action} TCP command: {e}", exc_info=True)
+        else:
+            _LOGGER.error(
+                f"Failed to send {action} command. Response/Error: {response}"
+            )
             return None
-        return None  # Should not be reached, but linters might prefer it.
 
     async def _async_update_data(self):
         # Determine current polling interval based on self.data from PREVIOUS poll
@@ -350,10 +938,41 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
         # at the end of the *previous* execution of _async_update_data.
 
         # Fetch new data
-        fresh_data = await self._fetch_data()
+        started = time.monotonic()
+        previous_connection_state = self.connection_state
+        interval = self.update_interval.total_seconds() if self.update_interval else None
+        budget = self.poll_budget
+        # Every request and probe of this poll must finish by this deadline
+        self._poll_deadline = started + budget if budget is not None else None
+        try:
+            fresh_data = await self._fetch_data()
+        finally:
+            self._poll_deadline = None
+            elapsed = time.monotonic() - started
+            self.metrics.increment(COUNTER_POLLS)
+            self.metrics.observe(PHASE_POLL, elapsed)
+            if budget is not None and elapsed > budget:
+                self.metrics.increment(COUNTER_POLL_OVERRUNS)
+                _LOGGER.debug(f"Poll took {elapsed:.2f}s, over its {budget:.2f}s deadline")
+            if interval and elapsed >= interval:
+                self.metrics.increment(COUNTER_SKIPPED_TICKS, int(elapsed // interval))
+
+        # Work out what changed so entities can skip writing unchanged state
+        changed_keys = self._diff_data(self.data, fresh_data)
+        if changed_keys is not None and self.connection_state != previous_connection_state:
+            changed_keys = changed_keys | {DATA_KEY_CONNECTION_STATE}
+        self.changed_keys = changed_keys
+        if self.timelapse is not None:
+            self._update_timelapse(fresh_data)
 
         # Now, based on fresh_data, decide what the *next* interval should be.
-        if fresh_data:
+        if self.circuit_breaker.is_open:
+            # Printer unreachable: only probe it, at the breaker's growing interval
+            probe_interval = self.circuit_breaker.probe_interval
+            if self.update_interval.total_seconds() != probe_interval:
+                self.update_interval = timedelta(seconds=probe_interval)
+                _LOGGER.debug(f"FlashForge coordinator probing every {probe_interval} seconds while the printer is unreachable")
+        elif fresh_data:
             printer_status_detail = fresh_data.get(API_ATTR_DETAIL, {})
             current_printer_status = printer_status_detail.get(API_ATTR_STATUS) if isinstance(printer_status_detail, dict) else None
 
@@ -375,56 +994,213 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
 
         return fresh_data
 
-    async def _fetch_data(self):
-        """Fetch data from HTTP /detail endpoint and, on subsequent updates, files/coords via TCP."""
-        current_data = {}  # Data for this specific fetch run
+    async def _probe_printer(self) -> bool:
+        """
+        Checks whether the printer accepts a TCP connection on its HTTP port.
+
+        Called instead of a full poll while the circuit breaker is open. A
+        successful probe half-opens the breaker so this poll tries /detail.
+        """
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, DEFAULT_PORT),
+                timeout=CIRCUIT_PROBE_TIMEOUT,
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            self.circuit_breaker.record_failure()
+            self.connection_state = CONNECTION_STATE_DISCONNECTED
+            _LOGGER.debug(
+                f"Printer at {self.host} still unreachable ({e!r}); next probe in "
+                f"{self.circuit_breaker.probe_interval}s"
+            )
+            return False
+        writer.close()
+        _LOGGER.info(f"Printer at {self.host} accepts connections again; trying a full poll")
+        self.circuit_breaker.attempt_reset()
+        return True
+
+    def _record_poll_result(self, success: bool) -> None:
+        """Updates the circuit breaker with the outcome of a full poll."""
+        if success:
+            # Keep the safety connection ready while the printer is reachable.
+            self.command_scheduler.ensure_safety_lane()
+            if self.circuit_breaker.record_success():
+                _LOGGER.info(f"Printer at {self.host} is back; resuming regular polling")
+        elif self.circuit_breaker.record_failure():
+            _LOGGER.warning(
+                f"Printer at {self.host} did not answer {self.circuit_breaker.consecutive_failures} "
+                f"polls in a row; pausing polls and checking for it every "
+                f"{self.circuit_breaker.probe_interval}s until it is back"
+            )
+
+    async def _fetch_detail(self, attempts: int = MAX_RETRIES) -> Optional[dict[str, Any]]:
+        """
+        Fetches and validates the HTTP /detail status, retrying with backoff.
+
+        Args:
+            attempts: How many times to try before giving up.
 
-        # Step 1: Fetch main status data via HTTP
+        Returns:
+            The validated response, or None if it could not be fetched.
+        """
         url = f"http://{self.host}:{DEFAULT_PORT}{ENDPOINT_DETAIL}"
         payload = {"serialNumber": self.serial_number, "checkCode": self.check_code}
         retries = 0
         delay = RETRY_DELAY
-        http_fetch_successful = False
-
-        while retries < MAX_RETRIES:
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        url, json=payload, timeout=TIMEOUT_API_CALL
-                    ) as resp:
-                        resp.raise_for_status()
-                        api_response_data = await resp.json(content_type=None)
-                        if self._validate_response(api_response_data):
-                            self.connection_state = CONNECTION_STATE_CONNECTED
-                            current_data = api_response_data
-                            http_fetch_successful = True
-                            _LOGGER.debug(
-                                "HTTP /detail data fetched and validated successfully."
-                            )
-                            break
-                        else:
-                            _LOGGER.warning(
-                                "Invalid response structure from /detail: %s",
-                                api_response_data,
-                            )
-                            self.connection_state = CONNECTION_STATE_DISCONNECTED
-                            current_data = {}
-                            http_fetch_successful = False
+        started = time.monotonic()
+
+        rtt = self._http_rtt_for(ENDPOINT_DETAIL, TIMEOUT_API_CALL)
+
+        try:
+            while retries < attempts:
+                timeout = self._time_left(rtt.timeout)
+                if timeout <= 0:
+                    _LOGGER.debug("Poll deadline reached before /detail could be fetched.")
+                    break
+                try:
+                    api_response_data = await self._hedged_detail_request(
+                        url, payload, timeout
+                    )
+                    if self._validate_response(api_response_data):
+                        self.connection_state = CONNECTION_STATE_CONNECTED
+                        _LOGGER.debug(
+                            "HTTP /detail data fetched and validated successfully."
+                        )
+                        return api_response_data
+                    _LOGGER.warning(
+                        "Invalid response structure from /detail: %s",
+                        api_response_data,
+                    )
+                    self.connection_state = CONNECTION_STATE_DISCONNECTED
+                    self.metrics.increment(COUNTER_DETAIL_FAILURES)
+                    return None
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    _LOGGER.warning(
+                        "Fetch attempt %d for /detail failed: %s", retries + 1, e
+                    )
+                    retries += 1
+                    if retries < attempts:
+                        if self._time_left(delay) < delay:
+                            _LOGGER.debug("Poll deadline reached; not retrying /detail.")
                             break
-            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-                _LOGGER.warning(
-                    "Fetch attempt %d for /detail failed: %s", retries + 1, e
+                        self.metrics.increment(COUNTER_DETAIL_RETRIES)
+                        await asyncio.sleep(delay)
+                        delay *= BACKOFF_FACTOR
+
+            _LOGGER.error(f"Could not fetch /detail after {retries} attempt(s).")
+            self.connection_state = CONNECTION_STATE_DISCONNECTED
+            self.metrics.increment(COUNTER_DETAIL_FAILURES)
+            return None
+        finally:
+            self.metrics.observe(PHASE_DETAIL, time.monotonic() - started)
+
+    async def _request_detail(
+        self, url: str, payload: dict[str, Any], timeout: float
+    ) -> Any:
+        """POSTs /detail once and returns the decoded JSON, timing the round trip."""
+        rtt = self._http_rtt_for(ENDPOINT_DETAIL, TIMEOUT_API_CALL)
+        started = time.monotonic()
+        try:
+            session = self._get_http_session()
+            async with session.post(url, json=payload, timeout=timeout) as resp:
+                resp.raise_for_status()
+                body = await resp.read()
+                rtt.observe(time.monotonic() - started)
+                self.metrics.increment(COUNTER_HTTP_BYTES_RECEIVED, len(body))
+                return await resp.json(content_type=None)
+        except asyncio.TimeoutError:
+            rtt.on_timeout()
+            raise
+
+    async def _hedged_detail_request(
+        self, url: str, payload: dict[str, Any], timeout: float
+    ) -> Any:
+        """
+        Requests /detail, sending a second request if the first one is slow.
+
+        Once enough latencies were observed, a request still unanswered after
+        their HEDGE_PERCENTILE gets an identical second request on the other
+        pooled connection. The first successful answer is returned and the
+        other request is cancelled; if both fail, the last error is raised.
+        """
+        hedge_after = self._http_rtt_for(ENDPOINT_DETAIL, TIMEOUT_API_CALL).percentile(
+            HEDGE_PERCENTILE, HEDGE_MIN_SAMPLES
+        )
+        first = asyncio.ensure_future(self._request_detail(url, payload, timeout))
+        if hedge_after is None or hedge_after >= timeout:
+            return await first
+
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if done:
+            return first.result()
+
+        _LOGGER.debug(
+            f"/detail slower than {hedge_after * 1000:.0f} ms; sending a hedged request"
+        )
+        self.metrics.increment(COUNTER_HEDGED_REQUESTS)
+        second = asyncio.ensure_future(
+            self._request_detail(url, payload, timeout - hedge_after)
+        )
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
                 )
-                retries += 1
-                if retries < MAX_RETRIES:
-                    await asyncio.sleep(delay)
-                    delay *= BACKOFF_FACTOR
-                else:
-                    _LOGGER.error("Max retries exceeded for /detail fetching.")
-                    self.connection_state = CONNECTION_STATE_DISCONNECTED
-                    current_data = {}
-                    http_fetch_successful = False
-                    break
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.metrics.increment(COUNTER_HEDGE_WINS)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _fetch_data(self):
+        """Fetch data from HTTP /detail endpoint and, on subsequent updates, files/coords via TCP."""
+        telemetry: Optional[dict[str, Any]] = None
+
+        # Step 0: While the circuit breaker is open (printer off), only check
+        # whether the printer accepts connections again before polling it.
+        skip_poll = self.circuit_breaker.is_open and not await self._probe_printer()
+
+        # Step 1: Fetch main status data via HTTP. In concurrent probe mode the
+        # due TCP probes run at the same time, each on its own connection.
+        if skip_poll:
+            detail_result = None
+        elif (
+            self.concurrent_probes
+            and self.data
+            and not self.circuit_breaker.is_half_open
+        ):
+            due_probes = self._due_tcp_probes()
+            detail_result, telemetry_result = await asyncio.gather(
+                self._fetch_detail(),
+                self._fetch_tcp_telemetry_concurrently(due_probes),
+                return_exceptions=True,
+            )
+            if isinstance(detail_result, BaseException):
+                raise detail_result
+            if isinstance(telemetry_result, BaseException):
+                _LOGGER.error(
+                    f"Failed to fetch TCP telemetry during update: {telemetry_result}"
+                )
+                telemetry = {}
+            else:
+                telemetry = telemetry_result
+        else:
+            # A half-open breaker gets a single attempt instead of the retries
+            detail_result = await self._fetch_detail(
+                attempts=1 if self.circuit_breaker.is_half_open else MAX_RETRIES
+            )
+
+        http_fetch_successful = detail_result is not None
+        if not skip_poll:
+            self._record_poll_result(http_fetch_successful)
+        current_data = detail_result if http_fetch_successful else {}
 
         # Initialize keys that will be populated by TCP calls or from previous data
         current_data["printable_files"] = (
@@ -443,51 +1219,52 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
 
         # Step 2: Fetch TCP data only if HTTP was successful and it's not the first run for the coordinator
         # self.data will be empty on the very first run initiated by async_refresh in __init__
-        if http_fetch_successful and self.data:
+        if telemetry is not None:
+            # Concurrent mode already ran the probes; file list triggers found
+            # in this /detail reply take effect on the next poll.
+            if http_fetch_successful:
+                self._check_file_list_triggers(current_data)
+        elif http_fetch_successful and self.data:
             _LOGGER.debug(
                 "Attempting to fetch TCP data (files, coordinates, endstops, bed leveling) on a subsequent update."
             )
-            try:
-                files_list = await self._fetch_printable_files_list()
-                current_data["printable_files"] = files_list
-            except Exception as e:
-                _LOGGER.error(
-                    f"Failed to fetch printable files list during update: {e}",
-                    exc_info=True,
-                )
-                current_data["printable_files"] = self.data.get("printable_files", [])
-
-            try:
-                coords = await self._fetch_coordinates()
-                if coords:
-                    current_data["x_position"] = coords.get("x")
-                    current_data["y_position"] = coords.get("y")
-                    current_data["z_position"] = coords.get("z")
-                else:
-                    current_data["x_position"] = self.data.get("x_position")
-                    current_data["y_position"] = self.data.get("y_position")
-                    current_data["z_position"] = self.data.get("z_position")
-            except Exception as e:
-                _LOGGER.error(
-                    f"Failed to fetch coordinates during update: {e}", exc_info=True
-                )
-                current_data["x_position"] = self.data.get("x_position")
-                current_data["y_position"] = self.data.get("y_position")
-                current_data["z_position"] = self.data.get("z_position")
-
-            try:
-                endstop_status = await self._fetch_endstop_status()
-                current_data.update(endstop_status)
-            except Exception as e:
-                _LOGGER.error(f"Failed to fetch endstop status during update: {e}", exc_info=True)
-
-            try:
-                bed_level_status = await self._fetch_bed_leveling_status()
-                current_data.update(bed_level_status)
-            except Exception as e:
-                _LOGGER.error(f"Failed to fetch bed leveling status during update: {e}", exc_info=True)
-
-        elif http_fetch_successful and not self.data:
+            self._check_file_list_triggers(current_data)
+            due_probes = self._due_tcp_probes()
+            telemetry = {}
+            if due_probes:
+                time_left = self._time_left()
+                try:
+                    if time_left is not None and time_left <= 0:
+                        raise asyncio.TimeoutError
+                    telemetry = await asyncio.wait_for(
+                        self._fetch_tcp_telemetry(due_probes), timeout=time_left
+                    )
+                except asyncio.TimeoutError:
+                    self._mark_probes_stale(due_probes)
+                except Exception as e:
+                    _LOGGER.error(
+                        f"Failed to fetch TCP telemetry during update: {e}", exc_info=True
+                    )
+            else:
+                _LOGGER.debug("No TCP probes due this poll; reusing previous values.")
+
+        if telemetry:
+            if telemetry.get(PROBE_PRINTABLE_FILES) is not None:
+                self.file_cache.update(telemetry[PROBE_PRINTABLE_FILES])
+                current_data["printable_files"] = self.file_cache.paths
+
+            coords = telemetry.get(PROBE_COORDINATES)
+            if coords:
+                current_data["x_position"] = coords.get("x")
+                current_data["y_position"] = coords.get("y")
+                current_data["z_position"] = coords.get("z")
+
+            if PROBE_ENDSTOPS in telemetry:
+                current_data.update(telemetry[PROBE_ENDSTOPS])
+            if PROBE_BED_LEVELING in telemetry:
+                current_data.update(telemetry[PROBE_BED_LEVELING])
+
+        if http_fetch_successful and not self.data:
             _LOGGER.debug(
                 "Initial successful HTTP data fetch. Deferring TCP data (files, coords, endstops, bed leveling) for next update."
             )
@@ -570,28 +1347,33 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
             payload.update(extra_payload)
 
         _LOGGER.debug(f"Sending HTTP command to {url} with payload: {payload}")
+        rtt = self._http_rtt_for(endpoint, COORDINATOR_COMMAND_TIMEOUT)
+        started = time.monotonic()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url, json=payload, timeout=COORDINATOR_COMMAND_TIMEOUT
-                ) as resp:
-                    response_text = await resp.text()
-                    _LOGGER.debug(
-                        f"HTTP command to {endpoint} status: {resp.status}, response: {response_text}"
+            session = self._get_http_session()
+            async with session.post(
+                url, json=payload, timeout=rtt.timeout
+            ) as resp:
+                response_text = await resp.text()
+                rtt.observe(time.monotonic() - started)
+                _LOGGER.debug(
+                    f"HTTP command to {endpoint} status: {resp.status}, response: {response_text}"
+                )
+                if resp.status == 200:
+                    if expect_json_response:
+                        return await resp.json(content_type=None)
+                    return {
+                        "status": "success_http_200",
+                        "raw_response": response_text,
+                    }
+                else:
+                    _LOGGER.error(
+                        f"HTTP command to {endpoint} failed with status {resp.status}. Response: {response_text}"
                     )
-                    if resp.status == 200:
-                        if expect_json_response:
-                            return await resp.json(content_type=None)
-                        return {
-                            "status": "success_http_200",
-                            "raw_response": response_text,
-                        }
-                    else:
-                        _LOGGER.error(
-                            f"HTTP command to {endpoint} failed with status {resp.status}. Response: {response_text}"
-                        )
-                        return None
+                    return None
         except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if isinstance(e, asyncio.TimeoutError):
+                rtt.on_timeout()
             _LOGGER.error(
                 f"Error sending HTTP command to {endpoint}: {e}", exc_info=True
             )
@@ -600,7 +1382,9 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
 
     async def pause_print(self):
         """Pauses the current print using TCP M-code ~M25."""
-        success, _ = await self._send_tcp_command("~M25\r\n", "PAUSE PRINT")
+        success, _ = await self._send_tcp_command(
+            "~M25\r\n", "PAUSE PRINT", priority=PRIORITY_SAFETY
+        )
         return success
 
     async def resume_print(self):
@@ -646,10 +1430,13 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
                 f"Invalid extruder temperature: {temperature}. Must be between 0 and 300."
             )
             return False
-        command = f"~M104 S{temperature}\r\n"
-        action = f"SET EXTRUDER TEMPERATURE to {temperature}°C"
-        success, _ = await self._send_tcp_command(command, action)
-        return success
+        return await self.command_coalescer.submit(
+            "extruder_temperature",
+            temperature,
+            lambda value: Macro(
+                f"SET EXTRUDER TEMPERATURE to {value}°C", [f"~M104 S{value}\r\n"]
+            ),
+        )
 
     async def set_bed_temperature(self, temperature: int):
         """Sets the bed temperature using TCP M-code ~M140."""
@@ -658,25 +1445,31 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
                 f"Invalid bed temperature: {temperature}. Must be between 0 and 120."
             )
             return False
-        command = f"~M140 S{temperature}\r\n"
-        action = f"SET BED TEMPERATURE to {temperature}°C"
-        success, _ = await self._send_tcp_command(command, action)
-        return success
+        return await self.command_coalescer.submit(
+            "bed_temperature",
+            temperature,
+            lambda value: Macro(
+                f"SET BED TEMPERATURE to {value}°C", [f"~M140 S{value}\r\n"]
+            ),
+        )
 
     async def set_fan_speed(self, speed: int):
         """Sets the fan speed using TCP M-code ~M106."""
         if not 0 <= speed <= 255:
             _LOGGER.error(f"Invalid fan speed: {speed}. Must be between 0 and 255.")
             return False
-        command = f"~M106 S{speed}\r\n"
-        action = f"SET FAN SPEED to {speed}"
-        success, _ = await self._send_tcp_command(command, action)
-        return success
+        return await self.command_coalescer.submit(
+            "fan_speed",
+            speed,
+            lambda value: Macro(f"SET FAN SPEED to {value}", [f"~M106 S{value}\r\n"]),
+        )
 
     async def turn_fan_off(self):
         """Turns the fan off using TCP M-code ~M107."""
-        success, _ = await self._send_tcp_command("~M107\r\n", "TURN FAN OFF")
-        return success
+        # Same kind as set_fan_speed: whichever was requested last is sent.
+        return await self.command_coalescer.submit(
+            "fan_speed", 0, lambda _: Macro("TURN FAN OFF", ["~M107\r\n"])
+        )
 
     async def move_axis(
         self,
@@ -687,95 +1480,265 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
     ):
         """Moves printer axes using TCP M-code G0 (or G1, G0 is usually rapid, G1 for controlled feed)."""
         # Using G0 for simplicity as per original. If feedrate control is critical, G1 might be better.
-        command_parts = ["~G0"]
-        action_parts = []
-
-        if x is not None:
-            command_parts.append(f"X{x}")
-            action_parts.append(f"X to {x}")
-        if y is not None:
-            command_parts.append(f"Y{y}")
-            action_parts.append(f"Y to {y}")
-        if z is not None:
-            command_parts.append(f"Z{z}")
-            action_parts.append(f"Z to {z}")
-
-        if not action_parts:  # No axis specified
+        axes = {
+            axis: value
+            for axis, value in (("x", x), ("y", y), ("z", z))
+            if value is not None
+        }
+        if not axes:  # No axis specified
             _LOGGER.error(
                 "Move axis command called without specifying an axis (X, Y, or Z)."
             )
             return False
 
-        if feedrate is not None:
-            if feedrate > 0:
-                command_parts.append(f"F{feedrate}")
-                action_parts.append(f"at F{feedrate}")
-            else:
-                _LOGGER.warning(
-                    f"Invalid feedrate for move axis: {feedrate}. Must be positive. Sending command without feedrate."
-                )
-
-        command = " ".join(command_parts) + "\r\n"
-        action = f"MOVE AXIS ({', '.join(action_parts)})"
-
-        success, _ = await self._send_tcp_command(command, action)
+        if feedrate is not None and feedrate <= 0:
+            _LOGGER.warning(
+                f"Invalid feedrate for move axis: {feedrate}. Must be positive. Sending command without feedrate."
+            )
+            feedrate = None
+
+        # Queued absolute moves are merged: the latest target per axis wins.
+        success = await self.command_coalescer.submit(
+            "motion",
+            (MOVE_MODE_ABSOLUTE, axes, feedrate),
+            self._render_move,
+            self._merge_moves,
+        )
+        if success:
+            self.request_tcp_probe(PROBE_COORDINATES)
         return success
 
     async def move_relative(self, x: Optional[float]=None, y: Optional[float]=None, z: Optional[float]=None, feedrate: Optional[int]=None) -> bool:
         """Moves printer axes by a relative amount using G91 then G0, then restores G90."""
         _LOGGER.info(f"Attempting relative move with offsets: x={x}, y={y}, z={z} at feedrate={feedrate}")
 
-        success_g91, _ = await self._send_tcp_command("~G91\r\n", "SET RELATIVE POSITIONING (G91)")
-        if not success_g91:
-            _LOGGER.error("Failed to set relative positioning (G91). Aborting relative move.")
-            # Attempt to restore absolute positioning just in case, though G91 failure is problematic
-            _, _ = await self._send_tcp_command("~G90\r\n", "RESTORE ABSOLUTE POSITIONING (G90) after G91 fail")
-            return False
+        axes = {
+            axis: value
+            for axis, value in (("x", x), ("y", y), ("z", z))
+            if value is not None
+        }
+        if not axes:
+            _LOGGER.warning("No axis offset provided for relative move. Nothing to send.")
+            return True
+
+        if feedrate is not None and feedrate <= 0:
+            _LOGGER.warning(f"Invalid feedrate for relative move: {feedrate}. Must be positive. Ignoring feedrate.")
+            feedrate = None
+
+        # Queued jogs are merged into one move by adding up their offsets.
+        success = await self.command_coalescer.submit(
+            "motion",
+            (MOVE_MODE_RELATIVE, axes, feedrate),
+            self._render_move,
+            self._merge_moves,
+        )
+        if success:
+            self.request_tcp_probe(PROBE_COORDINATES)
+        return success
+
+    @staticmethod
+    def _merge_moves(
+        pending: tuple[str, dict[str, float], Optional[int]],
+        new: tuple[str, dict[str, float], Optional[int]],
+    ) -> Optional[tuple[str, dict[str, float], Optional[int]]]:
+        """
+        Combines a queued move with a newer one of the same mode.
 
-        move_attempted = False
-        success_move = True  # Default to true if no move is actually made
-
-        command_parts = ["~G0"]
-        action_parts_log = []
-        if x is not None:
-            command_parts.append(f"X{x}")
-            action_parts_log.append(f"X:{x}")
-        if y is not None:
-            command_parts.append(f"Y{y}")
-            action_parts_log.append(f"Y:{y}")
-        if z is not None:
-            command_parts.append(f"Z{z}")
-            action_parts_log.append(f"Z:{z}")
-
-        if feedrate is not None and feedrate > 0:
+        Relative offsets are added up per axis, absolute targets are replaced
+        per axis, and the newer feedrate applies. Returns None for moves of
+        different modes, which must be sent one after the other.
+        """
+        mode, axes, feedrate = pending
+        new_mode, new_axes, new_feedrate = new
+        if mode != new_mode:
+            return None
+        merged = dict(axes)
+        for axis, value in new_axes.items():
+            if mode == MOVE_MODE_RELATIVE and axis in merged:
+                merged[axis] = round(merged[axis] + value, 4)
+            else:
+                merged[axis] = value
+        return mode, merged, new_feedrate if new_feedrate is not None else feedrate
+
+    @staticmethod
+    def _render_move(move: tuple[str, dict[str, float], Optional[int]]) -> Macro:
+        """Returns the macro sending a (merged) move."""
+        mode, axes, feedrate = move
+        command_parts = ["~G0"] + [f"{axis.upper()}{axes[axis]}" for axis in sorted(axes)]
+        if feedrate is not None:
             command_parts.append(f"F{feedrate}")
-            action_parts_log.append(f"F:{feedrate}")
-        elif feedrate is not None: # feedrate is 0 or negative
-             _LOGGER.warning(f"Invalid feedrate for relative move: {feedrate}. Must be positive. Ignoring feedrate.")
-
-
-        if len(command_parts) > 1:  # More than just "~G0"
-            move_attempted = True
-            move_command = " ".join(command_parts) + "\r\n"
-            relative_move_action_log = f"MOVE RELATIVE ({', '.join(action_parts_log)})"
-            success_move, _ = await self._send_tcp_command(move_command, relative_move_action_log)
-            if not success_move:
-                _LOGGER.error(f"Relative move command ({move_command.strip()}) failed.")
-        else:
-            _LOGGER.warning("No axis offset provided for relative move. Skipping G0 command.")
-            # No move was attempted, so success_move remains True
+        command = " ".join(command_parts) + "\r\n"
+        description = ", ".join(part[1:] for part in command_parts[1:])
+        if mode == MOVE_MODE_RELATIVE:
+            # G90 is restored in the same session, also if G91 or the move
+            # fails, so no other command ever runs in relative mode.
+            return Macro(
+                f"MOVE RELATIVE ({description})",
+                ["~G91\r\n", command],
+                rollback=["~G90\r\n"],
+            )
+        return Macro(f"MOVE AXIS ({description})", [command])
 
-        success_g90, _ = await self._send_tcp_command("~G90\r\n", "RESTORE ABSOLUTE POSITIONING (G90)")
-        if not success_g90:
-            _LOGGER.error("Critical: Failed to restore absolute positioning (G90) after relative move sequence.")
-            # Even if G90 fails, the overall success depends on G91 and the move itself.
-            # However, a G90 failure is a significant issue for future commands.
-            return False # G90 is critical to restore printer state for other operations
+    async def stream_gcode(
+        self,
+        lines: AsyncIterator[tuple[int, str]],
+        source: str,
+        window: int = GCODE_STREAM_WINDOW,
+        stop_on_error: bool = True,
+    ) -> GcodeStreamResult:
+        """
+        Streams G-code lines to the M-code port with a window of unacknowledged lines.
 
-        if move_attempted:
-            return success_g91 and success_move and success_g90
-        else: # No move attempted, only G91 and G90 mattered
-            return success_g91 and success_g90
+        The stream uses its own connection, so polling and other commands go
+        on meanwhile; a second stream waits for the first to finish. See
+        gcode_stream.py for line handling and the result.
+        """
+        async with self._gcode_stream_lock:
+            _LOGGER.info(f"Streaming G-code from {source} with a window of {window} line(s)")
+            client = FlashforgeTCPClient(
+                self.host,
+                DEFAULT_MCODE_PORT,
+                read_size=MCODE_READ_SIZE,
+                rtt=self._mcode_rtt,
+                # What the polling connection learned; None probes it first
+                pipelining=self._tcp_client.pipelining,
+            )
+            result = await stream_gcode(
+                client, lines, source, window, GCODE_STREAM_ACK_TIMEOUT, stop_on_error
+            )
+            self.last_gcode_stream = result
+            rate = result.lines_per_second
+            summary = (
+                f"{result.lines_acknowledged}/{result.lines_sent} line(s) of {source} acknowledged "
+                f"in {result.elapsed:.2f}s ({rate:.1f} lines/s)"
+                if rate
+                else f"{result.lines_acknowledged}/{result.lines_sent} line(s) of {source} acknowledged"
+            )
+            if result.success:
+                _LOGGER.info(f"G-code stream finished: {summary}")
+            else:
+                _LOGGER.error(
+                    f"G-code stream incomplete: {summary}, {result.error_count} failed line(s)"
+                    + (f", aborted: {result.aborted}" if result.aborted else "")
+                )
+            if result.lines_acknowledged:
+                # Scripts usually move the head or change settings.
+                self.request_tcp_probe(PROBE_COORDINATES, PROBE_ENDSTOPS)
+            return result
+
+    @callback
+    def async_add_upload_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Listen for upload progress; returns a function that removes the listener."""
+        self._upload_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._upload_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _push_upload_progress(self, force: bool = False) -> None:
+        """Notifies the upload listeners, at most every UPLOAD_PROGRESS_INTERVAL unless forced."""
+        now = time.monotonic()
+        if not force and now - self._upload_progress_pushed < UPLOAD_PROGRESS_INTERVAL:
+            return
+        self._upload_progress_pushed = now
+        for update_callback in list(self._upload_listeners):
+            update_callback()
+
+    async def upload_file(self, path: str, expected_md5: Optional[str] = None) -> bool:
+        """
+        Uploads a local G-code file to the printer's storage in chunks.
+
+        The upload uses its own HTTP session, so polls are not held up behind
+        it; a second upload waits for the first to finish. On success the
+        file is added to the printable file list without an M661 re-list. See
+        file_upload.py for reading, verification and progress.
+        """
+        async with self._upload_lock:
+            progress = UploadProgress(path, upload_file_name(path))
+            self.upload_progress = progress
+            _LOGGER.info(f"Uploading {path} to the printer as {progress.file_name}")
+            self._push_upload_progress(force=True)
+            async with aiohttp.ClientSession() as session:
+                success = await upload_file(
+                    session,
+                    f"http://{self.host}:{DEFAULT_PORT}{ENDPOINT_UPLOAD}",
+                    {"serialNumber": self.serial_number, "checkCode": self.check_code},
+                    path,
+                    self.hass.async_add_executor_job,
+                    progress,
+                    self._push_upload_progress,
+                    UPLOAD_REPLY_TIMEOUT,
+                    expected_md5,
+                )
+            self._push_upload_progress(force=True)
+
+        rate = progress.bytes_per_second
+        if not success:
+            _LOGGER.error(
+                f"Upload of {path} failed after {progress.bytes_sent}/{progress.total_bytes} bytes: {progress.error}"
+            )
+            # A partial file may or may not have been kept; ask the printer.
+            self.invalidate_printable_files("upload failed")
+            return False
+        _LOGGER.info(
+            f"Uploaded {path} as {progress.printer_path}: {progress.total_bytes} bytes "
+            f"in {progress.elapsed:.1f}s ({rate / 1024 if rate else 0:.0f} KiB/s), MD5 {progress.md5}"
+        )
+        if self.file_cache.loaded and self.file_cache.add(progress.printer_path):
+            self.data = {**self.data, "printable_files": self.file_cache.paths}
+            self.changed_keys = frozenset({"printable_files"})
+            self.async_update_listeners()
+        elif not self.file_cache.loaded:
+            self.invalidate_printable_files("file uploaded")
+        # Estimates for the file picker; the upload's MD5 skips known files.
+        self.hass.async_create_task(
+            self.analyze_gcode(path, progress.printer_path, progress.md5)
+        )
+        return True
+
+    async def analyze_gcode(
+        self, path: str, printer_path: Optional[str] = None, md5: Optional[str] = None
+    ) -> Optional[GcodeAnalysis]:
+        """
+        Estimates print time, filament use and layer times of a local G-code
+        file, and reads its preview image.
+
+        Results are cached by content hash, so a file is only parsed once;
+        ``md5`` may be given if already known (e.g. from an upload). With
+        ``printer_path`` the estimates are shown for that file in the file
+        picker and the preview by the thumbnail image entity. Files are read
+        in the executor; see gcode_analysis.py and thumbnails.py.
+        """
+        try:
+            if md5 is None:
+                md5 = await self.hass.async_add_executor_job(file_md5, path)
+            analysis = self.gcode_analyses.get(md5)
+            if analysis is None:
+                analysis = await self.hass.async_add_executor_job(
+                    analyze_file, path, upload_file_name(path), self._motion_model
+                )
+                _LOGGER.info(
+                    f"Analysed {path} in {analysis.elapsed:.2f}s: {analysis.summary()}"
+                )
+            else:
+                _LOGGER.debug(f"Analysis of {path} taken from the cache")
+            if analysis.md5 not in self.thumbnails:
+                thumbnail = await self.hass.async_add_executor_job(
+                    extract_thumbnail, path
+                )
+                self.thumbnails.put(analysis.md5, thumbnail)
+        except OSError as e:
+            _LOGGER.error(f"Could not analyse {path}: {e}")
+            return None
+        self.gcode_analyses.put(analysis, printer_path)
+        if printer_path is not None:
+            self.thumbnails.link(printer_path, analysis.md5)
+            self.changed_keys = frozenset({DATA_KEY_FILE_ANALYSIS})
+            self.async_update_listeners()
+        return analysis
 
     async def delete_file(self, file_path: str) -> bool:
         """Deletes a file from the printer's storage using M30."""
@@ -790,6 +1753,8 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
         command = f"~M30 {command_file_path}\r\n"
         action = f"DELETE FILE ({command_file_path})"
         success, _ = await self._send_tcp_command(command, action)
+        if success:
+            self.invalidate_printable_files("file deleted")
         return success
 
     async def disable_steppers(self) -> bool:
@@ -838,16 +1803,21 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
                 command += f" {valid_axes_to_home}"
                 action_detail = f"{valid_axes_to_home} AXES"
         command += "\r\n"
-        action = f"HOME {action_detail}"
-        success, _ = await self._send_tcp_command(command, action)
-        return success
+        # Homing ends in absolute positioning whatever mode it started in.
+        result = await self.run_macro(
+            Macro(f"HOME {action_detail}", [command], rollback=["~G90\r\n"])
+        )
+        if result.success:
+            self.request_tcp_probe(PROBE_COORDINATES, PROBE_ENDSTOPS)
+        return result.success
 
     async def filament_change(self) -> bool:
         """Initiates filament change procedure using M600."""
-        command = "~M600\r\n"
-        action = "FILAMENT CHANGE (M600)"
-        success, _ = await self._send_tcp_command(command, action)
-        return success
+        # The printer parks the head for the change; nothing may run in between.
+        result = await self.run_macro(Macro("FILAMENT CHANGE (M600)", ["~M600\r\n"]))
+        if result.success:
+            self.request_tcp_probe(PROBE_COORDINATES)
+        return result.success
 
     async def emergency_stop(self) -> bool:
         """Sends emergency stop command M112."""
@@ -856,7 +1826,10 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
         # M112 might not send an 'ok', printer might just halt or restart.
         # Consider if a different response_terminator or no terminator is needed.
         # For now, using default which might result in a timeout/false negative if printer halts before 'ok'.
-        success, _ = await self._send_tcp_command(command, action, response_terminator="ok\r\n")
+        # Sent on the pre-opened safety connection, so it never waits for a poll.
+        success, _ = await self._send_tcp_command(
+            command, action, response_terminator="ok\r\n", priority=PRIORITY_SAFETY
+        )
         return success
 
     async def list_files(self) -> bool:
@@ -902,6 +1875,8 @@ class FlashforgeDataUpdateCoordinator(DataUpdateCoordinator):
         action = "START BED LEVELING (G29)"
         # _LOGGER.info(f"Attempting to {action}")
         success, _ = await self._send_tcp_command(command, action)
+        if success:
+            self.request_tcp_probe(PROBE_BED_LEVELING)
         return success
 
     async def save_settings_to_eeprom(self) -> bool:
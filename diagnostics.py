@@ -0,0 +1,81 @@
+"""Diagnostics support for the Flashforge Adventurer 5M integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    API_ATTR_CAMERA_STREAM_URL,
+    API_ATTR_IP_ADDR,
+    DOMAIN,
+)
+from .coordinator import FlashforgeDataUpdateCoordinator
+
+# Credentials and network identifiers are removed from the download
+TO_REDACT = {
+    CONF_HOST,
+    "serial_number",
+    "check_code",
+    "serialNumber",
+    "checkCode",
+    "macAddr",
+    API_ATTR_IP_ADDR,
+    API_ATTR_CAMERA_STREAM_URL,
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: FlashforgeDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "connection_state": coordinator.connection_state,
+            "last_update_success": coordinator.last_update_success,
+            "update_interval_seconds": (
+                coordinator.update_interval.total_seconds()
+                if coordinator.update_interval
+                else None
+            ),
+            "poll_budget_seconds": coordinator.poll_budget,
+            "concurrent_probes": coordinator.concurrent_probes,
+            "connection_stats": coordinator.connection_stats,
+            "circuit_breaker": coordinator.circuit_breaker.as_dict(),
+            "round_trip_times": coordinator.rtt_status,
+            "command_scheduler": coordinator.command_scheduler.as_dict(),
+            "last_gcode_stream": (
+                coordinator.last_gcode_stream.as_dict()
+                if coordinator.last_gcode_stream
+                else None
+            ),
+            "last_upload": (
+                coordinator.upload_progress.as_dict()
+                if coordinator.upload_progress
+                else None
+            ),
+        },
+        "tcp_probes": coordinator.tcp_probe_status,
+        "printable_files": {
+            "count": len(coordinator.file_cache),
+            "refresh_count": coordinator.file_cache.refresh_count,
+        },
+        "gcode_analyses": coordinator.gcode_analyses.as_dict(),
+        "thumbnails": coordinator.thumbnails.as_dict(),
+        "camera_proxy": coordinator.camera_proxy.as_dict(),
+        "timelapse": (
+            coordinator.timelapse.as_dict() if coordinator.timelapse else None
+        ),
+        "metrics": coordinator.metrics.as_dict(),
+        "data": async_redact_data(coordinator.data or {}, TO_REDACT),
+    }
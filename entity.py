@@ -2,7 +2,7 @@
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.core import callback
-from typing import Dict, Any, Optional # Import Dict, Any, Optional
+from typing import Dict, Any, FrozenSet, Optional # Import Dict, Any, Optional
 
 from .const import (
     DOMAIN,
@@ -20,6 +20,11 @@ from .coordinator import FlashforgeDataUpdateCoordinator
 class FlashforgeEntity(CoordinatorEntity[FlashforgeDataUpdateCoordinator]):
     """Base class for Flashforge entities."""
 
+    # Coordinator data this entity shows, as top-level keys or "detail.<key>"
+    # paths. When set, coordinator updates that leave these keys and the
+    # entity's availability unchanged do not write state. None: always write.
+    _data_keys: Optional[FrozenSet[str]] = None
+
     def __init__(self, coordinator: FlashforgeDataUpdateCoordinator, name_suffix: str, unique_id_key: str) -> None:
         """Initialize the entity.
 
@@ -31,6 +36,7 @@ class FlashforgeEntity(CoordinatorEntity[FlashforgeDataUpdateCoordinator]):
         super().__init__(coordinator)
         self._attr_name: str = f"{MANUFACTURER} {name_suffix}"
         self._attr_unique_id: str = f"{UNIQUE_ID_PREFIX}{coordinator.serial_number}_{unique_id_key}"
+        self._written_available: Optional[bool] = None
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -55,6 +61,25 @@ class FlashforgeEntity(CoordinatorEntity[FlashforgeDataUpdateCoordinator]):
         await super().async_added_to_hass()  # CoordinatorEntity handles listener registration
 
 
+    def _should_write_state(self) -> bool:
+        """
+        Return False if this coordinator update cannot have changed the entity's state.
+
+        That is the case when the entity declares its _data_keys, none of them
+        changed in the latest poll and its availability is the same as at the
+        last write. Skipped writes are counted by the coordinator.
+        """
+        available = self.available
+        if (
+            self._data_keys is not None
+            and available == self._written_available
+            and not self.coordinator.data_changed(self._data_keys)
+        ):
+            self.coordinator.record_suppressed_write()
+            return False
+        self._written_available = available
+        return True
+
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
@@ -62,7 +87,8 @@ class FlashforgeEntity(CoordinatorEntity[FlashforgeDataUpdateCoordinator]):
         # beyond what CoordinatorEntity itself handles (which is mainly triggering async_write_ha_state).
         # For many simple entities, this might just be self.async_write_ha_state().
         # However, specific entities like sensors might override this to process data.
-        self.async_write_ha_state()
+        if self._should_write_state():
+            self.async_write_ha_state()
 
 # Note: The _handle_coordinator_update in this base class now calls async_write_ha_state.
 # Sensor and BinarySensor classes in HA often have their own _handle_coordinator_update
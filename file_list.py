@@ -0,0 +1,239 @@
+"""Printable file list cache for the Flashforge Adventurer 5M integration.
+
+The M661 listing can be tens of KB on printers with many stored files, so it
+is only re-fetched when something suggests it changed: a file was deleted or
+uploaded, a print finished, or the cheap change signal (the free disk space
+reported by every /detail poll) moved.
+
+The listing itself is binary and is parsed straight from the received bytes
+by parse_file_listing(), which also reports whether every announced entry
+arrived; an incomplete listing is never stored, so the previous list stays
+until a later fetch succeeds.
+"""
+
+from __future__ import annotations
+
+import logging
+import posixpath
+from dataclasses import dataclass
+from typing import Any, Optional, Union
+
+_LOGGER = logging.getLogger(__name__)
+
+# M661 framing: header + 4-byte big-endian entry count, then per file the
+# entry marker + 4-byte big-endian path length + path bytes.
+M661_HEADER = b"D\xaa\xaaD"
+M661_ENTRY_MARKER = b"::\xa3\xa3"
+M661_LENGTH_SIZE = 4
+# User files live below this directory; the listing also holds other paths.
+PRINTABLE_FILE_ROOT = b"/data/"
+PRINTABLE_EXTENSIONS = (".gcode", ".gx")
+
+
+def _decode_path(raw: memoryview) -> str:
+    """Decode one path, keeping non-UTF-8 names visible instead of dropping bytes."""
+    try:
+        return str(raw, "utf-8")
+    except UnicodeDecodeError:
+        path = str(raw, "utf-8", "replace")
+        _LOGGER.debug(f"M661 path is not valid UTF-8, decoded as '{path}'")
+        return path
+
+
+def file_listing_end(data: Union[bytes, bytearray], start: int = 0) -> Optional[int]:
+    """
+    Return where the M661 listing at or after start ends, or None while incomplete.
+
+    The listing follows the reply's 'ok' line, possibly in later packets, so
+    the reply is only complete once the header, its entry count and every
+    announced entry (through its length prefix) have arrived. A damaged entry
+    cannot be framed; the reply then ends at the received data and the parser
+    reports the listing as incomplete.
+    """
+    header = data.find(M661_HEADER, start)
+    if header < 0:
+        return None
+    pos = header + len(M661_HEADER) + M661_LENGTH_SIZE
+    if pos > len(data):
+        return None
+    expected = int.from_bytes(data[pos - M661_LENGTH_SIZE : pos], "big")
+    header_size = len(M661_ENTRY_MARKER) + M661_LENGTH_SIZE
+    for _ in range(expected):
+        if pos + header_size > len(data):
+            return None
+        if not data.startswith(M661_ENTRY_MARKER, pos):
+            return len(data)
+        length_start = pos + len(M661_ENTRY_MARKER)
+        pos += header_size + int.from_bytes(
+            data[length_start : length_start + M661_LENGTH_SIZE], "big"
+        )
+    return pos if pos <= len(data) else None
+
+
+def parse_file_listing(
+    data: Union[bytes, bytearray, memoryview],
+    extensions: tuple[str, ...] = PRINTABLE_EXTENSIONS,
+) -> tuple[list[str], bool]:
+    """
+    Parse the binary M661 file listing into printable file paths.
+
+    Each entry is located through its length prefix, filtered on the raw
+    bytes and only then decoded, so no intermediate strings are built for the
+    rest of the reply. Leading data (the 'CMD M661 Received.' echo and 'ok')
+    is skipped by searching for the header. Without a header the parser
+    starts at the first entry marker; a damaged entry is skipped by searching
+    for the next marker.
+
+    Args:
+        data: The raw M661 reply.
+        extensions: File extensions to keep (matched case-sensitively).
+
+    Returns:
+        Paths below /data/ with one of the given extensions, in printer order,
+        and whether the listing is complete: every entry announced by the
+        header was parsed (or, without a header, no entry was cut off).
+    """
+    if isinstance(data, memoryview):
+        data = data.tobytes()  # bytes.find/endswith need a bytes-like object
+    view = memoryview(data)
+    suffixes = tuple(ext.encode("ascii") for ext in extensions)
+    header_size = len(M661_ENTRY_MARKER) + M661_LENGTH_SIZE
+
+    header = data.find(M661_HEADER)
+    if header >= 0:
+        count_start = header + len(M661_HEADER)
+        expected: Optional[int] = int.from_bytes(
+            view[count_start : count_start + M661_LENGTH_SIZE], "big"
+        )
+        pos = count_start + M661_LENGTH_SIZE
+    else:
+        expected = None
+        pos = data.find(M661_ENTRY_MARKER)
+        if pos < 0:
+            return [], True
+
+    paths: list[str] = []
+    entries = 0
+    truncated = False
+    while pos + header_size <= len(data) and (expected is None or entries < expected):
+        if not data.startswith(M661_ENTRY_MARKER, pos):
+            pos = data.find(M661_ENTRY_MARKER, pos + 1)
+            if pos < 0:
+                break
+            continue
+        length_start = pos + len(M661_ENTRY_MARKER)
+        start = pos + header_size
+        end = start + int.from_bytes(view[length_start:start], "big")
+        if end > len(data):
+            _LOGGER.debug(
+                f"M661 listing truncated: entry {entries + 1} needs {end - len(data)} more bytes"
+            )
+            truncated = True
+            break
+        entries += 1
+        pos = end
+
+        # Some firmware prefixes the path (e.g. '//data/...'); start at the root.
+        root = data.find(PRINTABLE_FILE_ROOT, start, end)
+        if root >= 0 and data.endswith(suffixes, start, end):
+            paths.append(_decode_path(view[root:end]))
+
+    if expected is not None and entries < expected:
+        _LOGGER.debug(f"M661 listing announced {expected} entries but held {entries}")
+        return paths, False
+    return paths, not truncated
+
+
+@dataclass(frozen=True)
+class PrintableFile:
+    """One entry of the printer's printable file list."""
+
+    path: str
+    name: str
+    extension: str
+
+    @classmethod
+    def from_path(cls, path: str) -> PrintableFile:
+        """Build an entry from a printer path such as '/data/user/model.gcode'."""
+        name = posixpath.basename(path)
+        return cls(path=path, name=name, extension=posixpath.splitext(name)[1].lower())
+
+
+class PrintableFileCache:
+    """Parsed index of the printer's printable files plus its change signal."""
+
+    def __init__(self) -> None:
+        """Initialize an empty cache that has never been filled."""
+        self._files: dict[str, PrintableFile] = {}
+        self._signal: Any = None
+        # Set when the integration changed the files itself; see add()
+        self._reprime_signal = False
+        self.loaded = False
+        self.refresh_count = 0
+
+    @property
+    def paths(self) -> list[str]:
+        """Return the cached file paths in printer order."""
+        return list(self._files)
+
+    @property
+    def files(self) -> list[PrintableFile]:
+        """Return the cached entries in printer order."""
+        return list(self._files.values())
+
+    def get(self, path: str) -> Optional[PrintableFile]:
+        """Return the entry for a path, or None if it is not cached."""
+        return self._files.get(path)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._files
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def update(self, paths: list[str]) -> bool:
+        """
+        Replace the cached list with a freshly fetched one.
+
+        Returns:
+            True if the list differs from what was cached.
+        """
+        self.refresh_count += 1
+        self.loaded = True
+        if paths == list(self._files):
+            return False
+        self._files = {path: PrintableFile.from_path(path) for path in paths}
+        _LOGGER.debug(f"Printable file list changed: {len(self._files)} files")
+        return True
+
+    def add(self, path: str) -> bool:
+        """
+        Record a file the integration stored itself, without an M661 re-list.
+
+        The free disk space moves because of this file, so the next signal
+        value only primes the cache again instead of requesting a re-list.
+
+        Returns:
+            True if the path was not cached yet.
+        """
+        self._reprime_signal = True
+        if path in self._files:
+            return False
+        self._files[path] = PrintableFile.from_path(path)
+        return True
+
+    def signal_changed(self, signal: Any) -> bool:
+        """
+        Record the latest value of the cheap change signal.
+
+        Returns:
+            True if a previously seen signal value changed, meaning the file
+            list should be re-fetched. The first value seen only primes the cache.
+        """
+        if signal is None:
+            return False
+        previous, self._signal = self._signal, signal
+        if self._reprime_signal:
+            self._reprime_signal = False
+            return False
+        return previous is not None and previous != signal
@@ -0,0 +1,236 @@
+"""Chunked upload of local G-code files to the printer's storage.
+
+The printer accepts files as a multipart POST to /uploadGcode on its HTTP
+port, authenticated with the same serial number and check code as /detail.
+The file is never loaded as a whole: it is read in the executor one bounded
+chunk at a time and each chunk is written to the socket before the next is
+read, so memory use does not grow with the file.
+
+The printer does not verify what it receives, so the integration does,
+before the upload is allowed to complete:
+
+- an MD5 digest is computed over the bytes actually sent, and compared with
+  the expected one if the caller gave it;
+- the file must still have the size and modification time it had when the
+  upload started (it was not rewritten while being read).
+
+The closing multipart boundary is only sent once these checks pass. If one
+fails the request is aborted, so the printer never sees a complete upload
+and discards the partial file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import posixpath
+import time
+import uuid
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Optional
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+ENDPOINT_UPLOAD = "/uploadGcode"
+# Multipart field the printer reads the file from
+UPLOAD_FIELD = "gcodeFile"
+# Bytes read from disk and written to the socket per step
+UPLOAD_CHUNK_SIZE = 256 * 1024
+# Extensions the printer can print; other files are refused before sending
+UPLOAD_EXTENSIONS = (".gcode", ".gx")
+# Directory uploaded files are stored in (M23 0:/user/...)
+UPLOAD_PRINTER_ROOT = "/data/user/"
+
+UPLOAD_STATE_UPLOADING = "uploading"
+UPLOAD_STATE_DONE = "done"
+UPLOAD_STATE_FAILED = "failed"
+
+
+class UploadVerificationError(Exception):
+    """The file that was sent does not match what was expected."""
+
+
+@dataclass
+class UploadProgress:
+    """Progress, throughput and outcome of one upload."""
+
+    source: str
+    file_name: str
+    total_bytes: int = 0
+    state: str = UPLOAD_STATE_UPLOADING
+    bytes_sent: int = 0
+    md5: Optional[str] = None
+    error: Optional[str] = None
+    started: float = field(default_factory=time.monotonic)
+    elapsed: float = 0.0
+
+    @property
+    def printer_path(self) -> str:
+        """Path the file is listed under on the printer (see file_list.py)."""
+        return f"{UPLOAD_PRINTER_ROOT}{self.file_name}"
+
+    @property
+    def percent(self) -> Optional[float]:
+        """Share of the file sent so far, in percent."""
+        if self.state == UPLOAD_STATE_DONE:
+            return 100.0
+        if not self.total_bytes:
+            return None
+        return round(100.0 * self.bytes_sent / self.total_bytes, 1)
+
+    @property
+    def bytes_per_second(self) -> Optional[float]:
+        """Average upload throughput since the start."""
+        elapsed = (
+            time.monotonic() - self.started
+            if self.state == UPLOAD_STATE_UPLOADING
+            else self.elapsed
+        )
+        if not self.bytes_sent or elapsed <= 0:
+            return None
+        return self.bytes_sent / elapsed
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable summary for entity attributes and diagnostics."""
+        rate = self.bytes_per_second
+        return {
+            "source": self.source,
+            "file": self.file_name,
+            "state": self.state,
+            "bytes_sent": self.bytes_sent,
+            "total_bytes": self.total_bytes,
+            "percent": self.percent,
+            "bytes_per_second": round(rate) if rate else None,
+            "md5": self.md5,
+            "error": self.error,
+            "elapsed_s": round(self.elapsed, 3),
+        }
+
+
+def _file_signature(path: str) -> tuple[int, int]:
+    """Size and modification time of a local file."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _read_chunk(handle: Any, digest: Any, size: int) -> bytes:
+    """Read one chunk and add it to the digest (in the executor)."""
+    chunk = handle.read(size)
+    digest.update(chunk)
+    return chunk
+
+
+async def upload_file(
+    session: aiohttp.ClientSession,
+    url: str,
+    credentials: dict[str, str],
+    path: str,
+    run_in_executor: Callable[..., Any],
+    progress: UploadProgress,
+    on_progress: Callable[[], None],
+    reply_timeout: float,
+    expected_md5: Optional[str] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> bool:
+    """
+    Uploads a local file to the printer, updating ``progress`` as it goes.
+
+    ``on_progress`` is called after each chunk. The outcome, including any
+    error, is recorded in ``progress``; returns True if the printer accepted
+    the verified file.
+    """
+    try:
+        size, mtime = await run_in_executor(_file_signature, path)
+    except OSError as e:
+        progress.state = UPLOAD_STATE_FAILED
+        progress.error = f"cannot read {path}: {e}"
+        return False
+    progress.total_bytes = size
+
+    boundary = uuid.uuid4().hex
+    name = progress.file_name.replace('"', "%22")
+    preamble = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{UPLOAD_FIELD}"; filename="{name}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    epilogue = f"\r\n--{boundary}--\r\n".encode()
+    headers = {
+        **credentials,
+        "fileSize": str(size),
+        "printNow": "false",
+        "levelingBeforePrint": "false",
+        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        # Announced up front: the printer does not take chunked request bodies.
+        "Content-Length": str(len(preamble) + size + len(epilogue)),
+    }
+
+    def fail(error: str) -> UploadVerificationError:
+        progress.error = error
+        return UploadVerificationError(error)
+
+    async def body() -> AsyncIterator[bytes]:
+        digest = hashlib.md5()
+        handle = await run_in_executor(partial(open, path, "rb"))
+        try:
+            yield preamble
+            while True:
+                chunk = await run_in_executor(_read_chunk, handle, digest, chunk_size)
+                if not chunk:
+                    break
+                if progress.bytes_sent + len(chunk) > size:
+                    raise fail("file grew while it was being uploaded")
+                yield chunk
+                progress.bytes_sent += len(chunk)
+                on_progress()
+        finally:
+            await run_in_executor(handle.close)
+
+        progress.md5 = digest.hexdigest()
+        if progress.bytes_sent != size:
+            raise fail(
+                f"file shrank while it was being uploaded ({progress.bytes_sent} of {size} bytes)"
+            )
+        if await run_in_executor(_file_signature, path) != (size, mtime):
+            raise fail("file was modified while it was being uploaded")
+        if expected_md5 is not None and progress.md5 != expected_md5.lower():
+            raise fail(f"MD5 {progress.md5} does not match the expected {expected_md5}")
+        # Verified: complete the upload.
+        yield epilogue
+
+    timeout = aiohttp.ClientTimeout(total=None, sock_read=reply_timeout)
+    try:
+        async with session.post(
+            url, data=body(), headers=headers, timeout=timeout
+        ) as resp:
+            text = await resp.text()
+            _LOGGER.debug(
+                f"Upload of {progress.file_name} status: {resp.status}, response: {text}"
+            )
+            if resp.status != 200:
+                progress.error = f"HTTP status {resp.status}: {text}"
+            else:
+                try:
+                    reply = await resp.json(content_type=None)
+                except ValueError:
+                    reply = None
+                if not isinstance(reply, dict) or reply.get("code") != 0:
+                    progress.error = f"printer refused the file: {text}"
+    except Exception as e:
+        # Verification failures surface here too, wrapped by aiohttp.
+        if progress.error is None:
+            progress.error = f"{type(e).__name__}: {e}"
+    progress.elapsed = time.monotonic() - progress.started
+    progress.state = (
+        UPLOAD_STATE_FAILED if progress.error is not None else UPLOAD_STATE_DONE
+    )
+    return progress.state == UPLOAD_STATE_DONE
+
+
+def upload_file_name(path: str) -> str:
+    """Name a local file is stored under on the printer."""
+    return posixpath.basename(path.replace("\\", "/"))
@@ -1,70 +1,242 @@
 import asyncio
 import logging
+import re
+import socket
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Optional, Union
+
+from .rtt import RttEstimator
 
 _LOGGER = logging.getLogger(__name__)
 
-# Define a default timeout for network operations (in seconds)
+# Default timeout for network operations until round trips have been measured (in seconds)
 DEFAULT_TCP_TIMEOUT = 5
 # Define a buffer size for reading responses
 TCP_BUFFER_SIZE = 1024
+# Upper bound for one buffered reply; larger replies are treated as a failure
+DEFAULT_MAX_RESPONSE_SIZE = 1024 * 1024
+# How long a persistent connection may sit unused before it is closed (in seconds)
+DEFAULT_IDLE_TIMEOUT = 60
+# Seconds without new data after which a streamed reply that has text after its
+# echo but no 'ok' is taken as a rejection (the firmware sends no 'ok' then)
+STREAM_REPLY_QUIET_TIME = 1.0
+
+# Harmless query sent twice in one write to find out whether the printer
+# answers pipelined commands, before streaming several lines ahead
+PIPELINING_PROBE_COMMAND = "~M115\r\n"
+
+# A line of this form after a command's echo means the command was rejected
+_ERROR_LINE = re.compile(rb"^error\b[^\n]*\n", re.IGNORECASE | re.MULTILINE)
+
+
+def _command_word(command: str) -> Optional[str]:
+    """Return the command word of an M-code, e.g. 'M114' for '~M114\\r\\n'."""
+    parts = command.strip().lstrip("~").split()
+    return parts[0].upper() if parts else None
+
+
+def _echo_marker(command: str) -> Optional[bytes]:
+    """Return the acknowledgement line the printer echoes for a command, e.g. b'CMD M114 Received.'."""
+    parts = command.strip().lstrip("~").split()
+    return f"CMD {parts[0]} Received.".encode("utf-8") if parts else None
+
+
+def decode_response(data: bytes) -> str:
+    """
+    Decode a raw reply to text.
+
+    Uses utf-8, ignoring errors, so binary noise from the printer (or the
+    binary M661 listing) cannot crash text parsers. Surrounding whitespace is
+    stripped.
+    """
+    return data.decode("utf-8", errors="ignore").strip()
 
 
 class FlashforgeTCPClient:
     """
     Client for sending M-code commands to Flashforge printers via TCP.
 
-    This client implements a 'connect-send-close' strategy for each command.
-    This enhances robustness by avoiding issues with stale or half-open
-    connections that some printer firmwares might not handle well over time.
-    The trade-off is potentially higher latency for sequences of rapid commands.
-    If different behavior is needed (e.g., for very high-frequency command
-    sequences), this client could be adapted to manage persistent connections,
-    though that would require more complex connection state management.
+    By default this client implements a 'connect-send-close' strategy for each
+    command. This avoids issues with stale or half-open connections that some
+    printer firmwares might not handle well over time, at the cost of one TCP
+    handshake per command.
+
+    With ``persistent=True`` the connection is kept open between commands:
+    - Commands are queued behind a lock, so only one exchange is on the wire
+      at a time and replies cannot interleave.
+    - Before a connection is reused it is health-checked (peer EOF, closing
+      writer, idle age). Unhealthy connections are dropped and re-opened.
+    - If a reused connection turns out to be dead (peer closed it before
+      replying), the command is retried once on a fresh connection.
+    - A connection left unused for ``idle_timeout`` seconds is closed, so the
+      printer's single M-code port is not held forever.
+    - Any timeout or read error closes the connection, so a late reply can
+      never be mistaken for the answer to the next command. Bytes left over
+      from a previous reply (e.g. the tail of an M661 listing) are skipped by
+      re-synchronising on the 'CMD Mxxx Received.' echo of the new command.
+
+    Replies are buffered as raw bytes and only decoded for the caller. Pass
+    ``raw=True`` to get the undecoded bytes instead, e.g. for the binary M661
+    file listing. Data is read in ``read_size`` chunks into one growable
+    buffer, and marker/terminator searches only cover newly received bytes,
+    so large replies are handled in linear time. A reply that grows past
+    ``max_response_size`` without completing is treated as a failure.
+
+    Timeouts adapt to the link: the time from writing commands to the first
+    reply bytes is fed to an RttEstimator, and its derived timeout is used
+    for connecting, writing and waiting for that first byte. Pass a shared
+    estimator to let several clients for the same printer learn from each
+    other. Once the printer has echoed the command, the wait for its 'ok'
+    depends on the command rather than the link (G28 or M600 acknowledge only
+    when done), so it never drops below ``timeout`` and does not back off
+    the estimator.
+
+    Some replies carry a binary payload after their 'ok' line (the M661 file
+    listing), which may arrive in later packets. ``reply_framers`` maps such
+    command words to a function that returns where the payload ends in the
+    buffer, or None while it is incomplete; the reply is then only returned
+    once its payload is complete.
     """
 
-    def __init__(self, host: str, port: int, timeout: float = DEFAULT_TCP_TIMEOUT):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        timeout: float = DEFAULT_TCP_TIMEOUT,
+        persistent: bool = False,
+        idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT,
+        read_size: int = TCP_BUFFER_SIZE,
+        max_response_size: int = DEFAULT_MAX_RESPONSE_SIZE,
+        rtt: Optional[RttEstimator] = None,
+        reply_framers: Optional[
+            dict[str, Callable[[bytearray, int], Optional[int]]]
+        ] = None,
+        pipelining: Optional[bool] = None,
+    ):
         """
         Initialize the TCP client.
         Args:
             host: The printer's IP address or hostname.
             port: The TCP port to connect to (typically 8899 for M-codes).
-            timeout: Timeout for network operations.
+            timeout: Timeout for network operations until round trips were measured,
+                and the least time allowed for a reply to complete after its first byte.
+            persistent: Keep the connection open between commands.
+            idle_timeout: Seconds of inactivity after which a persistent connection is
+                closed (None: never, e.g. for a connection kept ready for urgent commands).
+            read_size: Maximum number of bytes requested per socket read.
+            max_response_size: Maximum number of bytes buffered for one reply.
+            rtt: Round-trip estimator deriving the timeouts (created if not given).
+            reply_framers: Command word -> end of the payload after its 'ok' line.
+            pipelining: Whether the printer answers pipelined commands, if already
+                known (e.g. from another client's ``pipelining``); None finds out.
         """
         self._host = host
         self._port = port
-        self._timeout = timeout
-        self._reader = None
-        self._writer = None
+        self.rtt = rtt or RttEstimator(timeout)
+        self._reply_timeout = timeout
+        self._persistent = persistent
+        self._idle_timeout = idle_timeout
+        self._read_size = read_size
+        self._max_response_size = max_response_size
+        self._reply_framers = reply_framers or {}
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+        self._last_used = 0.0
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+        # Received but not yet consumed reply bytes for the current connection
+        self._buffer = bytearray()
+        # When the pending commands were written; cleared by the first reply bytes
+        self._sent_at: Optional[float] = None
+        # Cleared if the printer turns out not to answer pipelined commands
+        self._pipelining = pipelining is not False
+        # Set once a pipelined batch was answered in full
+        self._pipelining_confirmed = pipelining is True
+        # Connection statistics, useful to verify that polls reuse the connection
+        self.connect_count = 0
+        self.reuse_count = 0
+        self.timeout_count = 0
+
+    @property
+    def pipelining(self) -> Optional[bool]:
+        """Whether the printer answers pipelined commands (None: not known yet)."""
+        if not self._pipelining:
+            return False
+        return True if self._pipelining_confirmed else None
+
+    @property
+    def is_connected(self) -> bool:
+        """Return True if a connection is currently open."""
+        return self._writer is not None and not self._writer.is_closing()
 
-    async def _ensure_connected(self):
-        """Ensures a connection is established. Reconnects if necessary."""
-        if not self._writer or self._writer.is_closing():
+    def _connection_is_healthy(self) -> bool:
+        """Cheap local health check of an existing connection before reuse."""
+        if not self.is_connected or self._reader is None:
+            return False
+        if self._reader.at_eof():
+            _LOGGER.debug(f"Connection to {self._host}:{self._port} was closed by peer")
+            return False
+        if (
+            self._idle_timeout is not None
+            and time.monotonic() - self._last_used > self._idle_timeout
+        ):
             _LOGGER.debug(
-                f"No active connection or writer closing, attempting to connect to {self._host}:{self._port}"
+                f"Connection to {self._host}:{self._port} exceeded idle timeout"
             )
-            try:
-                self._reader, self._writer = await asyncio.wait_for(
-                    asyncio.open_connection(self._host, self._port),
-                    timeout=self._timeout,
-                )
-                _LOGGER.debug(f"Successfully connected to {self._host}:{self._port}")
-            except asyncio.TimeoutError:
-                _LOGGER.error(f"Timeout connecting to {self._host}:{self._port}")
-                self.close()  # Ensure cleanup on timeout
-                raise
-            except ConnectionRefusedError:
-                _LOGGER.error(f"Connection refused by {self._host}:{self._port}")
-                self.close()
-                raise
-            except OSError as e:
-                _LOGGER.error(
-                    f"Network error connecting to {self._host}:{self._port}: {e}"
-                )
-                self.close()
-                raise
+            return False
+        return True
+
+    async def _ensure_connected(self) -> bool:
+        """
+        Ensures a connection is established. Reconnects if necessary.
+
+        Returns:
+            True if an existing connection was reused, False if a new one was opened.
+        """
+        if self._writer is not None and self._connection_is_healthy():
+            self.reuse_count += 1
+            return True
+
+        if self._writer is not None:
+            self.close()
+
+        _LOGGER.debug(
+            f"No active connection or writer closing, attempting to connect to {self._host}:{self._port}"
+        )
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self._host, self._port),
+                timeout=self.rtt.timeout,
+            )
+            self.connect_count += 1
+            _LOGGER.debug(f"Successfully connected to {self._host}:{self._port}")
+        except asyncio.TimeoutError:
+            _LOGGER.error(f"Timeout connecting to {self._host}:{self._port}")
+            self.close()  # Ensure cleanup on timeout
+            raise
+        except ConnectionRefusedError:
+            _LOGGER.error(f"Connection refused by {self._host}:{self._port}")
+            self.close()
+            raise
+        except OSError as e:
+            _LOGGER.error(f"Network error connecting to {self._host}:{self._port}: {e}")
+            self.close()
+            raise
+
+        if self._persistent:
+            # Let the OS detect half-open connections on long-lived sockets.
+            sock = self._writer.get_extra_info("socket")
+            if sock is not None:
+                try:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                except OSError as e:
+                    _LOGGER.debug(f"Could not enable TCP keepalive: {e}")
+        return False
 
     def close(self):
         """Closes the connection."""
+        self._cancel_idle_timer()
         if self._writer and not self._writer.is_closing():
             try:
                 self._writer.close()
@@ -72,86 +244,560 @@ class FlashforgeTCPClient:
                 _LOGGER.debug(f"Error closing writer: {e}")
         self._reader = None
         self._writer = None
+        self._buffer = bytearray()
         _LOGGER.debug("TCP connection closed.")
 
+    def _cancel_idle_timer(self) -> None:
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+
+    def _schedule_idle_close(self) -> None:
+        """(Re)start the timer that closes a persistent connection once idle."""
+        self._cancel_idle_timer()
+        if self._idle_timeout is None:
+            return
+        self._idle_handle = asyncio.get_running_loop().call_later(
+            self._idle_timeout, self._close_if_idle
+        )
+
+    def _close_if_idle(self) -> None:
+        self._idle_handle = None
+        if not self._lock.locked() and self.is_connected:
+            _LOGGER.debug(
+                f"Closing idle TCP connection to {self._host}:{self._port} after {self._idle_timeout}s"
+            )
+            self.close()
+
+    async def connect(self) -> bool:
+        """
+        Opens the connection ahead of the first command (persistent mode).
+
+        Returns True if a healthy connection is open afterwards. Errors are
+        logged and reported as False; the next command simply tries again.
+        """
+        async with self._lock:
+            if self._connection_is_healthy():
+                return True
+            try:
+                await self._ensure_connected()
+            except (asyncio.TimeoutError, OSError):
+                return False
+            self._last_used = time.monotonic()
+            self._schedule_idle_close()
+            return True
+
     async def send_command(
-        self, command: str, response_terminator: str = "ok\r\n"
-    ) -> tuple[bool, str]:
+        self, command: str, response_terminator: str = "ok\r\n", raw: bool = False
+    ) -> tuple[bool, Union[str, bytes]]:
         """
-        Connects, sends a command, waits for a response ending with the terminator, and closes.
+        Sends a command and waits for a response ending with the terminator.
+
+        In the default mode the connection is opened for this command and closed
+        afterwards. In persistent mode the connection is reused and left open.
 
         Args:
             command: The M-code command string to send (e.g., "~M146 ...\r\n").
             response_terminator: The string that indicates the end of a successful response.
+            raw: Return the response as undecoded bytes instead of text.
 
         Returns:
-            A tuple (success: bool, response_data: str).
+            A tuple (success: bool, response_data: str | bytes).
             'success' is True if the command was sent and the terminator was found in the response.
             'response_data' contains the full response from the printer.
         """
-        full_response_data = ""
-        try:
+        results = await self.send_commands([command], response_terminator, raw)
+        return results[0]
+
+    async def send_commands(
+        self,
+        commands: list[str],
+        response_terminator: str = "ok\r\n",
+        raw: bool = False,
+    ) -> list[tuple[bool, Union[str, bytes]]]:
+        """
+        Sends several commands in one write and splits the reply stream per command.
+
+        All commands are written back-to-back on one connection, so the whole
+        batch costs about one round trip instead of one per command. Replies are
+        matched to commands in order using the 'CMD Mxxx Received.' echo; any
+        payload the printer sends after a command's terminator (e.g. the M661
+        file listing) stays attached to that command's response.
+
+        If the printer drops pipelined commands (no reply for a later command
+        while the first one was answered), pipelining is disabled for this
+        client and the unanswered commands are re-sent one at a time.
+
+        Args:
+            commands: M-code command strings, each ending in "\r\n".
+            response_terminator: The string that indicates the end of a successful response.
+            raw: Return the responses as undecoded bytes instead of text.
+
+        Returns:
+            A list of (success, response_data) tuples, one per command, in order.
+        """
+        if not commands:
+            return []
+
+        results = await self._send_commands_locked(
+            commands, response_terminator.encode("utf-8")
+        )
+        if raw:
+            return [(ok, bytes(response)) for ok, response in results]
+        return [(ok, decode_response(response)) for ok, response in results]
+
+    async def stream_commands(
+        self,
+        commands: AsyncIterator[str],
+        window: int,
+        on_reply: Callable[[int, str, bool, bytes], bool],
+        ack_timeout: float,
+        response_terminator: str = "ok\r\n",
+    ) -> Optional[str]:
+        """
+        Streams commands with up to ``window`` of them awaiting their reply.
+
+        A new command is written whenever an earlier one is answered, so the
+        printer always has the next commands queued without waiting for a
+        round trip per line (ok-based flow control). Replies are matched to
+        commands in order by their 'CMD Xxx Received.' echo. A command failed
+        when its echo is followed by an 'Error...' line, by the next command's
+        echo instead of the terminator, or by reply text without a terminator
+        and then STREAM_REPLY_QUIET_TIME seconds of silence; its reply (e.g.
+        the error message) is passed on. An echo alone is waited on for up to
+        ``ack_timeout``, since some commands (G28, G29) acknowledge only when
+        done.
+
+        Streaming ahead needs a printer that answers pipelined commands. Unless
+        that is known, two PIPELINING_PROBE_COMMAND queries are sent in one
+        write first; if only one is answered, the stream runs with a window of
+        one line.
+
+        ``on_reply(index, command, success, response)`` is called for every
+        command in order; returning False stops sending further commands (the
+        ones in flight are still read). Waiting for a reply longer than
+        ``ack_timeout`` seconds, or losing the connection, ends the stream
+        and fails every command in flight.
+
+        Returns None when every command was streamed, else the reason the
+        stream ended early (a failed read of ``commands`` included).
+        """
+        terminator = response_terminator.encode("utf-8")
+        async with self._lock:
+            self._cancel_idle_timer()
+            # (index, command, echo marker) of each command awaiting its reply
+            in_flight: deque[tuple[int, str, Optional[bytes]]] = deque()
+            next_index = 0
+            sending = True
+            error: Optional[str] = None
+            partial = b""
+            read_error: Optional[str] = None
+            try:
+                if window > 1 and self._pipelining and not self._pipelining_confirmed:
+                    await self._probe_pipelining(terminator)
+                if not self._pipelining:
+                    window = 1
+                await self._ensure_connected()
+                self._buffer = bytearray()
+                while True:
+                    while sending and len(in_flight) < window:
+                        try:
+                            command = await commands.__anext__()
+                        except StopAsyncIteration:
+                            sending = False
+                            break
+                        except Exception as e:
+                            # Finish the commands in flight, then report it.
+                            read_error = f"could not read the next command: {e}"
+                            sending = False
+                            break
+                        self._writer.write(command.encode("utf-8"))
+                        in_flight.append((next_index, command, _echo_marker(command)))
+                        next_index += 1
+                    if not in_flight:
+                        break
+                    await asyncio.wait_for(self._writer.drain(), timeout=ack_timeout)
+
+                    marker = in_flight[0][2]
+                    next_marker = in_flight[1][2] if len(in_flight) > 1 else None
+                    reply = self._take_stream_reply(marker, next_marker, terminator)
+                    if reply is None:
+                        # Reply text without 'ok' ends after a quiet period
+                        quiet = self._stream_reply_has_text(marker)
+                        try:
+                            chunk = await asyncio.wait_for(
+                                self._reader.read(self._read_size),
+                                timeout=(
+                                    min(ack_timeout, STREAM_REPLY_QUIET_TIME)
+                                    if quiet
+                                    else ack_timeout
+                                ),
+                            )
+                        except asyncio.TimeoutError:
+                            if not quiet:
+                                raise
+                            reply = self._take_stream_reply(
+                                marker, next_marker, terminator, settled=True
+                            )
+                        else:
+                            if not chunk:
+                                error = "connection closed by printer"
+                                break
+                            self._buffer += chunk
+                            if len(self._buffer) > self._max_response_size:
+                                error = "reply too large"
+                                break
+                            continue
+                    index, command, _ = in_flight.popleft()
+                    if not on_reply(index, command, *reply):
+                        sending = False
+            except asyncio.TimeoutError:
+                self.timeout_count += 1
+                error = f"no reply within {ack_timeout:.0f}s"
+            except (ConnectionRefusedError, ConnectionResetError, OSError) as e:
+                error = f"connection error: {e}"
+            except asyncio.CancelledError:
+                self.close()
+                raise
+            finally:
+                self._last_used = time.monotonic()
+                if error is not None or not self._persistent:
+                    partial = bytes(self._buffer)
+                    self.close()
+                elif self.is_connected:
+                    self._schedule_idle_close()
+
+            if error is not None:
+                _LOGGER.warning(
+                    f"Command stream to {self._host}:{self._port} aborted: {error}"
+                )
+                for index, command, _ in in_flight:
+                    on_reply(index, command, False, partial)
+                    partial = b""
+            return error or read_error
+
+    async def _probe_pipelining(self, response_terminator: bytes) -> None:
+        """Find out whether the printer answers two commands sent in one write."""
+        results = await self._run_batch(
+            [PIPELINING_PROBE_COMMAND] * 2, response_terminator
+        )
+        if len(results) == 2:
+            self._pipelining_confirmed = True
+        elif results and results[0][0]:
+            self._disable_pipelining()
+
+    def _disable_pipelining(self) -> None:
+        """Send one command per round trip from now on."""
+        _LOGGER.warning(
+            f"Printer at {self._host}:{self._port} did not answer pipelined commands; "
+            "falling back to one command per round trip"
+        )
+        self._pipelining = False
+
+    def _stream_reply_has_text(self, marker: Optional[bytes]) -> bool:
+        """True if a complete line follows the echo of the oldest streamed command."""
+        start = self._buffer.find(marker) if marker else 0
+        if start < 0:
+            return False
+        echo_end = self._buffer.find(b"\n", start + (len(marker) if marker else 0))
+        return echo_end >= 0 and self._buffer.find(b"\n", echo_end + 1) >= 0
+
+    def _take_stream_reply(
+        self,
+        marker: Optional[bytes],
+        next_marker: Optional[bytes],
+        terminator: bytes,
+        settled: bool = False,
+    ) -> Optional[tuple[bool, bytes]]:
+        """
+        Removes the reply of the oldest streamed command from the buffer.
+
+        Returns (success, reply), or None if more data is needed. Data before
+        the command's echo is discarded. With ``settled`` no more data is
+        expected, so buffered reply text without a terminator is a failure.
+        """
+        start = self._buffer.find(marker) if marker else 0
+        if start < 0:
+            return None
+        after_echo = start + (len(marker) if marker else 0)
+        end = self._buffer.find(terminator, after_echo)
+        next_start = self._buffer.find(next_marker, after_echo) if next_marker else -1
+        limit = next_start if next_start >= 0 else len(self._buffer)
+        rejected = _ERROR_LINE.search(
+            self._buffer, after_echo, end if 0 <= end < limit else limit
+        )
+        if 0 <= end < limit:
+            end += len(terminator)
+            success = rejected is None
+        elif rejected is not None:
+            end = rejected.end()
+            success = False
+        elif next_start >= 0 or settled:
+            end = limit
+            success = False
+        else:
+            return None
+        reply = bytes(self._buffer[start:end])
+        del self._buffer[:end]
+        return success, reply
+
+    async def _send_commands_locked(
+        self, commands: list[str], response_terminator: bytes
+    ) -> list[tuple[bool, bytes]]:
+        """Run send_commands under the connection lock, returning raw replies."""
+        async with self._lock:
+            self._cancel_idle_timer()
+            try:
+                if self._pipelining or len(commands) == 1:
+                    results = await self._run_batch(commands, response_terminator)
+                    if len(commands) > 1 and len(results) == len(commands):
+                        self._pipelining_confirmed = True
+                else:
+                    results = []
+
+                if len(results) < len(commands):
+                    if len(commands) == 1 or (results and not results[-1][0]):
+                        # The batch failed outright; report the rest as failed too.
+                        failure = results[-1][1] if results else b"No response"
+                        results.extend(
+                            [(False, failure)] * (len(commands) - len(results))
+                        )
+                    else:
+                        if results and self._pipelining:
+                            self._disable_pipelining()
+                        for command in commands[len(results) :]:
+                            results.extend(
+                                await self._run_batch([command], response_terminator)
+                                or [(False, b"No response")]
+                            )
+                return results
+
+            except asyncio.CancelledError:
+                # Cancelled mid-exchange (e.g. by a poll deadline): the rest of the
+                # reply may still arrive, so the connection must not be reused.
+                self.close()
+                raise
+            except (ConnectionRefusedError, asyncio.TimeoutError, OSError) as e:
+                _LOGGER.error(
+                    f"Failed to send command to {self._host}:{self._port}: {e}"
+                )
+                self.close()
+                return [(False, str(e).encode("utf-8"))] * len(commands)
+            except Exception as e:
+                _LOGGER.error(f"An unexpected error occurred in send_command: {e}")
+                self.close()
+                return [(False, str(e).encode("utf-8"))] * len(commands)
+            finally:
+                self._last_used = time.monotonic()
+                if not self._persistent:
+                    self.close()  # Ensure connection is closed after each command attempt
+                elif self.is_connected:
+                    self._schedule_idle_close()
+
+    async def _run_batch(
+        self, commands: list[str], response_terminator: bytes
+    ) -> list[tuple[bool, bytes]]:
+        """
+        Connect if needed, write the commands and collect their replies.
+
+        Returns the results for the leading commands that were answered (success
+        or explicit failure). A shorter list means the remaining commands got no
+        reply before the connection failed or timed out.
+        """
+        reused = await self._ensure_connected()
+        results, peer_closed = await self._exchange(commands, response_terminator)
+        if peer_closed and reused and not any(response for _, response in results):
+            # The reused connection was dead; retry once on a fresh one.
+            _LOGGER.debug(
+                f"Reused connection to {self._host}:{self._port} was stale, reconnecting"
+            )
+            self.close()
             await self._ensure_connected()
-            if not self._writer:  # Connection failed in _ensure_connected
-                return False, "Connection failed"
+            results, _ = await self._exchange(commands, response_terminator)
+        if len(results) < len(commands) or not all(ok for ok, _ in results):
+            # Never reuse a connection that may still carry a late reply.
+            self.close()
+        return results
 
+    async def _exchange(
+        self, commands: list[str], response_terminator: bytes
+    ) -> tuple[list[tuple[bool, bytes]], bool]:
+        """
+        Write the commands on the open connection and read their replies in order.
+
+        Returns:
+            A tuple (results, peer_closed). 'results' holds (success, response)
+            for each command answered so far; a failed reply ends the list.
+            'peer_closed' is True when the printer closed or reset the
+            connection before all replies were received.
+        """
+        markers = [_echo_marker(command) for command in commands]
+        framers = [
+            self._reply_framers.get(_command_word(command)) for command in commands
+        ]
+        for command in commands:
             _LOGGER.debug(
                 f"Sending command to {self._host}:{self._port}: {command.strip()}"
             )
-            self._writer.write(command.encode("utf-8"))
-            await asyncio.wait_for(self._writer.drain(), timeout=self._timeout)
+        try:
+            self._writer.write("".join(commands).encode("utf-8"))
+            await asyncio.wait_for(self._writer.drain(), timeout=self.rtt.timeout)
+            self._sent_at = time.monotonic()
+        except (ConnectionResetError, BrokenPipeError) as e:
+            _LOGGER.debug(f"Connection lost while writing command: {e}")
+            return [], True
 
-            # Read response until terminator or timeout
-            while True:
-                try:
-                    chunk = await asyncio.wait_for(
-                        self._reader.read(TCP_BUFFER_SIZE), timeout=self._timeout
+        replies: list[tuple[bool, bytes]] = []
+        peer_closed = False
+        for index, marker in enumerate(markers):
+            next_marker = markers[index + 1] if index + 1 < len(markers) else None
+            success, response, peer_closed, skipped = await self._read_reply(
+                marker, response_terminator, next_marker, framers[index]
+            )
+            if skipped:
+                if replies:
+                    # Trailing payload of the previous reply, e.g. M661 file data.
+                    replies[-1] = (replies[-1][0], replies[-1][1] + skipped)
+                else:
+                    _LOGGER.debug(
+                        f"Discarding {len(skipped)} stale bytes before {marker!r}"
                     )
-                    if not chunk:  # Connection closed by peer
-                        _LOGGER.warning(
-                            f"Connection closed by {self._host}:{self._port} while awaiting response."
-                        )
-                        break
+            if not success and not response and index > 0:
+                break  # No reply at all for this command: leave it unanswered.
+            replies.append((success, response))
+            if not success:
+                break
+        return replies, peer_closed
 
-                    # Decode using utf-8, ignoring errors. This is to handle potential
-                    # non-UTF-8 characters or binary noise from the printer without crashing.
-                    # May result in some data loss if malformed multi-byte UTF-8 sequences
-                    # or other encodings are present.
-                    decoded_chunk = chunk.decode("utf-8", errors="ignore")
-                    full_response_data += decoded_chunk
-                    _LOGGER.debug(f"Received chunk: {decoded_chunk.strip()}")
-
-                    if response_terminator in full_response_data:
-                        _LOGGER.debug(
-                            f"Response terminator '{response_terminator.strip()}' found."
-                        )
-                        return True, full_response_data.strip()
-                except asyncio.TimeoutError:
-                    _LOGGER.warning(
-                        f"Timeout waiting for response from {self._host}:{self._port} after sending command. Partial response: {full_response_data.strip()}"
+    async def _read_reply(
+        self,
+        echo_marker: Optional[bytes],
+        response_terminator: bytes,
+        next_marker: Optional[bytes] = None,
+        framer: Optional[Callable[[bytearray, int], Optional[int]]] = None,
+    ) -> tuple[bool, bytes, bool, bytes]:
+        """
+        Read one reply from the connection buffer, reading more data as needed.
+
+        Data before this command's echo marker is returned separately as
+        'skipped', and the terminator is only searched for after that echo, so
+        an 'ok' in stale data is never taken as this command's reply. When
+        the terminator is found, the reply extends up to the next command's
+        echo marker (or to the end of the buffered data). With
+        a framer, it extends to the end of the payload the framer finds after
+        the terminator instead, and more data is read until that payload is
+        complete.
+
+        Each search resumes where the previous one stopped (less the needle
+        length, for matches split across reads), so every received byte is
+        scanned a bounded number of times.
+
+        Returns:
+            A tuple (success, response, peer_closed, skipped).
+        """
+        skipped = b""
+        synced = echo_marker is None
+        marker_from = 0
+        terminator_from = 0
+        while True:
+            if not synced:
+                marker_index = self._buffer.find(echo_marker, marker_from)
+                if marker_index > 0:
+                    skipped = bytes(self._buffer[:marker_index])
+                    del self._buffer[:marker_index]
+                    terminator_from = 0
+                synced = marker_index >= 0
+                if not synced:
+                    marker_from = max(0, len(self._buffer) - len(echo_marker) + 1)
+
+            # Before this command's echo, an 'ok' belongs to stale data
+            terminator_index = (
+                self._buffer.find(response_terminator, terminator_from)
+                if synced
+                else -1
+            )
+            if terminator_index < 0:
+                if synced:
+                    terminator_from = max(
+                        0, len(self._buffer) - len(response_terminator) + 1
                     )
-                    break  # Exit loop on timeout
-                except ConnectionResetError:
-                    _LOGGER.warning(
-                        f"Connection reset by {self._host}:{self._port} while awaiting response."
+            else:
+                payload_start = terminator_index + len(response_terminator)
+                end = framer(self._buffer, payload_start) if framer else None
+                if end is None:
+                    next_index = (
+                        self._buffer.find(next_marker, payload_start)
+                        if next_marker
+                        else -1
                     )
-                    break
-                except Exception as e:  # Catch other read errors
-                    _LOGGER.error(
-                        f"Error reading response from {self._host}:{self._port}: {e}. Partial response: {full_response_data.strip()}"
+                    if next_index >= 0:
+                        end = next_index
+                    elif not framer:
+                        end = len(self._buffer)
+                if end is not None:
+                    _LOGGER.debug(
+                        f"Response terminator {response_terminator.strip()!r} found."
                     )
-                    break
-
-            return (
-                False,
-                full_response_data.strip(),
-            )  # Terminator not found or other read issue
-
-        except (ConnectionRefusedError, asyncio.TimeoutError, OSError) as e:
-            _LOGGER.error(f"Failed to send command to {self._host}:{self._port}: {e}")
-            return False, str(e)
-        except Exception as e:
-            _LOGGER.error(f"An unexpected error occurred in send_command: {e}")
-            return False, str(e)
-        finally:
-            self.close()  # Ensure connection is closed after each command attempt
+                    response = bytes(self._buffer[:end])
+                    del self._buffer[:end]
+                    return True, response, False, skipped
+                # The payload after the terminator is still arriving.
+                terminator_from = terminator_index
+
+            # Only the wait for the first reply byte measures the link
+            first_byte = self._sent_at is not None
+            timeout = self.rtt.timeout
+            if not first_byte:
+                timeout = max(timeout, self._reply_timeout)
+            try:
+                chunk = await asyncio.wait_for(
+                    self._reader.read(self._read_size), timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                self.timeout_count += 1
+                if first_byte:
+                    self.rtt.on_timeout()
+                _LOGGER.warning(
+                    f"Timeout waiting for response from {self._host}:{self._port} after sending command. Partial response: {decode_response(self._buffer)}"
+                )
+                return self._reply_failure(synced, skipped, False)
+            except ConnectionResetError:
+                _LOGGER.warning(
+                    f"Connection reset by {self._host}:{self._port} while awaiting response."
+                )
+                return self._reply_failure(synced, skipped, True)
+            except Exception as e:  # Catch other read errors
+                _LOGGER.error(
+                    f"Error reading response from {self._host}:{self._port}: {e}. Partial response: {decode_response(self._buffer)}"
+                )
+                return self._reply_failure(synced, skipped, False)
+
+            if not chunk:  # Connection closed by peer
+                _LOGGER.warning(
+                    f"Connection closed by {self._host}:{self._port} while awaiting response."
+                )
+                return self._reply_failure(synced, skipped, True)
+
+            if self._sent_at is not None:
+                # Time to first byte of the reply: one round trip
+                self.rtt.observe(time.monotonic() - self._sent_at)
+                self._sent_at = None
+            # Keep the raw bytes: decoding here would corrupt binary payloads
+            # such as the M661 listing. Text replies are decoded by the caller.
+            self._buffer += chunk
+            _LOGGER.debug(f"Received chunk of {len(chunk)} bytes")
+            if len(self._buffer) > self._max_response_size:
+                _LOGGER.warning(
+                    f"Response from {self._host}:{self._port} exceeded {self._max_response_size} bytes without a terminator; giving up"
+                )
+                return self._reply_failure(synced, skipped, False)
+
+    def _reply_failure(
+        self, synced: bool, skipped: bytes, peer_closed: bool
+    ) -> tuple[bool, bytes, bool, bytes]:
+        """Build the failed result of _read_reply from the unconsumed buffer."""
+        data, self._buffer = bytes(self._buffer), bytearray()
+        if not synced:
+            # This command's echo never arrived, so the data is not its reply.
+            return False, b"", peer_closed, skipped + data
+        return False, data, peer_closed, skipped
@@ -0,0 +1,530 @@
+"""Print time and filament estimates from G-code files.
+
+Files are read in large blocks and never decoded into Python strings. With
+NumPy available each block is decoded in one vectorized pass:
+
+- line starts, comment starts and the command of each line are found with
+  array operations on the raw bytes;
+- the numbers after X, Y, Z, E, F (and S for M204) are parsed as fixed-width
+  digit windows, all at once;
+- positions follow from cumulative sums, so absolute and relative moves,
+  G92 resets and G28 homing need no per-line loop; feed rate, acceleration
+  and positioning modes are carried forward from the row that set them.
+
+Without NumPy the same model runs line by line, which is correct but
+several times slower.
+
+Each move is timed with a trapezoidal velocity profile: it accelerates from
+the junction speed to its feed rate and decelerates back, or reaches only a
+peak speed if it is too short. This ignores look-ahead across moves and
+heating waits, so estimates run a little long on dense infill and short by
+the heat-up time. Positioning modes follow Klipper, which the printer runs:
+E moves are relative after G91 or M83.
+
+A new layer starts when an extruding move reaches a Z above every earlier
+extruding move, so Z hops on travel moves do not count as layers.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+from .gx_file import GX_HEADER_SIZE, parse_gx_header
+
+# Bytes read per block; a block is parsed as a whole
+READ_SIZE = 1024 * 1024
+# Longest number parsed after a parameter letter ('-1234.56789')
+NUMBER_WIDTH = 16
+# Z rise of extruding moves that counts as a new layer (mm)
+LAYER_EPSILON = 1e-3
+# Layer times kept in the summary (the slowest ones)
+SUMMARY_SLOWEST_LAYERS = 5
+
+# Row kinds: the commands that affect position, timing or modes
+_MOVE, _G28, _G90, _G91, _G92, _M82, _M83, _M204 = range(8)
+# Parameter letters and their column: X, Y, Z, E, F, S
+_LETTERS = b"XYZEFS"
+_X, _Y, _Z, _E, _F, _S = range(6)
+
+
+@dataclass(frozen=True)
+class MotionModel:
+    """Printer and filament parameters used for the estimates."""
+
+    acceleration: float  # mm/s², until the file sets one with M204
+    junction_speed: float  # mm/s at the start and end of every move
+    feed_rate: float  # mm/min, until the file sets one
+    filament_diameter: float  # mm
+    filament_density: float  # g/cm³
+
+
+@dataclass
+class GcodeAnalysis:
+    """Estimates for one file."""
+
+    md5: str
+    file_name: str
+    size: int
+    print_time: float = 0.0
+    filament_length: float = 0.0
+    filament_weight: float = 0.0
+    layer_times: list[float] = field(default_factory=list)
+    moves: int = 0
+    # The slicer's own print time estimate, if the file carries one (.gx)
+    slicer_print_time: Optional[int] = None
+    vectorized: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def layer_count(self) -> int:
+        """Number of layers with extruding moves."""
+        return len(self.layer_times)
+
+    def summary(self) -> dict[str, Any]:
+        """Return the headline estimates, for entity attributes."""
+        return {
+            "estimated_print_time_s": round(self.print_time),
+            "filament_length_m": round(self.filament_length / 1000, 2),
+            "filament_weight_g": round(self.filament_weight, 1),
+            "layer_count": self.layer_count,
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable record for diagnostics."""
+        slowest = sorted(
+            range(len(self.layer_times)), key=self.layer_times.__getitem__, reverse=True
+        )[:SUMMARY_SLOWEST_LAYERS]
+        return {
+            "file": self.file_name,
+            "md5": self.md5,
+            "size": self.size,
+            **self.summary(),
+            "slicer_print_time_s": self.slicer_print_time,
+            "slowest_layers": {
+                layer + 1: round(self.layer_times[layer], 1) for layer in slowest
+            },
+            "layer_times_s": [round(t, 1) for t in self.layer_times],
+            "moves": self.moves,
+            "vectorized": self.vectorized,
+            "analysis_s": round(self.elapsed, 3),
+        }
+
+
+class GcodeAnalysisCache:
+    """Analyses by content hash (least recently used first out), and which printer file has which."""
+
+    def __init__(self, max_entries: int) -> None:
+        """Initialize an empty cache holding up to max_entries analyses."""
+        self._max_entries = max_entries
+        self._analyses: OrderedDict[str, GcodeAnalysis] = OrderedDict()
+        # Printer path -> MD5 of the local file it was uploaded or analysed from
+        self._paths: dict[str, str] = {}
+
+    def get(self, md5: str) -> Optional[GcodeAnalysis]:
+        """Return the analysis of a content hash, if cached."""
+        analysis = self._analyses.get(md5)
+        if analysis is not None:
+            self._analyses.move_to_end(md5)
+        return analysis
+
+    def put(self, analysis: GcodeAnalysis, printer_path: Optional[str] = None) -> None:
+        """Cache an analysis, optionally as the one of a printer file."""
+        self._analyses[analysis.md5] = analysis
+        self._analyses.move_to_end(analysis.md5)
+        while len(self._analyses) > self._max_entries:
+            self._analyses.popitem(last=False)
+        if printer_path is not None:
+            self._paths[printer_path] = analysis.md5
+
+    def for_path(self, printer_path: str) -> Optional[GcodeAnalysis]:
+        """Return the analysis of a printer file, if known and still cached."""
+        md5 = self._paths.get(printer_path)
+        return self._analyses.get(md5) if md5 is not None else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot for diagnostics."""
+        return {
+            "files": {
+                path: md5 for path, md5 in self._paths.items() if md5 in self._analyses
+            },
+            "analyses": [analysis.as_dict() for analysis in self._analyses.values()],
+        }
+
+
+@dataclass
+class _State:
+    """Parser state carried from one block to the next."""
+
+    model: MotionModel
+    position: list[float] = field(default_factory=lambda: [0.0, 0.0, 0.0, 0.0])
+    absolute: bool = True
+    absolute_e: bool = True
+    feed_rate: float = 0.0
+    acceleration: float = 0.0
+    top_z: float = -math.inf
+    layer: int = 0
+    print_time: float = 0.0
+    filament: float = 0.0
+    moves: int = 0
+    layer_times: list[float] = field(default_factory=list)
+
+    def add_layer_time(self, layer: int, seconds: float) -> None:
+        # Moves before the first extruding layer (start G-code) count for layer 1.
+        index = max(layer, 1) - 1
+        if index >= len(self.layer_times):
+            self.layer_times.extend([0.0] * (index + 1 - len(self.layer_times)))
+        self.layer_times[index] += seconds
+
+
+def file_md5(path: str) -> str:
+    """MD5 of a file, read in blocks (run in the executor)."""
+    digest = hashlib.md5()
+    with open(path, "rb") as handle:
+        while block := handle.read(READ_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def analyze_file(path: str, file_name: str, model: MotionModel) -> GcodeAnalysis:
+    """
+    Analyse a .gcode or .gx file (run in the executor).
+
+    The file is read once, in READ_SIZE blocks; the MD5 of the whole file is
+    computed on the way.
+    """
+    started = time.monotonic()
+    state = _State(model, feed_rate=model.feed_rate, acceleration=model.acceleration)
+    digest = hashlib.md5()
+    size = 0
+    slicer_print_time = None
+    process = _process_block_numpy if np is not None else _process_block_python
+    with open(path, "rb") as handle:
+        head = handle.read(GX_HEADER_SIZE)
+        digest.update(head)
+        size += len(head)
+        gx_header = parse_gx_header(head)
+        if gx_header is not None:
+            # Skip the preview bitmap; it still counts towards the hash.
+            skipped = handle.read(gx_header.gcode_offset - len(head))
+            digest.update(skipped)
+            size += len(skipped)
+            slicer_print_time = gx_header.print_time
+            head = b""
+        remainder = head
+        while block := handle.read(READ_SIZE):
+            digest.update(block)
+            size += len(block)
+            data = remainder + block
+            cut = data.rfind(b"\n") + 1
+            remainder = data[cut:]
+            if cut:
+                process(data[:cut], state)
+        if remainder:
+            process(remainder + b"\n", state)
+
+    area = math.pi * (model.filament_diameter / 2) ** 2
+    filament = max(state.filament, 0.0)
+    return GcodeAnalysis(
+        md5=digest.hexdigest(),
+        file_name=file_name,
+        size=size,
+        print_time=state.print_time,
+        filament_length=filament,
+        filament_weight=filament * area * model.filament_density / 1000,
+        layer_times=state.layer_times,
+        moves=state.moves,
+        slicer_print_time=slicer_print_time,
+        vectorized=np is not None,
+        elapsed=time.monotonic() - started,
+    )
+
+
+def _move_time(
+    length: float, speed: float, acceleration: float, junction: float
+) -> float:
+    """Duration of one move with a trapezoidal (or triangular) velocity profile."""
+    if length <= 0 or speed <= 0:
+        return 0.0
+    junction = min(junction, speed)
+    if acceleration <= 0 or speed == junction:
+        return length / speed
+    ramp = (speed * speed - junction * junction) / acceleration
+    if length >= ramp:
+        return (length - ramp) / speed + 2 * (speed - junction) / acceleration
+    peak = math.sqrt(acceleration * length + junction * junction)
+    return 2 * (peak - junction) / acceleration
+
+
+def _process_block_python(block: bytes, state: _State) -> None:
+    """Reference implementation of _process_block_numpy, one line at a time."""
+    model = state.model
+    for line in block.split(b"\n"):
+        code, _, _ = line.partition(b";")
+        words = code.split()
+        if not words:
+            continue
+        command = words[0].upper()
+        params: dict[int, float] = {}
+        for word in words[1:]:
+            column = _LETTERS.find(word[:1].upper())
+            if column >= 0:
+                try:
+                    params[column] = float(word[1:])
+                except ValueError:
+                    pass
+        if command in (b"G0", b"G1", b"G00", b"G01"):
+            start = list(state.position)
+            for axis in (_X, _Y, _Z, _E):
+                if axis in params:
+                    relative = not state.absolute or (
+                        axis == _E and not state.absolute_e
+                    )
+                    state.position[axis] = (
+                        state.position[axis] + params[axis]
+                        if relative
+                        else params[axis]
+                    )
+            if _F in params:
+                state.feed_rate = params[_F]
+            dx, dy, dz, de = (state.position[i] - start[i] for i in range(4))
+            xy = math.hypot(dx, dy)
+            distance = math.hypot(xy, dz)
+            seconds = _move_time(
+                distance or abs(de),
+                state.feed_rate / 60,
+                state.acceleration,
+                model.junction_speed,
+            )
+            if de > 0 and xy > 0 and state.position[_Z] > state.top_z:
+                if state.position[_Z] > state.top_z + LAYER_EPSILON:
+                    state.layer += 1
+                state.top_z = state.position[_Z]
+            state.moves += 1
+            state.filament += de
+            state.print_time += seconds
+            state.add_layer_time(state.layer, seconds)
+        elif command == b"G92":
+            for axis in (_X, _Y, _Z, _E):
+                if axis in params:
+                    state.position[axis] = params[axis]
+        elif command == b"G28":
+            state.position[:3] = [0.0, 0.0, 0.0]
+        elif command == b"G90":
+            state.absolute = True
+        elif command == b"G91":
+            state.absolute = False
+        elif command == b"M82":
+            state.absolute_e = True
+        elif command == b"M83":
+            state.absolute_e = False
+        elif command == b"M204" and _S in params:
+            state.acceleration = params[_S]
+
+
+if np is not None:
+    # Byte -> is a parameter letter, and byte -> its column (either case)
+    _COLUMN_TABLE = np.zeros(256, dtype=np.intp)
+    _LETTER_TABLE = np.zeros(256, dtype=bool)
+    for _column, _letter in enumerate(_LETTERS):
+        for _byte in (_letter, _letter | 0x20):
+            _COLUMN_TABLE[_byte] = _column
+            _LETTER_TABLE[_byte] = True
+
+
+def _forward_fill(values: Any) -> Any:
+    """Replace NaNs with the last value before them (values[0] must be set)."""
+    index = np.where(np.isnan(values), 0, np.arange(len(values)))
+    np.maximum.accumulate(index, out=index)
+    return values[index]
+
+
+def _parse_numbers(data: Any, positions: Any) -> Any:
+    """Parse the numbers starting at the given byte positions; NaN where there is none."""
+    # One column of characters at a time, for all numbers at once
+    char = data[positions]
+    negative = char == 45
+    offset = (negative | (char == 43)).astype(np.intp)
+    mantissa = np.zeros(len(positions), dtype=np.int64)
+    decimals = np.zeros(len(positions), dtype=np.int64)
+    digits = np.zeros(len(positions), dtype=np.int64)
+    point = np.zeros(len(positions), dtype=bool)
+    active = np.ones(len(positions), dtype=bool)
+    for column in range(NUMBER_WIDTH):
+        char = data[positions + offset + column]
+        digit = active & (char >= 48) & (char <= 57)
+        dot = active & (char == 46) & ~point
+        active = digit | dot
+        if not active.any():
+            break
+        mantissa = np.where(digit, mantissa * 10 + (char - 48), mantissa)
+        digits += digit
+        decimals += digit & point
+        point |= dot
+    values = mantissa / np.power(10.0, decimals)
+    values = np.where(negative, -values, values)
+    return np.where(digits > 0, values, np.nan)
+
+
+def _process_block_numpy(block: bytes, state: _State) -> None:
+    """Analyse a block of complete lines; see the module docstring."""
+    model = state.model
+    size = len(block)
+    # Padding so every line start and number window can be indexed directly
+    data = np.frombuffer(block + b"\0" * (NUMBER_WIDTH + 4), dtype=np.uint8)
+    ends = np.flatnonzero(data[:size] == 10)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+
+    # Command of each line from its first four bytes
+    b0, b1, b2, b3 = (data[starts + i] for i in range(4))
+    upper0 = b0 & 0xDF
+    is_g, is_m = upper0 == 71, upper0 == 77
+
+    def is_digit(b: Any) -> Any:
+        return (b >= 48) & (b <= 57)
+
+    def is_end(b: Any) -> Any:
+        return (b == 32) | (b == 9) | (b == 13) | (b == 10) | (b == 59)
+
+    one_digit = is_digit(b1) & is_end(b2)
+    two_digits = is_digit(b1) & is_digit(b2) & is_end(b3)
+    number = np.where(
+        one_digit, b1.astype(np.int32) - 48, (b1.astype(np.int32) - 48) * 10 + b2 - 48
+    )
+    number = np.where(one_digit | two_digits, number, -1)
+    is_m204 = is_m & (b1 == 50) & (b2 == 48) & (b3 == 52) & is_end(data[starts + 4])
+    kinds = np.select(
+        [
+            is_g & (number == 0) | is_g & (number == 1),
+            is_g & (number == 28),
+            is_g & (number == 90),
+            is_g & (number == 91),
+            is_g & (number == 92),
+            is_m & (number == 82),
+            is_m & (number == 83),
+            is_m204,
+        ],
+        [_MOVE, _G28, _G90, _G91, _G92, _M82, _M83, _M204],
+        -1,
+    )
+    row_lines = np.flatnonzero(kinds >= 0)
+    rows = len(row_lines)
+    if not rows:
+        return
+    row_of_line = np.cumsum(kinds >= 0) - 1
+    kind = kinds[row_lines]
+
+    # Parameter letters after a space, on row lines, before any comment
+    letters = (
+        np.flatnonzero(
+            _LETTER_TABLE[data[1:size]]
+            & ((data[: size - 1] == 32) | (data[: size - 1] == 9))
+        )
+        + 1
+    )
+    line = np.searchsorted(starts, letters, side="right") - 1
+    comment_start = ends.copy()
+    semicolons = np.flatnonzero(data[:size] == 59)
+    if len(semicolons):
+        semicolon_lines, first = np.unique(
+            np.searchsorted(starts, semicolons, side="right") - 1, return_index=True
+        )
+        comment_start[semicolon_lines] = semicolons[first]
+    keep = (kinds[line] >= 0) & (letters < comment_start[line])
+    letters, line = letters[keep], line[keep]
+    column = _COLUMN_TABLE[data[letters]]
+    values = _parse_numbers(data, letters + 1)
+
+    # Parameter table; row 0 carries the state from the previous block
+    table = np.full((6, rows + 1), np.nan)
+    table[column, row_of_line[line] + 1] = values
+    kind = np.concatenate(([-1], kind))
+    moves = kind == _MOVE
+
+    absolute = np.full(rows + 1, np.nan)
+    absolute[0] = state.absolute
+    absolute[kind == _G90] = 1.0
+    absolute[kind == _G91] = 0.0
+    absolute = _forward_fill(absolute) > 0
+    absolute_e = np.full(rows + 1, np.nan)
+    absolute_e[0] = state.absolute_e
+    absolute_e[kind == _M82] = 1.0
+    absolute_e[kind == _M83] = 0.0
+    absolute_e = _forward_fill(absolute_e) > 0
+
+    position = []
+    for axis in (_X, _Y, _Z, _E):
+        given = table[axis]
+        relative = moves & ~(absolute & (absolute_e if axis == _E else True))
+        offsets = np.cumsum(np.where(relative & ~np.isnan(given), given, 0.0))
+        sets = (~relative & (moves | (kind == _G92))) & ~np.isnan(given)
+        target = np.where(sets, given, np.nan)
+        if axis != _E:
+            target[kind == _G28] = 0.0
+        target[0] = state.position[axis]
+        base = _forward_fill(np.where(np.isnan(target), np.nan, target - offsets))
+        position.append(base + offsets)
+    x, y, z, e = position
+
+    feed = table[_F].copy()
+    feed[0] = state.feed_rate
+    feed = _forward_fill(feed)
+    accel = np.where(kind == _M204, table[_S], np.nan)
+    accel[0] = state.acceleration
+    accel = _forward_fill(accel)
+
+    # Per-move geometry and time (rows 1.. against the row before)
+    moves = moves[1:]
+    dx, dy, dz, de = (np.diff(axis)[moves] for axis in position)
+    xy = np.hypot(dx, dy)
+    distance = np.hypot(xy, dz)
+    length = np.where(distance > 0, distance, np.abs(de))
+    speed = feed[1:][moves] / 60
+    acceleration = accel[1:][moves]
+    junction = np.minimum(model.junction_speed, speed)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ramp = (speed**2 - junction**2) / acceleration
+        peak = np.sqrt(acceleration * length + junction**2)
+        seconds = np.where(
+            length >= ramp,
+            (length - ramp) / speed + 2 * (speed - junction) / acceleration,
+            2 * (peak - junction) / acceleration,
+        )
+        seconds = np.where(
+            (acceleration <= 0) | (speed == junction), length / speed, seconds
+        )
+    seconds = np.where((length > 0) & (speed > 0), seconds, 0.0)
+
+    # Layers: each rise of the highest Z reached by an extruding move
+    move_z = z[1:][moves]
+    extruding = (de > 0) & (xy > 0)
+    top = np.fmax.accumulate(
+        np.concatenate(([state.top_z], np.where(extruding, move_z, np.nan)))
+    )
+    layer = state.layer + np.cumsum(top[1:] > top[:-1] + LAYER_EPSILON)
+    if len(layer):
+        layer_totals = np.bincount(np.maximum(layer, 1) - 1, weights=seconds)
+        for index in np.flatnonzero(layer_totals):
+            state.add_layer_time(int(index) + 1, float(layer_totals[index]))
+        state.layer = int(layer[-1])
+
+    state.position = [float(x[-1]), float(y[-1]), float(z[-1]), float(e[-1])]
+    state.absolute = bool(absolute[-1])
+    state.absolute_e = bool(absolute_e[-1])
+    state.feed_rate = float(feed[-1])
+    state.acceleration = float(accel[-1])
+    state.top_z = float(top[-1])
+    state.moves += int(moves.sum())
+    state.filament += float(de.sum())
+    state.print_time += float(seconds.sum())
@@ -0,0 +1,165 @@
+"""Windowed G-code streaming over the M-code port.
+
+Scripts (calibration, maintenance, custom moves) are sent line by line on
+their own M-code connection, with a sliding window of lines awaiting their
+'ok' (see FlashforgeTCPClient.stream_commands). The printer always has the
+next lines queued, so a script runs at the printer's pace instead of one
+round trip, or one connection, per line.
+
+Lines are cleaned before sending: comments (';' to end of line) and blank
+lines are dropped, and the '~' prefix the M-code port expects is added.
+Local files are read in the executor in bounded batches, never as a whole.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from functools import partial
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Optional
+
+from .flashforge_tcp import FlashforgeTCPClient, decode_response
+
+_LOGGER = logging.getLogger(__name__)
+
+# Approximate number of bytes read from a local file per executor job
+FILE_READ_HINT = 64 * 1024
+# Errors kept in the result; later ones are only counted
+MAX_REPORTED_ERRORS = 20
+
+
+def clean_line(line: str) -> Optional[str]:
+    """Return a G-code line ready to send ('~G1 X10\\r\\n'), or None if nothing is left."""
+    code = line.split(";", 1)[0].strip()
+    if not code:
+        return None
+    return f"{code if code.startswith('~') else '~' + code}\r\n"
+
+
+async def iter_script(script: str) -> AsyncIterator[tuple[int, str]]:
+    """Yield (line number, line) for each line of a script."""
+    for number, line in enumerate(script.splitlines(), 1):
+        yield number, line
+
+
+async def iter_file(
+    run_in_executor: Callable[..., Any], path: str
+) -> AsyncIterator[tuple[int, str]]:
+    """Yield (line number, line) of a local file, reading it in the executor in batches."""
+    handle = await run_in_executor(
+        partial(open, path, "r", encoding="utf-8", errors="replace")
+    )
+    try:
+        number = 0
+        while True:
+            lines: list[str] = await run_in_executor(handle.readlines, FILE_READ_HINT)
+            if not lines:
+                return
+            for line in lines:
+                number += 1
+                yield number, line
+    finally:
+        await run_in_executor(handle.close)
+
+
+@dataclass
+class GcodeStreamResult:
+    """Outcome and throughput of one streamed script."""
+
+    source: str
+    lines_sent: int = 0
+    lines_acknowledged: int = 0
+    error_count: int = 0
+    # (source line number, line, printer reply) of the first failed lines
+    errors: list[tuple[int, str, str]] = field(default_factory=list)
+    aborted: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        """True if every line was acknowledged and the stream was not aborted."""
+        return self.error_count == 0 and self.aborted is None
+
+    @property
+    def lines_per_second(self) -> Optional[float]:
+        """Acknowledged lines per second, if anything was sent."""
+        if not self.lines_acknowledged or self.elapsed <= 0:
+            return None
+        return self.lines_acknowledged / self.elapsed
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable summary for diagnostics."""
+        return {
+            "source": self.source,
+            "success": self.success,
+            "lines_sent": self.lines_sent,
+            "lines_acknowledged": self.lines_acknowledged,
+            "error_count": self.error_count,
+            "errors": [
+                {"line": number, "command": command, "reply": reply}
+                for number, command, reply in self.errors
+            ],
+            "aborted": self.aborted,
+            "elapsed_s": round(self.elapsed, 3),
+            "lines_per_second": (
+                round(self.lines_per_second, 1) if self.lines_per_second else None
+            ),
+        }
+
+
+async def stream_gcode(
+    client: FlashforgeTCPClient,
+    lines: AsyncIterator[tuple[int, str]],
+    source: str,
+    window: int,
+    ack_timeout: float,
+    stop_on_error: bool = True,
+) -> GcodeStreamResult:
+    """
+    Streams numbered G-code lines on the client's connection.
+
+    With ``stop_on_error`` the first line the printer rejects stops the
+    stream (lines already in flight are still answered); otherwise failed
+    lines are reported and streaming continues.
+    """
+    result = GcodeStreamResult(source)
+    # Source line numbers of the lines in flight, oldest first
+    line_numbers: deque[int] = deque()
+
+    async def commands() -> AsyncIterator[str]:
+        async for number, line in lines:
+            command = clean_line(line)
+            if command is None:
+                continue
+            line_numbers.append(number)
+            result.lines_sent += 1
+            yield command
+
+    def on_reply(index: int, command: str, success: bool, response: bytes) -> bool:
+        number = line_numbers.popleft()
+        if success:
+            result.lines_acknowledged += 1
+            return True
+        result.error_count += 1
+        reply = decode_response(response)
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append((number, command.strip(), reply))
+        _LOGGER.warning(
+            f"G-code line {number} of {source} ({command.strip()}) failed: {reply or 'no reply'}"
+        )
+        return not stop_on_error
+
+    started = time.monotonic()
+    command_iterator = commands()
+    try:
+        result.aborted = await client.stream_commands(
+            command_iterator, window, on_reply, ack_timeout
+        )
+    finally:
+        # Release the source (e.g. close the file) when stopped early.
+        await command_iterator.aclose()
+        await lines.aclose()
+    result.elapsed = time.monotonic() - started
+    return result
@@ -0,0 +1,55 @@
+"""Header of FlashPrint .gx files.
+
+A .gx file is G-code with a fixed binary header in front: the magic
+'xgcode 1.0', offsets of an embedded preview bitmap and of the G-code, and
+the slicer's own estimates. All fields are little-endian.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+GX_MAGIC = b"xgcode 1.0\n\0"
+# magic, reserved, bitmap offset, G-code offset (twice), print time (s),
+# filament used by the right and left extruder (mm)
+GX_HEADER = struct.Struct("<12s7I")
+# Size of the complete header; the bitmap normally starts right after it
+GX_HEADER_SIZE = 58
+
+
+@dataclass(frozen=True)
+class GxHeader:
+    """Offsets and slicer estimates from a .gx header."""
+
+    thumbnail_offset: int
+    gcode_offset: int
+    print_time: int
+    filament_length: int
+
+    @property
+    def thumbnail_size(self) -> int:
+        """Size of the embedded bitmap, which fills the gap up to the G-code."""
+        return max(self.gcode_offset - self.thumbnail_offset, 0)
+
+
+def parse_gx_header(data: bytes) -> Optional[GxHeader]:
+    """Parse the start of a file; None if it is not a .gx file."""
+    if len(data) < GX_HEADER.size or not data.startswith(GX_MAGIC):
+        return None
+    (
+        _,
+        _,
+        thumbnail_offset,
+        gcode_offset,
+        _,
+        print_time,
+        filament_right,
+        filament_left,
+    ) = GX_HEADER.unpack_from(data)
+    if not GX_HEADER_SIZE <= thumbnail_offset <= gcode_offset:
+        return None
+    return GxHeader(
+        thumbnail_offset, gcode_offset, print_time, filament_right + filament_left
+    )
@@ -0,0 +1,99 @@
+"""Image platform for Flashforge Adventurer 5M PRO integration.
+
+Shows the preview image embedded in the file being printed. Previews come
+from local files uploaded or analysed by the integration (see
+thumbnails.py); the printer itself does not serve them.
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from homeassistant.components.image import ImageEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    API_ATTR_DETAIL,
+    API_ATTR_STATUS,
+    API_ATTR_PRINT_FILE_NAME,
+    PRINTING_STATES,
+    DATA_KEY_FILE_ANALYSIS,
+)
+from .coordinator import FlashforgeDataUpdateCoordinator
+from .entity import FlashforgeEntity
+from .thumbnails import Thumbnail
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Flashforge image entities from a config entry."""
+    coordinator: FlashforgeDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities([FlashforgePrintPreviewImage(coordinator)])
+
+
+class FlashforgePrintPreviewImage(FlashforgeEntity, ImageEntity):
+    """Preview of the file being printed, or of the latest uploaded file while idle."""
+
+    _data_keys = frozenset(
+        {
+            f"{API_ATTR_DETAIL}.{API_ATTR_STATUS}",
+            f"{API_ATTR_DETAIL}.{API_ATTR_PRINT_FILE_NAME}",
+            DATA_KEY_FILE_ANALYSIS,
+        }
+    )
+
+    def __init__(self, coordinator: FlashforgeDataUpdateCoordinator) -> None:
+        """Initialize the image entity."""
+        FlashforgeEntity.__init__(
+            self,
+            coordinator,
+            name_suffix="Print Preview",
+            unique_id_key="print_preview",
+        )
+        ImageEntity.__init__(self, coordinator.hass)
+        self._attr_icon = "mdi:image-outline"
+        self._printer_path: Optional[str] = None
+        self._thumbnail: Optional[Thumbnail] = None
+        self._update_from_coordinator()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_from_coordinator()
+        super()._handle_coordinator_update()
+
+    def _update_from_coordinator(self) -> None:
+        """Pick the file to show and take its preview from the cache."""
+        thumbnails = self.coordinator.thumbnails
+        detail = (self.coordinator.data or {}).get(API_ATTR_DETAIL) or {}
+        file_name = detail.get(API_ATTR_PRINT_FILE_NAME)
+        if detail.get(API_ATTR_STATUS) in PRINTING_STATES and file_name:
+            self._printer_path = thumbnails.path_for_name(file_name)
+        else:
+            self._printer_path = thumbnails.latest_path
+        thumbnail = (
+            thumbnails.for_path(self._printer_path) if self._printer_path else None
+        )
+        if thumbnail is not self._thumbnail:
+            self._thumbnail = thumbnail
+            # A new timestamp makes the frontend fetch the image again.
+            self._attr_image_last_updated = dt_util.utcnow()
+            if thumbnail is not None:
+                self._attr_content_type = thumbnail.content_type
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the printer file the preview belongs to."""
+        return {"file": self._printer_path if self._thumbnail else None}
+
+    async def async_image(self) -> Optional[bytes]:
+        """Return the cached preview; no file is read here."""
+        return self._thumbnail.data if self._thumbnail else None
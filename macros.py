@@ -0,0 +1,68 @@
+"""Multi-command M-code macros for the Flashforge Adventurer 5M integration.
+
+A macro is an ordered list of M/G-code steps that must run back to back,
+e.g. G91, G0, G90 for a relative move. The command scheduler (see
+command_scheduler.py) runs a whole macro in one turn on the shared M-code
+connection, so no poll or other command can run between its steps:
+
+- each step is sent on its own and its 'ok' is awaited before the next;
+- the first failed step ends the macro, the remaining steps are skipped;
+- rollback steps (e.g. G90 to leave relative positioning) are always sent
+  afterwards, also after a failed step or a cancelled caller.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Macro:
+    """Steps to run in one exclusive session, and the steps that restore state."""
+
+    name: str
+    steps: list[str]
+    rollback: list[str] = field(default_factory=list)
+    response_terminator: str = "ok\r\n"
+
+
+@dataclass
+class MacroResult:
+    """Outcome of a macro: per-step acknowledgements and the rollback outcome."""
+
+    name: str
+    # (command, acknowledged, response) per step that was sent, in order
+    steps: list[tuple[str, bool, str]] = field(default_factory=list)
+    rollback: list[tuple[str, bool, str]] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+
+    @property
+    def failed_step(self) -> Optional[str]:
+        """The step that was not acknowledged, if any."""
+        for command, acknowledged, _ in self.steps:
+            if not acknowledged:
+                return command.strip()
+        return None
+
+    @property
+    def rollback_ok(self) -> bool:
+        """True if every rollback step was acknowledged."""
+        return all(acknowledged for _, acknowledged, _ in self.rollback)
+
+    @property
+    def success(self) -> bool:
+        """True if every step and every rollback step was acknowledged."""
+        return (
+            bool(self.steps)
+            and not self.skipped
+            and self.failed_step is None
+            and self.rollback_ok
+        )
+
+    @property
+    def response(self) -> str:
+        """The printer's replies to all steps, for logging."""
+        return "\n".join(
+            response for _, _, response in self.steps + self.rollback if response
+        )
@@ -0,0 +1,145 @@
+"""Poll-cycle metrics for the Flashforge Adventurer 5M integration.
+
+The coordinator records how long each phase of a poll takes (HTTP /detail,
+the M-code batch or each concurrently run probe, parsing, entity updates)
+and counts failures, retries and transferred bytes. Everything is kept in
+memory and exposed through the diagnostics download.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import Counter
+from typing import Any, Optional
+
+# Upper bucket bounds of the latency histograms, in milliseconds. Values above
+# the last bound fall into an overflow bucket.
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Poll phases timed by the coordinator (probe names are phases too)
+PHASE_POLL = "poll"
+PHASE_DETAIL = "detail"
+PHASE_TCP_BATCH = "tcp_batch"
+PHASE_PARSE = "parse"
+PHASE_ENTITY_UPDATE = "entity_update"
+PHASE_QUEUE_WAIT = (
+    "queue_wait"  # suffixed with ".<priority class>"; see command_scheduler.py
+)
+
+# Counter names
+COUNTER_POLLS = "polls"
+COUNTER_DETAIL_RETRIES = "detail_retries"
+COUNTER_DETAIL_FAILURES = "detail_failures"
+COUNTER_HTTP_BYTES_RECEIVED = "http_bytes_received"
+COUNTER_TCP_BYTES_RECEIVED = "tcp_bytes_received"
+COUNTER_PROBE_FAILURES = "probe_failures"  # suffixed with ".<probe>"
+COUNTER_SUPPRESSED_WRITES = "suppressed_state_writes"
+COUNTER_POLL_OVERRUNS = "poll_overruns"  # polls that ran into their deadline
+COUNTER_SKIPPED_TICKS = "skipped_ticks"  # update intervals that passed during a poll
+COUNTER_CANCELLED_PROBES = "cancelled_probes"  # suffixed with ".<probe>"
+COUNTER_HEDGED_REQUESTS = "hedged_detail_requests"  # second /detail request sent
+COUNTER_HEDGE_WINS = "hedged_detail_wins"  # ... and it answered first
+COUNTER_COMMANDS = "commands"  # M-codes sent, suffixed with ".<priority class>"
+COUNTER_SAFETY_LANE_FALLBACKS = (
+    "safety_lane_fallbacks"  # safety commands queued instead
+)
+COUNTER_COALESCED_DROPPED = "coalesced_commands_dropped"  # suffixed with ".<kind>"
+COUNTER_COALESCED_MERGED = "coalesced_commands_merged"  # suffixed with ".<kind>"
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations, plus count, sum, min, max and last."""
+
+    def __init__(self, buckets_ms: tuple[float, ...] = LATENCY_BUCKETS_MS) -> None:
+        """Initialize an empty histogram with the given bucket bounds."""
+        self._bounds = buckets_ms
+        self._counts = [0] * (len(buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms: Optional[float] = None
+        self.last_ms: Optional[float] = None
+
+    def observe(self, seconds: float) -> None:
+        """Record one duration."""
+        value_ms = seconds * 1000
+        self._counts[bisect.bisect_left(self._bounds, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.last_ms = value_ms
+        self.min_ms = value_ms if self.min_ms is None else min(self.min_ms, value_ms)
+        self.max_ms = value_ms if self.max_ms is None else max(self.max_ms, value_ms)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """
+        Estimate a percentile (0..1) as the upper bound of the bucket holding it.
+
+        Returns the observed maximum for the overflow bucket, or None if empty.
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                if index < len(self._bounds):
+                    return float(min(self._bounds[index], self.max_ms))
+                return self.max_ms
+        return self.max_ms
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable summary."""
+        buckets = {
+            f"le_{bound}ms": count for bound, count in zip(self._bounds, self._counts)
+        }
+        buckets[f"gt_{self._bounds[-1]}ms"] = self._counts[-1]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "min_ms": _round(self.min_ms),
+            "max_ms": _round(self.max_ms),
+            "last_ms": _round(self.last_ms),
+            "p50_ms": _round(self.percentile(0.5)),
+            "p95_ms": _round(self.percentile(0.95)),
+            "buckets": buckets,
+        }
+
+
+class PollMetrics:
+    """Latency histograms per poll phase and named counters."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.counters: Counter[str] = Counter()
+
+    def observe(self, phase: str, seconds: float) -> None:
+        """Record the duration of one phase."""
+        histogram = self.histograms.get(phase)
+        if histogram is None:
+            histogram = self.histograms[phase] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        """Add to a counter."""
+        self.counters[counter] += amount
+
+    def last(self, phase: str) -> Optional[float]:
+        """Return the latest duration of a phase in milliseconds, if any."""
+        histogram = self.histograms.get(phase)
+        return histogram.last_ms if histogram else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot for diagnostics."""
+        return {
+            "latency": {
+                phase: histogram.as_dict()
+                for phase, histogram in sorted(self.histograms.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
@@ -0,0 +1,483 @@
+"""Single upstream MJPEG connection shared by all camera viewers.
+
+The printer's camera server copes with two or three clients at most, so the
+integration opens one stream per printer and serves every viewer (dashboards,
+phones, recorders) from it:
+
+- MjpegParser splits the multipart stream into JPEG frames, once;
+- FrameRing keeps the latest frames in one preallocated buffer and hands out
+  memoryview slices of it. A frame is copied only when it is handed to a
+  viewer's connection, which may still hold it after the ring moved on;
+- each MjpegSubscriber always takes the newest frame. A viewer that cannot
+  keep up skips frames instead of having them queued for it.
+
+The upstream connection is opened for the first subscriber and closed shortly
+after the last one leaves. Snapshots are taken from the newest frame while it
+is fresh, and keep the connection open for a while so that periodic snapshot
+requests (dashboard tiles) are answered from memory.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+import aiohttp
+from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+
+# mjpg-streamer's boundary, used when the Content-Type does not name one
+DEFAULT_BOUNDARY = b"boundarydonotcross"
+# Boundary of the stream served to viewers
+PROXY_BOUNDARY = "flashforgeframe"
+JPEG_SOI = b"\xff\xd8"
+
+_CONTENT_LENGTH = re.compile(
+    rb"^content-length:\s*(\d+)\s*$", re.IGNORECASE | re.MULTILINE
+)
+_BOUNDARY = re.compile(r"boundary=\"?([^\";]+)\"?", re.IGNORECASE)
+
+
+def stream_boundary(content_type: Optional[str]) -> bytes:
+    """Return the multipart boundary named in a Content-Type header."""
+    match = _BOUNDARY.search(content_type or "")
+    if match is None:
+        return DEFAULT_BOUNDARY
+    # Some servers repeat the leading dashes in the header
+    return match.group(1).strip().encode().removeprefix(b"--")
+
+
+class MjpegParser:
+    """Split a multipart/x-mixed-replace byte stream into JPEG frames."""
+
+    def __init__(
+        self,
+        boundary: bytes,
+        on_frame: Callable[[memoryview], None],
+        max_frame_size: int,
+    ) -> None:
+        """Initialize the parser; on_frame gets a view that is only valid during the call."""
+        self._delimiter = b"--" + boundary
+        self._on_frame = on_frame
+        self._max_frame_size = max_frame_size
+        self._buffer = bytearray()
+        self.frames = 0
+        self.discarded = 0
+
+    def feed(self, data: bytes) -> None:
+        """Add received bytes and pass on every complete frame."""
+        self._buffer += data
+        consumed = 0
+        while True:
+            end = self._next_frame(consumed)
+            if end is None:
+                break
+            consumed = end
+        if consumed:
+            del self._buffer[:consumed]
+        if len(self._buffer) > self._max_frame_size + 1024:
+            # No frame boundary within the size limit: drop the bytes and resync
+            # on the next delimiter.
+            _LOGGER.debug(
+                f"MJPEG parser discarded {len(self._buffer)} bytes without a frame boundary"
+            )
+            self.discarded += 1
+            self._buffer.clear()
+
+    def _next_frame(self, start: int) -> Optional[int]:
+        """Pass on the frame after start; return where the next one begins."""
+        buffer = self._buffer
+        part = buffer.find(self._delimiter, start)
+        if part < 0:
+            return None
+        headers_end = buffer.find(b"\r\n\r\n", part)
+        if headers_end < 0:
+            return None
+        body = headers_end + 4
+        match = _CONTENT_LENGTH.search(buffer, part, headers_end + 2)
+        if match is not None:
+            end = body + int(match.group(1))
+            if end > len(buffer):
+                return None
+            next_part = end
+        else:
+            next_part = buffer.find(self._delimiter, body)
+            if next_part < 0:
+                return None
+            end = next_part
+            while end > body and buffer[end - 1] in b"\r\n":
+                end -= 1
+        if end - body > self._max_frame_size:
+            self.discarded += 1
+        elif buffer.startswith(JPEG_SOI, body):
+            # The slice must be released before the buffer can be trimmed.
+            with memoryview(buffer) as view, view[body:end] as frame:
+                self._on_frame(frame)
+            self.frames += 1
+        else:
+            self.discarded += 1
+        return next_part
+
+
+class FrameRing:
+    """The latest frames, stored back to back in one fixed-size buffer.
+
+    A new frame overwrites the oldest ones it overlaps. frame() returns a
+    zero-copy view of a frame that is valid until the ring wraps around onto
+    it, so callers use it before awaiting anything and check again after.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize an empty ring of capacity bytes."""
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        # (sequence number, start, length) of the frames still held, oldest first
+        self._frames: deque[tuple[int, int, int]] = deque()
+        self._write = 0
+        self.sequence = 0
+
+    @property
+    def capacity(self) -> int:
+        """Size of the buffer in bytes."""
+        return len(self._buffer)
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def append(self, frame: memoryview) -> int:
+        """Copy a frame into the ring and return its sequence number."""
+        size = len(frame)
+        if size > len(self._buffer):
+            raise ValueError(f"Frame of {size} bytes does not fit the ring")
+        start = self._write if self._write + size <= len(self._buffer) else 0
+        end = start + size
+        if any(s < end and start < s + n for _, s, n in self._frames):
+            self._frames = deque(
+                entry
+                for entry in self._frames
+                if not (entry[1] < end and start < entry[1] + entry[2])
+            )
+        self._view[start:end] = frame
+        self._write = end
+        self.sequence += 1
+        self._frames.append((self.sequence, start, size))
+        return self.sequence
+
+    def frame(self, sequence: int) -> Optional[memoryview]:
+        """Return a view of a frame, or None once it has been overwritten."""
+        for number, start, size in reversed(self._frames):
+            if number == sequence:
+                return self._view[start : start + size]
+            if number < sequence:
+                break
+        return None
+
+    def latest(self) -> Optional[tuple[int, memoryview]]:
+        """Return the sequence number and a view of the newest frame."""
+        if not self._frames:
+            return None
+        number, start, size = self._frames[-1]
+        return number, self._view[start : start + size]
+
+
+class MjpegSubscriber:
+    """One viewer of the shared stream; only ever sees the newest frame."""
+
+    def __init__(self, proxy: MjpegProxy) -> None:
+        """Initialize a subscriber that has seen no frame yet."""
+        self._proxy = proxy
+        self._new_frame = asyncio.Event()
+        self.sequence = 0
+        self.frames = 0
+        self.dropped = 0
+
+    def notify(self) -> None:
+        """Wake the subscriber; called for each new frame and on shutdown."""
+        self._new_frame.set()
+
+    async def next_frame(self, timeout: float) -> Optional[tuple[int, memoryview]]:
+        """Wait for a frame newer than the last one taken; None on timeout or close."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not self._proxy.closed:
+            latest = self._proxy.ring.latest()
+            if latest is not None and latest[0] > self.sequence:
+                if self.sequence:
+                    self.dropped += latest[0] - self.sequence - 1
+                self.sequence = latest[0]
+                self.frames += 1
+                return latest
+            self._new_frame.clear()
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._new_frame.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+        return None
+
+
+class MjpegProxy:
+    """Keeps one upstream MJPEG connection and fans its frames out to subscribers."""
+
+    def __init__(
+        self,
+        url_getter: Callable[[], Optional[str]],
+        ring_bytes: int,
+        max_frame_size: int,
+        connect_timeout: float,
+        read_timeout: float,
+        reconnect_delay: float,
+        max_reconnect_delay: float,
+        idle_timeout: float,
+    ) -> None:
+        """Initialize the proxy; url_getter returns the current stream URL or None."""
+        self._url_getter = url_getter
+        self._max_frame_size = min(max_frame_size, ring_bytes)
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._idle_timeout = idle_timeout
+        self.ring = FrameRing(ring_bytes)
+        self._subscribers: set[MjpegSubscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+        self.closed = False
+        self.connected = False
+        self.upstream_connections = 0
+        self.upstream_errors = 0
+        self.bytes_received = 0
+        self.frames_received = 0
+        self.frames_discarded = 0
+        self.frames_dropped = 0
+        self.frames_sent = 0
+        self.snapshots = 0
+        self.snapshots_cached = 0
+        self.last_error: Optional[str] = None
+        self.last_frame_at: Optional[float] = None
+        # The newest frame as bytes, kept while it is the newest
+        self._snapshot: Optional[tuple[int, bytes]] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of current subscribers."""
+        return len(self._subscribers)
+
+    def subscribe(self) -> MjpegSubscriber:
+        """Add a subscriber, opening the upstream connection if needed."""
+        if self.closed:
+            raise RuntimeError("MJPEG proxy is closed")
+        subscriber = MjpegSubscriber(self)
+        if not self.connected:
+            # Frames left from an earlier connection are not shown.
+            subscriber.sequence = self.ring.sequence
+        self._subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return subscriber
+
+    def unsubscribe(
+        self, subscriber: MjpegSubscriber, linger: Optional[float] = None
+    ) -> None:
+        """Remove a subscriber.
+
+        Once none are left, the upstream closes after linger seconds (default:
+        the idle timeout).
+        """
+        if subscriber not in self._subscribers:
+            return
+        self._subscribers.discard(subscriber)
+        self.frames_dropped += subscriber.dropped
+        self.frames_sent += subscriber.frames
+        if self._task is None:
+            return
+        # Linger so that a reloading dashboard does not reconnect upstream. An
+        # earlier, longer keep-alive (snapshots) is not shortened.
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self._idle_timeout if linger is None else linger)
+        if self._idle_handle is not None:
+            if self._idle_handle.when() >= deadline:
+                return
+            self._idle_handle.cancel()
+        self._idle_handle = loop.call_at(deadline, self._stop_if_idle)
+
+    def _stop_if_idle(self) -> None:
+        self._idle_handle = None
+        if not self._subscribers and self._task is not None:
+            _LOGGER.debug("No MJPEG viewers left; closing the camera connection")
+            self._task.cancel()
+            self._task = None
+
+    async def async_close(self) -> None:
+        """Close the upstream connection and end all subscriber streams."""
+        self.closed = True
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        for subscriber in self._subscribers:
+            subscriber.notify()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_frame(self, frame: memoryview) -> None:
+        self.ring.append(frame)
+        self.frames_received += 1
+        self.last_frame_at = time.monotonic()
+        for subscriber in self._subscribers:
+            subscriber.notify()
+
+    async def _run(self) -> None:
+        """Read the upstream stream, reconnecting with backoff while there are subscribers."""
+        delay = self._reconnect_delay
+        timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=self._connect_timeout, sock_read=self._read_timeout
+        )
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            while not self.closed:
+                url = self._url_getter()
+                if url:
+                    try:
+                        if await self._read_stream(session, url):
+                            delay = self._reconnect_delay
+                    except (
+                        aiohttp.ClientError,
+                        asyncio.TimeoutError,
+                        ValueError,
+                    ) as err:
+                        self.upstream_errors += 1
+                        self.last_error = f"{type(err).__name__}: {err}"
+                        _LOGGER.debug(
+                            f"MJPEG stream from the printer failed: {self.last_error}"
+                        )
+                    finally:
+                        self.connected = False
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self._max_reconnect_delay)
+
+    async def _read_stream(self, session: aiohttp.ClientSession, url: str) -> bool:
+        """Feed one upstream connection to the parser; True if it delivered frames."""
+        async with session.get(url) as response:
+            response.raise_for_status()
+            self.upstream_connections += 1
+            self.connected = True
+            _LOGGER.debug("Camera stream connected")
+            parser = MjpegParser(
+                stream_boundary(response.headers.get(aiohttp.hdrs.CONTENT_TYPE)),
+                self._on_frame,
+                self._max_frame_size,
+            )
+            try:
+                async for chunk in response.content.iter_any():
+                    self.bytes_received += len(chunk)
+                    parser.feed(chunk)
+            finally:
+                self.frames_discarded += parser.discarded
+            self.last_error = "Stream ended"
+            return parser.frames > 0
+
+    async def async_snapshot(
+        self, max_age: float, timeout: float, keep_alive: float
+    ) -> Optional[tuple[int, bytes]]:
+        """Return the sequence number and bytes of the newest frame.
+
+        A frame younger than max_age is returned at once. Otherwise the stream
+        is read (connecting if needed) until the next frame arrives, and kept
+        open for keep_alive seconds so that the following snapshots are
+        served from memory. None if no frame arrives within timeout.
+        """
+        if self.closed:
+            return None
+        self.snapshots += 1
+        latest = self.ring.latest()
+        if (
+            latest is None
+            or self.last_frame_at is None
+            or time.monotonic() - self.last_frame_at > max_age
+        ):
+            subscriber = self.subscribe()
+            subscriber.sequence = latest[0] if latest is not None else 0
+            try:
+                latest = await subscriber.next_frame(timeout)
+            finally:
+                self.unsubscribe(subscriber, linger=keep_alive)
+            if latest is None:
+                return None
+        else:
+            self.snapshots_cached += 1
+        sequence, view = latest
+        if self._snapshot is None or self._snapshot[0] != sequence:
+            self._snapshot = (sequence, bytes(view))
+        return self._snapshot
+
+    async def async_handle_stream(
+        self, request: web.Request, frame_timeout: float
+    ) -> web.StreamResponse:
+        """Serve the shared stream to one HTTP viewer."""
+        subscriber = self.subscribe()
+        response = web.StreamResponse(
+            headers={
+                aiohttp.hdrs.CONTENT_TYPE: (
+                    f"multipart/x-mixed-replace;boundary={PROXY_BOUNDARY}"
+                )
+            }
+        )
+        try:
+            await response.prepare(request)
+            while (frame := await subscriber.next_frame(frame_timeout)) is not None:
+                sequence, view = frame
+                await response.write(
+                    f"\r\n--{PROXY_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(view)}\r\n\r\n".encode()
+                )
+                # Writing the part header may have waited for a slow client;
+                # re-check that the frame was not overwritten meanwhile.
+                view = self.ring.frame(sequence)
+                if view is None:
+                    _LOGGER.debug("MJPEG viewer fell a full buffer behind; closing it")
+                    break
+                # The transport may keep the data queued after write() returns,
+                # while the ring overwrites the slot; send a copy.
+                await response.write(bytes(view))
+        except ConnectionResetError:
+            _LOGGER.debug("MJPEG viewer disconnected")
+        finally:
+            self.unsubscribe(subscriber)
+        return response
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot for diagnostics."""
+        return {
+            "connected": self.connected,
+            "subscribers": len(self._subscribers),
+            "upstream_connections": self.upstream_connections,
+            "upstream_errors": self.upstream_errors,
+            "last_error": self.last_error,
+            "bytes_received": self.bytes_received,
+            "frames_received": self.frames_received,
+            "frames_discarded": self.frames_discarded,
+            "frames_sent": self.frames_sent
+            + sum(subscriber.frames for subscriber in self._subscribers),
+            "frames_dropped": self.frames_dropped
+            + sum(subscriber.dropped for subscriber in self._subscribers),
+            "seconds_since_last_frame": (
+                round(time.monotonic() - self.last_frame_at, 1)
+                if self.last_frame_at is not None
+                else None
+            ),
+            "snapshots": self.snapshots,
+            "snapshots_from_memory": self.snapshots_cached,
+            "buffered_frames": len(self.ring),
+            "buffer_bytes": self.ring.capacity,
+        }
@@ -58,6 +58,7 @@ class FlashforgeExtruderTemperatureNumber(FlashforgeEntity, NumberEntity):
     _attr_native_max_value = MAX_EXTRUDER_TEMP
     _attr_native_step = 1.0
     _attr_icon = "mdi:thermometer-lines" # Or mdi:printer-3d-nozzle-outline
+    _data_keys = frozenset({f"{API_ATTR_DETAIL}.{API_ATTR_LEFT_TARGET_TEMP}"})
 
     def __init__(self, coordinator: FlashforgeDataUpdateCoordinator) -> None:
         """Initialize the number entity."""
@@ -102,6 +103,7 @@ class FlashforgeBedTemperatureNumber(FlashforgeEntity, NumberEntity):
     _attr_native_max_value = MAX_BED_TEMP
     _attr_native_step = 1.0
     _attr_icon = "mdi:thermometer-lines" # Or mdi:texture
+    _data_keys = frozenset({f"{API_ATTR_DETAIL}.{API_ATTR_PLAT_TARGET_TEMP}"})
 
     def __init__(self, coordinator: FlashforgeDataUpdateCoordinator) -> None:
         """Initialize the number entity."""
@@ -149,6 +151,8 @@ class FlashforgeFanSpeedNumber(FlashforgeEntity, NumberEntity):
     # For now, we won't try to read it back from API_ATTR_COOLING_FAN_SPEED (which is RPM).
     # The state will reflect the last value set via Home Assistant.
     _attr_assumed_state = True
+    # Nothing is read from the coordinator; only availability changes are written.
+    _data_keys = frozenset()
 
     def __init__(self, coordinator: FlashforgeDataUpdateCoordinator) -> None:
         """Initialize the number entity."""
@@ -0,0 +1,86 @@
+"""Round-trip time estimation for adaptive request timeouts.
+
+Keeps a smoothed round-trip time (SRTT) and its mean deviation (RTTVAR) per
+printer endpoint, like TCP's retransmission timer (RFC 6298), and derives the
+request timeout from them: SRTT + 4 * RTTVAR, within fixed bounds. A timeout
+doubles the value until the next successful sample. A window of recent
+samples also provides latency percentiles, used to decide when a request is
+slow enough to be hedged.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Optional
+
+# RFC 6298 gains and variance multiplier
+ALPHA = 1 / 8
+BETA = 1 / 4
+K = 4
+CLOCK_GRANULARITY = 0.01  # seconds; lower bound of the variance term
+
+DEFAULT_MIN_TIMEOUT = 1.0  # seconds
+DEFAULT_MAX_TIMEOUT = 30.0  # seconds
+SAMPLE_WINDOW = 50  # recent samples kept for percentiles
+
+
+class RttEstimator:
+    """Smoothed RTT and variance of one endpoint, and the timeout derived from them."""
+
+    def __init__(
+        self,
+        initial_timeout: float,
+        min_timeout: float = DEFAULT_MIN_TIMEOUT,
+        max_timeout: float = DEFAULT_MAX_TIMEOUT,
+    ) -> None:
+        """Initialize an estimator that uses initial_timeout until the first sample."""
+        self._min_timeout = min_timeout
+        self._max_timeout = max_timeout
+        self.srtt: Optional[float] = None
+        self.rttvar: Optional[float] = None
+        self.timeout = initial_timeout
+        self.sample_count = 0
+        self.timeout_count = 0
+        self._samples: deque[float] = deque(maxlen=SAMPLE_WINDOW)
+
+    def observe(self, seconds: float) -> None:
+        """Record the round-trip time of a request that completed."""
+        if self.srtt is None or self.rttvar is None:
+            self.srtt = seconds
+            self.rttvar = seconds / 2
+        else:
+            self.rttvar = (1 - BETA) * self.rttvar + BETA * abs(self.srtt - seconds)
+            self.srtt = (1 - ALPHA) * self.srtt + ALPHA * seconds
+        self.timeout = self._clamp(self.srtt + max(CLOCK_GRANULARITY, K * self.rttvar))
+        self.sample_count += 1
+        self._samples.append(seconds)
+
+    def on_timeout(self) -> None:
+        """Back off after a timeout: double the timeout until the next sample."""
+        self.timeout_count += 1
+        self.timeout = self._clamp(self.timeout * 2)
+
+    def percentile(self, fraction: float, min_samples: int = 1) -> Optional[float]:
+        """Return a percentile (0..1) of the recent samples, or None if too few."""
+        if len(self._samples) < max(1, min_samples):
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def _clamp(self, value: float) -> float:
+        return min(self._max_timeout, max(self._min_timeout, value))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot for diagnostics."""
+        return {
+            "srtt_ms": _ms(self.srtt),
+            "rttvar_ms": _ms(self.rttvar),
+            "timeout_ms": _ms(self.timeout),
+            "p95_ms": _ms(self.percentile(0.95)),
+            "samples": self.sample_count,
+            "timeouts": self.timeout_count,
+        }
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return round(value * 1000, 1) if value is not None else None
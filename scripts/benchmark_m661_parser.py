@@ -0,0 +1,110 @@
+"""Micro-benchmark of the M661 file list parser.
+
+Compares the framed bytes parser in file_list.py with the previous
+string-based parser (decode with errors="ignore", split on the mangled
+separator, filter each path character by character). No printer or Home
+Assistant install is needed; the listing is generated locally.
+
+    python scripts/benchmark_m661_parser.py --files 50 200 1000
+"""
+
+import argparse
+import importlib.util
+import pathlib
+import sys
+import timeit
+
+# Load file_list.py on its own so the integration package (and Home
+# Assistant) does not have to be importable.
+_FILE_LIST_PATH = pathlib.Path(__file__).resolve().parent.parent / "file_list.py"
+_spec = importlib.util.spec_from_file_location("file_list", _FILE_LIST_PATH)
+file_list = importlib.util.module_from_spec(_spec)
+sys.modules["file_list"] = file_list
+_spec.loader.exec_module(file_list)
+
+
+def build_listing(file_count: int) -> bytes:
+    """Build a raw M661 reply with a mix of printable and other files."""
+    paths = []
+    for index in range(file_count):
+        if index % 5 == 4:
+            paths.append(f"/data/user/filament_config/profile_{index}.txt")
+        else:
+            paths.append(f"/data/user/models/part_{index:04d}_0.2mm_PLA.gcode")
+    entries = b"".join(
+        file_list.M661_ENTRY_MARKER + len(raw).to_bytes(4, "big") + raw
+        for raw in (path.encode("utf-8") for path in paths)
+    )
+    return (
+        b"CMD M661 Received.\r\nok\r\n"
+        + file_list.M661_HEADER
+        + len(paths).to_bytes(4, "big")
+        + entries
+    )
+
+
+def legacy_parse(response: bytes) -> list[str]:
+    """The string-based parser this benchmark measures against."""
+    payload_str = response.decode("utf-8", errors="ignore").strip()
+    prefix_to_strip = "CMD M661 Received.\r\nok\r\n"
+    if payload_str.startswith(prefix_to_strip):
+        payload_str = payload_str[len(prefix_to_strip) :]
+    files_list = []
+    for part in payload_str.split("::\x00\x00\x00"):
+        path_start_index = part.find("/data/")
+        if path_start_index != -1:
+            cleaned_path = "".join(
+                filter(lambda x: x.isprintable(), part[path_start_index:])
+            ).strip()
+            if cleaned_path.startswith("/data/") and cleaned_path.endswith(
+                (".gcode", ".gx")
+            ):
+                files_list.append(cleaned_path)
+    return files_list
+
+
+def run(file_counts: list[int], repeat: int) -> None:
+    print(f"{'files':>6} {'legacy (us)':>12} {'framed (us)':>12} {'speedup':>8}")
+    for count in file_counts:
+        listing = build_listing(count)
+        # Both parsers must agree before their speed is worth comparing.
+        # (The legacy one only recovers these paths because it re-finds
+        # '/data/' in every part and drops the non-printable length bytes.)
+        if (legacy_parse(listing), True) != file_list.parse_file_listing(listing):
+            raise SystemExit(f"Parsers disagree for {count} files")
+
+        number = max(1, 20000 // count)
+        legacy = min(
+            timeit.repeat(lambda: legacy_parse(listing), number=number, repeat=repeat)
+        )
+        framed = min(
+            timeit.repeat(
+                lambda: file_list.parse_file_listing(listing),
+                number=number,
+                repeat=repeat,
+            )
+        )
+        print(
+            f"{count:>6} {legacy / number * 1e6:>12.1f} {framed / number * 1e6:>12.1f} "
+            f"{legacy / framed:>7.1f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the M661 file list parser")
+    parser.add_argument(
+        "--files",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000],
+        help="Listing sizes (number of files) to benchmark",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Timing repetitions per size"
+    )
+    args = parser.parse_args()
+    run(args.files, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
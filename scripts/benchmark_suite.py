@@ -0,0 +1,361 @@
+"""Benchmark suite for the poll cycle, M-code parsers and entity fan-out.
+
+Covers:
+
+- poll.*: one coordinator _fetch_data call end to end against the printer
+  simulator (scripts/printer_simulator.py), in the default tiered mode, with
+  every TCP probe due, and in concurrent probe mode
+- parse.*: the M661 (10/100/1000 files), M114, M119 and M420 reply parsers
+- validate.*: _validate_response on Pro and non-Pro /detail replies
+- fanout.*: pushing one coordinator update through every sensor,
+  binary_sensor, number, select, button and camera entity, with all data
+  changed and with nothing changed. Entity state writes are counted instead
+  of reaching a Home Assistant state machine, so only the integration's own
+  work is measured.
+
+Each benchmark reports the median and 95th percentile time per operation.
+Save a baseline once, then compare later runs against it; a benchmark whose
+median is more than --threshold slower than its baseline is a regression and
+makes the script exit with status 1. Baselines depend on the machine, so they
+are kept locally in .benchmarks/ (git-ignored).
+
+Needs Home Assistant (the integration is imported as a package) and aiohttp.
+
+    python scripts/benchmark_suite.py --save-baseline
+    python scripts/benchmark_suite.py --threshold 0.2
+    python scripts/benchmark_suite.py --only parse. validate.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import pathlib
+import statistics
+import sys
+import tempfile
+import time
+import types
+from typing import Any, Awaitable, Callable, Optional
+
+from printer_simulator import (
+    VARIANT_NON_PRO,
+    PrinterSimulator,
+    SimulatedPrinter,
+    SimulatorConfig,
+    build_file_listing,
+)
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = REPO_ROOT / ".benchmarks" / "baseline.json"
+DEFAULT_THRESHOLD = 0.25  # fraction a median may grow before it is a regression
+PACKAGE = "flashforge_adventurer5m"
+ROUND_MIN_SECONDS = 0.005  # sync benchmarks repeat the call until a round is this long
+PLATFORMS = ("sensor", "binary_sensor", "number", "select", "button", "camera")
+
+
+def load_integration() -> types.ModuleType:
+    """Import the repository as the integration package, whatever its directory is called."""
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE, REPO_ROOT / "__init__.py", submodule_search_locations=[str(REPO_ROOT)]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE] = package
+    spec.loader.exec_module(package)
+    return package
+
+
+def time_sync(func: Callable[[], Any], rounds: int) -> list[float]:
+    """Return per-call durations (seconds) of `rounds` timed batches of calls."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - started >= ROUND_MIN_SECONDS or number >= 1 << 16:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number)
+    return samples
+
+
+async def time_async(func: Callable[[], Awaitable[Any]], rounds: int) -> list[float]:
+    """Return the durations (seconds) of `rounds` awaited calls, after a warm-up call."""
+    await func()
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Return median and p95 in microseconds."""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "median_us": round(statistics.median(ordered) * 1e6, 2),
+        "p95_us": round(p95 * 1e6, 2),
+        "rounds": len(ordered),
+    }
+
+
+class BenchmarkSuite:
+    """Sets up the simulator, a coordinator and all entities, then runs the benchmarks."""
+
+    def __init__(self, rounds: int, selected: Optional[list[str]]) -> None:
+        """Initialize the suite; selected holds name prefixes (None runs all)."""
+        self.rounds = rounds
+        self.selected = selected
+        self.results: dict[str, dict[str, float]] = {}
+        self.integration = load_integration()
+        self.coordinator_module = sys.modules[f"{PACKAGE}.coordinator"]
+
+    def _wanted(self, name: str) -> bool:
+        return self.selected is None or any(
+            name.startswith(prefix) for prefix in self.selected
+        )
+
+    def _record(self, name: str, samples: list[float]) -> None:
+        self.results[name] = summarize(samples)
+        result = self.results[name]
+        print(f"{name:<32} {result['median_us']:>12.1f} {result['p95_us']:>12.1f}")
+
+    async def run(self) -> dict[str, dict[str, float]]:
+        from homeassistant.core import HomeAssistant
+
+        print(f"{'benchmark':<32} {'median (us)':>12} {'p95 (us)':>12}")
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass = HomeAssistant(config_dir)
+            simulator = PrinterSimulator(
+                SimulatorConfig(
+                    http_port=0, mcode_port=0, camera_port=0, file_count=100
+                )
+            )
+            await simulator.start()
+            # The coordinator always uses the printer's standard ports; point
+            # it at the simulator's ephemeral ones instead.
+            self.coordinator_module.DEFAULT_PORT = simulator.config.http_port
+            self.coordinator_module.DEFAULT_MCODE_PORT = simulator.config.mcode_port
+            coordinator = self.coordinator_module.FlashforgeDataUpdateCoordinator(
+                hass,
+                simulator.config.host,
+                simulator.config.serial_number,
+                simulator.config.check_code,
+            )
+            try:
+                # The first refresh only fetches /detail; the second adds the probes.
+                await coordinator.async_refresh()
+                await coordinator.async_refresh()
+                await self._run_poll_benchmarks(coordinator)
+                self._run_parser_benchmarks(coordinator, simulator.printer)
+                await self._run_fanout_benchmarks(hass, coordinator)
+            finally:
+                await coordinator.async_close()
+                await simulator.stop()
+        return self.results
+
+    async def _run_poll_benchmarks(self, coordinator) -> None:
+        probes = self.coordinator_module.PROBE_REFRESH_INTERVALS
+
+        async def fetch_all_probes():
+            coordinator.request_tcp_probe(*probes)
+            await coordinator._fetch_data()
+
+        benchmarks = {
+            "poll.fetch_data": coordinator._fetch_data,
+            "poll.fetch_data_all_probes": fetch_all_probes,
+        }
+        for name, func in benchmarks.items():
+            if self._wanted(name):
+                self._record(name, await time_async(func, self.rounds))
+
+        if self._wanted("poll.fetch_data_concurrent"):
+            coordinator.concurrent_probes = True
+            try:
+                self._record(
+                    "poll.fetch_data_concurrent",
+                    await time_async(fetch_all_probes, self.rounds),
+                )
+            finally:
+                coordinator.concurrent_probes = False
+
+    def _run_parser_benchmarks(self, coordinator, printer: SimulatedPrinter) -> None:
+        decode_response = sys.modules[f"{PACKAGE}.flashforge_tcp"].decode_response
+        benchmarks: dict[str, Callable[[], Any]] = {}
+        for count in (10, 100, 1000):
+            listing = b"CMD M661 Received.\r\nok\r\n" + build_file_listing(
+                [
+                    f"/data/user/model_{index:04d}_0.2mm_PLA.gcode"
+                    for index in range(count)
+                ]
+            )
+            benchmarks[f"parse.m661_{count}"] = (
+                lambda listing=listing: coordinator._parse_printable_files_list(
+                    True, listing
+                )
+            )
+        replies = {
+            code: decode_response(printer.handle_command(f"~{code}"))
+            for code in ("M114", "M119", "M420")
+        }
+        benchmarks["parse.m114"] = lambda: coordinator._parse_coordinates(
+            True, replies["M114"]
+        )
+        benchmarks["parse.m119"] = lambda: coordinator._parse_endstop_status(
+            True, replies["M119"]
+        )
+        benchmarks["parse.m420"] = lambda: coordinator._parse_bed_leveling_status(
+            True, replies["M420"]
+        )
+
+        pro_reply = {"code": 0, "message": "Success", "detail": printer.detail()}
+        non_pro_printer = SimulatedPrinter(SimulatorConfig(variant=VARIANT_NON_PRO))
+        non_pro_reply = {
+            "code": 0,
+            "message": "Success",
+            "detail": non_pro_printer.detail(),
+        }
+        benchmarks["validate.pro"] = lambda: coordinator._validate_response(pro_reply)
+        benchmarks["validate.nonpro"] = lambda: coordinator._validate_response(
+            non_pro_reply
+        )
+
+        for name, func in benchmarks.items():
+            if self._wanted(name):
+                self._record(name, time_sync(func, self.rounds))
+
+    async def _run_fanout_benchmarks(self, hass, coordinator) -> None:
+        if not self._wanted("fanout."):
+            return
+        entry = types.SimpleNamespace(entry_id="benchmark", data={}, options={})
+        hass.data.setdefault(self.integration.DOMAIN, {})[entry.entry_id] = coordinator
+        entities = []
+
+        def add_entities(new_entities, update_before_add=False):
+            entities.extend(new_entities)
+
+        for platform in PLATFORMS:
+            module = importlib.import_module(f"{PACKAGE}.{platform}")
+            await module.async_setup_entry(hass, entry, add_entities)
+
+        writes = 0
+
+        def count_write():
+            nonlocal writes
+            writes += 1
+
+        # No refresh may be scheduled by adding listeners while benchmarking.
+        coordinator.update_interval = None
+        for entity in entities:
+            entity.async_write_ha_state = count_write
+            coordinator.async_add_listener(entity._handle_coordinator_update)
+        print(f"  ({len(entities)} entities)")
+
+        def push(changed_keys):
+            coordinator.changed_keys = changed_keys
+            coordinator.async_update_listeners()
+
+        for name, changed_keys in (
+            ("fanout.all_changed", None),
+            ("fanout.nothing_changed", frozenset()),
+        ):
+            if self._wanted(name):
+                self._record(name, time_sync(lambda: push(changed_keys), self.rounds))
+                writes = 0
+                push(changed_keys)
+                print(f"  ({writes} state writes per update)")
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """Print each result against its baseline and return the regressed names."""
+    regressions = []
+    print(f"\n{'benchmark':<32} {'baseline (us)':>14} {'now (us)':>12} {'change':>8}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:<32} {'-':>14} {result['median_us']:>12.1f} {'new':>8}")
+            continue
+        change = result["median_us"] / base["median_us"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<32} {base['median_us']:>14.1f} {result['median_us']:>12.1f} "
+            f"{change:>+7.0%}{flag}"
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the poll cycle, parsers and entity fan-out"
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=30, help="Timed rounds per benchmark"
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        metavar="PREFIX",
+        help="Run benchmarks with these name prefixes",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=pathlib.Path,
+        default=DEFAULT_BASELINE,
+        help="Baseline file to compare against or save to",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store these results as the new baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed median slowdown before a regression is reported (0.25 = 25%%)",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    results = asyncio.run(BenchmarkSuite(args.rounds, args.only).run())
+
+    if args.save_baseline:
+        baseline = {}
+        if args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text())
+        baseline.update(results)
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first.")
+        return
+    regressions = compare(
+        results, json.loads(args.baseline.read_text()), args.threshold
+    )
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        sys.exit(1)
+    print(f"\nNo regressions above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,642 @@
+"""Local Flashforge Adventurer 5M simulator for development and benchmarks.
+
+Serves the three interfaces the integration talks to:
+
+- HTTP POST /detail (port 8898) with the status JSON, and /uploadGcode for
+  multipart file uploads
+- M-codes over TCP (port 8899), including the binary M661 file listing
+- an MJPEG stream and snapshot (port 8080, /?action=stream, /?action=snapshot)
+
+The simulated printer heats up, prints and cools down over time, so sensors
+and state transitions can be exercised without hardware. Latency, jitter,
+the firmware variant (Pro or non-Pro) and whether pipelined M-codes are
+answered are configurable. Only aiohttp is needed (see requirements_test.txt).
+
+    python scripts/printer_simulator.py --variant pro --files 200 --speed 10
+
+Pass 0 as a port to bind an ephemeral one. The simulator can also be started
+from other scripts:
+
+    simulator = PrinterSimulator(SimulatorConfig(http_port=0, mcode_port=0))
+    await simulator.start()
+    ...
+    await simulator.stop()
+"""
+
+import argparse
+import asyncio
+import base64
+import dataclasses
+import json
+import math
+import random
+import time
+from typing import Optional
+
+from aiohttp import web
+
+HTTP_PORT = 8898
+MCODE_PORT = 8899
+CAMERA_PORT = 8080
+
+VARIANT_PRO = "pro"
+VARIANT_NON_PRO = "nonpro"
+
+AMBIENT_TEMP = 25.0
+NOZZLE_TIME_CONSTANT = 15.0  # seconds to cover ~63% of the way to the target
+BED_TIME_CONSTANT = 40.0
+CHAMBER_TIME_CONSTANT = 300.0
+TEMP_TOLERANCE = 5.0  # printing starts once both heaters are this close
+PRINT_NOZZLE_TEMP = 220
+PRINT_BED_TEMP = 60
+LAYER_HEIGHT = 0.2
+BED_SIZE = 220.0
+
+M661_HEADER = b"D\xaa\xaaD"
+M661_ENTRY_MARKER = b"::\xa3\xa3"
+
+# 16x16 grey baseline JPEG; a comment segment with the frame number is added
+# to every frame so consecutive frames differ.
+_FRAME_JPEG = base64.b64decode(
+    "/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDABALDA4MChAODQ4SERATGCgaGBYWGDEjJR0oOjM9"
+    "PDkzODdASFxOQERXRTc4UG1RV19iZ2hnPk1xeXBkeFxlZ2P/2wBDARESEhgVGC8aGi9jQjhC"
+    "Y2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2P/wAAR"
+    "CAAQABADASIAAhEBAxEB/8QAHwAAAQUBAQEBAQEAAAAAAAAAAAECAwQFBgcICQoL/8QAtRAA"
+    "AgEDAwIEAwUFBAQAAAF9AQIDAAQRBRIhMUEGE1FhByJxFDKBkaEII0KxwRVS0fAkM2JyggkK"
+    "FhcYGRolJicoKSo0NTY3ODk6Q0RFRkdISUpTVFVWV1hZWmNkZWZnaGlqc3R1dnd4eXqDhIWG"
+    "h4iJipKTlJWWl5iZmqKjpKWmp6ipqrKztLW2t7i5usLDxMXGx8jJytLT1NXW19jZ2uHi4+Tl"
+    "5ufo6erx8vP09fb3+Pn6/8QAHwEAAwEBAQEBAQEBAQAAAAAAAAECAwQFBgcICQoL/8QAtREA"
+    "AgECBAQDBAcFBAQAAQJ3AAECAxEEBSExBhJBUQdhcRMiMoEIFEKRobHBCSMzUvAVYnLRChYk"
+    "NOEl8RcYGRomJygpKjU2Nzg5OkNERUZHSElKU1RVVldYWVpjZGVmZ2hpanN0dXZ3eHl6goOE"
+    "hYaHiImKkpOUlZaXmJmaoqOkpaanqKmqsrO0tba3uLm6wsPExcbHyMnK0tPU1dbX2Nna4uPk"
+    "5ebn6Onq8vP09fb3+Pn6/9oADAMBAAIRAxEAPwDk6KKKAP/Z"
+)
+MJPEG_BOUNDARY = "boundarydonotcross"
+
+
+@dataclasses.dataclass
+class SimulatorConfig:
+    """Settings of one simulated printer."""
+
+    host: str = "127.0.0.1"
+    http_port: int = HTTP_PORT
+    mcode_port: int = MCODE_PORT
+    camera_port: int = CAMERA_PORT
+    variant: str = VARIANT_PRO
+    serial_number: str = "SNADVA5M000001"
+    check_code: str = "12345678"
+    file_count: int = 20
+    print_seconds: float = 1800.0  # printing time of a job once heated
+    speed: float = 1.0  # simulated seconds per real second
+    latency: float = 0.0  # seconds added before every reply
+    jitter: float = 0.0  # up to this many extra seconds, uniformly random
+    pipelining: bool = True  # answer every command of a multi-command write
+    # Send binary payloads (the M661 listing) in a separate write this many
+    # seconds after the 'ok' line, as the real printer may; 0 sends them at once
+    payload_delay: float = 0.0
+    fps: float = 10.0  # MJPEG frames per second
+
+
+def _approach(current: float, target: float, elapsed: float, tau: float) -> float:
+    """Move a temperature toward its target as a first-order system."""
+    return target + (current - target) * math.exp(-elapsed / tau)
+
+
+def _data_path(path: str) -> str:
+    """Map an M-code file argument ('0:/user/x.gcode') to the listing path."""
+    if path.startswith("0:/"):
+        path = path[2:]
+    return path if path.startswith("/data/") else "/data" + path
+
+
+def build_file_listing(paths: list[str]) -> bytes:
+    """Build the binary M661 payload (sent after the 'ok' line)."""
+    entries = b"".join(
+        M661_ENTRY_MARKER + len(raw).to_bytes(4, "big") + raw
+        for raw in (path.encode("utf-8") for path in paths)
+    )
+    return M661_HEADER + len(paths).to_bytes(4, "big") + entries
+
+
+class SimulatedPrinter:
+    """State of the simulated printer, advanced on every request."""
+
+    def __init__(self, config: SimulatorConfig) -> None:
+        """Initialize an idle, cold printer."""
+        self.config = config
+        self.status = "READY"
+        self.error_code = ""
+        self.nozzle_temp = self.bed_temp = self.chamber_temp = AMBIENT_TEMP
+        self.nozzle_target = self.bed_target = 0.0
+        self.position = {"X": 0.0, "Y": 0.0, "Z": 0.0}
+        self.relative = False
+        self.light_on = True
+        self.fan_speed = 0
+        self.bed_leveling = True
+        self.print_speed = 100
+        self.flow = 100
+        self.print_file = ""
+        self.progress = 0.0
+        self.print_duration = 0.0
+        self.target_layers = 0
+        self.disk_space = 8.0  # GB
+        self.files: dict[str, float] = {}  # path -> size in GB
+        for index in range(config.file_count):
+            extension = ".gx" if index % 4 == 3 else ".gcode"
+            name = "Würfel" if index == 1 else f"model_{index:03d}"
+            self.files[f"/data/user/{name}{extension}"] = 0.002 + index % 7 * 0.001
+        self.disk_space -= sum(self.files.values())
+        self._clock = time.monotonic()
+
+    @property
+    def is_pro(self) -> bool:
+        """Return True for the Pro variant (chamber sensors, door, camera)."""
+        return self.config.variant == VARIANT_PRO
+
+    def advance(self) -> None:
+        """Advance temperatures and print progress to the current time."""
+        now = time.monotonic()
+        elapsed = (now - self._clock) * self.config.speed
+        self._clock = now
+        if elapsed <= 0:
+            return
+
+        nozzle_target = self.nozzle_target or AMBIENT_TEMP
+        bed_target = self.bed_target or AMBIENT_TEMP
+        self.nozzle_temp = _approach(
+            self.nozzle_temp, nozzle_target, elapsed, NOZZLE_TIME_CONSTANT
+        )
+        self.bed_temp = _approach(self.bed_temp, bed_target, elapsed, BED_TIME_CONSTANT)
+        # The heated bed warms the enclosure a little
+        self.chamber_temp = _approach(
+            self.chamber_temp,
+            AMBIENT_TEMP + (self.bed_temp - AMBIENT_TEMP) * 0.2,
+            elapsed,
+            CHAMBER_TIME_CONSTANT,
+        )
+
+        if self.status != "BUILDING":
+            return
+        self.print_duration += elapsed
+        heated = (
+            abs(self.nozzle_temp - nozzle_target) <= TEMP_TOLERANCE
+            and abs(self.bed_temp - bed_target) <= TEMP_TOLERANCE
+        )
+        if not heated:
+            return
+        self.progress = min(1.0, self.progress + elapsed / self.config.print_seconds)
+        self.position["Z"] = round(self.layer * LAYER_HEIGHT, 2)
+        self.position["X"] = round(BED_SIZE / 2 + 40 * math.sin(self.progress * 500), 2)
+        self.position["Y"] = round(BED_SIZE / 2 + 40 * math.cos(self.progress * 500), 2)
+        if self.progress >= 1.0:
+            self.status = "COMPLETED"
+            self.nozzle_target = self.bed_target = 0.0
+            self.fan_speed = 0
+
+    @property
+    def layer(self) -> int:
+        """Return the layer being printed."""
+        return math.ceil(self.progress * self.target_layers)
+
+    def detail(self) -> dict:
+        """Return the 'detail' object of the /detail response."""
+        remaining = 0
+        if self.status in ("BUILDING", "PAUSED"):
+            remaining = round((1.0 - self.progress) * self.config.print_seconds)
+        detail = {
+            "autoShutdown": "close",
+            "autoShutdownTime": 30,
+            "coolingFanSpeed": self.fan_speed,
+            "cumulativeFilament": 1234.5,
+            "cumulativePrintTime": 5678,
+            "currentPrintSpeed": self.print_speed,
+            "errorCode": self.error_code,
+            "estimatedLeftLen": round(remaining * 0.9, 1),
+            "estimatedLeftWeight": round(remaining * 0.003, 1),
+            "estimatedRightLen": 0,
+            "estimatedRightWeight": 0,
+            "estimatedTime": remaining,
+            "externalFanStatus": "open" if self.fan_speed else "close",
+            "fillAmount": 15,
+            "firmwareVersion": "v3.1.3",
+            "flashRegisterCode": "SIMFLASH",
+            "ipAddr": self.config.host,
+            "leftFilamentType": "PLA",
+            "leftTargetTemp": self.nozzle_target,
+            "leftTemp": round(self.nozzle_temp, 1),
+            "lightStatus": "open" if self.light_on else "close",
+            "location": "Simulator",
+            "macAddr": "88:A9:A7:00:00:01",
+            "measure": "220X220X220",
+            "name": "Adventurer 5M Pro" if self.is_pro else "Adventurer 5M",
+            "nozzleCnt": 1,
+            "nozzleModel": "0.4mm",
+            "nozzleStyle": 0,
+            "pid": 36 if self.is_pro else 35,
+            "platTargetTemp": self.bed_target,
+            "platTemp": round(self.bed_temp, 1),
+            "polarRegisterCode": "SIMPOLAR",
+            "printDuration": round(self.print_duration),
+            "printFileName": self.print_file,
+            "printLayer": self.layer,
+            "printProgress": round(self.progress, 4),
+            "printSpeedAdjust": self.print_speed,
+            "remainingDiskSpace": round(self.disk_space, 2),
+            "rightFilamentType": "",
+            "rightTargetTemp": 0,
+            "rightTemp": 0,
+            "status": self.status,
+            "targetPrintLayer": self.target_layers,
+            "zAxisCompensation": 0,
+        }
+        if self.is_pro:
+            detail.update(
+                {
+                    "cameraStreamUrl": (
+                        f"http://{self.config.host}:{self.config.camera_port}"
+                        "/?action=stream"
+                    ),
+                    "chamberFanSpeed": 100 if self.status == "BUILDING" else 0,
+                    "chamberTargetTemp": 0,
+                    "chamberTemp": round(self.chamber_temp, 1),
+                    "doorStatus": "close",
+                    "internalFanStatus": (
+                        "open" if self.status == "BUILDING" else "close"
+                    ),
+                    "tvoc": 2 if self.status == "BUILDING" else 0,
+                }
+            )
+        return detail
+
+    def handle_command(self, command: str) -> bytes:
+        """Apply one M-code and return the printer's reply."""
+        return b"".join(self.handle_command_parts(command))
+
+    def handle_command_parts(self, command: str) -> tuple[bytes, bytes]:
+        """Apply one M-code and return its reply up to 'ok' and the binary payload after it."""
+        parts = command.lstrip("~").split()
+        code = parts[0].upper()
+        argument = command.lstrip("~")[len(parts[0]) :].strip()
+        params: dict[str, float] = {}
+        for part in parts[1:]:
+            try:
+                params[part[0].upper()] = float(part[1:])
+            except (ValueError, IndexError):
+                pass
+
+        self.advance()
+        body = b""
+        payload = b""
+        if code == "M114":
+            x, y, z = (self.position[axis] for axis in "XYZ")
+            body = f"X:{x:.2f} Y:{y:.2f} Z:{z:.2f} A:0 B:0\r\n".encode()
+        elif code == "M119":
+            z_min = "TRIGGERED" if self.position["Z"] <= 0 else "open"
+            body = (
+                f"x_min:open\r\ny_min:open\r\nz_min:{z_min}\r\nfilament:open\r\n"
+            ).encode()
+        elif code == "M420":
+            if "S" in params:
+                self.bed_leveling = bool(params["S"])
+            body = (
+                f"Bed leveling is {'ON' if self.bed_leveling else 'OFF'}\r\n".encode()
+            )
+        elif code == "M115":
+            model = "Flashforge Adventurer 5M" + (" Pro" if self.is_pro else "")
+            body = (
+                f"Machine Type: {model}\r\nMachine Name: Simulator\r\n"
+                f"Firmware: v3.1.3\r\nSN: {self.config.serial_number}\r\n"
+                "X: 220 Y: 220 Z: 220\r\nTool Count: 1\r\n"
+                "Mac Address:88:A9:A7:00:00:01\r\n"
+            ).encode()
+        elif code == "M661":
+            payload = build_file_listing(list(self.files))
+        elif code == "M20":
+            body = "".join(f"{path}\r\n" for path in self.files).encode()
+        elif code == "M23":
+            path = _data_path(argument)
+            if path not in self.files or self.status in ("BUILDING", "PAUSED"):
+                return (
+                    self._reply(code, b"Error: cannot start print\r\n", ok=False),
+                    b"",
+                )
+            self._start_print(path)
+        elif code == "M24" and self.status == "PAUSED":
+            self.status = "BUILDING"
+        elif code == "M25" and self.status == "BUILDING":
+            self.status = "PAUSED"
+        elif code == "M26":
+            self.status = "READY"
+            self.print_file = ""
+            self.progress = 0.0
+            self.nozzle_target = self.bed_target = 0.0
+        elif code == "M30":
+            path = _data_path(argument)
+            if path in self.files:
+                self.disk_space += self.files.pop(path)
+        elif code == "M104":
+            self.nozzle_target = params.get("S", 0.0)
+        elif code == "M140":
+            self.bed_target = params.get("S", 0.0)
+        elif code == "M106":
+            self.fan_speed = int(params.get("S", 255))
+        elif code == "M107":
+            self.fan_speed = 0
+        elif code == "M146":
+            self.light_on = any(params.get(key, 0) for key in "RGB")
+        elif code == "M220":
+            self.print_speed = int(params.get("S", 100))
+        elif code == "M221":
+            self.flow = int(params.get("S", 100))
+        elif code == "M112":
+            self.status = "ERROR"
+            self.error_code = "E0001"
+            self.nozzle_target = self.bed_target = 0.0
+        elif code == "M999":
+            self.status = "READY"
+            self.error_code = ""
+        elif code == "G28":
+            for axis in [axis for axis in "XYZ" if axis in params] or "XYZ":
+                self.position[axis] = 0.0
+        elif code == "G29":
+            self.bed_leveling = True
+        elif code == "G90":
+            self.relative = False
+        elif code == "G91":
+            self.relative = True
+        elif code in ("G0", "G1"):
+            for axis in "XYZ":
+                if axis in params:
+                    base = self.position[axis] if self.relative else 0.0
+                    self.position[axis] = round(
+                        min(BED_SIZE, max(0.0, base + params[axis])), 2
+                    )
+        return self._reply(code, body), payload
+
+    def _start_print(self, path: str) -> None:
+        self.status = "BUILDING"
+        self.error_code = ""
+        self.print_file = path.rsplit("/", 1)[-1]
+        self.progress = 0.0
+        self.print_duration = 0.0
+        self.target_layers = 120
+        self.nozzle_target = PRINT_NOZZLE_TEMP
+        self.bed_target = PRINT_BED_TEMP
+        self.fan_speed = 255
+
+    @staticmethod
+    def _reply(code: str, body: bytes, ok: bool = True) -> bytes:
+        return f"CMD {code} Received.\r\n".encode() + body + (b"ok\r\n" if ok else b"")
+
+
+class PrinterSimulator:
+    """Runs the HTTP, M-code and camera servers of one simulated printer."""
+
+    def __init__(self, config: Optional[SimulatorConfig] = None) -> None:
+        """Initialize the simulator; call start() to begin serving."""
+        self.config = config or SimulatorConfig()
+        self.printer = SimulatedPrinter(self.config)
+        self.http_requests = 0
+        self.mcode_commands = 0
+        self._runners: list[web.AppRunner] = []
+        self._mcode_server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """Start serving. Ports given as 0 are replaced by the bound ones."""
+        config = self.config
+        detail_app = web.Application()
+        detail_app.router.add_post("/detail", self._handle_detail)
+        detail_app.router.add_post("/uploadGcode", self._handle_upload)
+        config.http_port = await self._start_app(detail_app, config.http_port)
+
+        self._mcode_server = await asyncio.start_server(
+            self._handle_mcode_client, config.host, config.mcode_port
+        )
+        config.mcode_port = self._mcode_server.sockets[0].getsockname()[1]
+
+        if self.printer.is_pro:
+            camera_app = web.Application()
+            camera_app.router.add_get("/", self._handle_camera)
+            config.camera_port = await self._start_app(camera_app, config.camera_port)
+
+    async def stop(self) -> None:
+        """Stop all servers."""
+        if self._mcode_server:
+            self._mcode_server.close()
+            await self._mcode_server.wait_closed()
+            self._mcode_server = None
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners.clear()
+
+    async def _start_app(self, app: web.Application, port: int) -> int:
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, self.config.host, port).start()
+        self._runners.append(runner)
+        return runner.addresses[0][1]
+
+    async def _delay(self) -> None:
+        delay = self.config.latency + random.uniform(0, self.config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _handle_detail(self, request: web.Request) -> web.Response:
+        self.http_requests += 1
+        try:
+            credentials = json.loads(await request.read())
+        except ValueError:
+            credentials = {}
+        await self._delay()
+        if (
+            credentials.get("serialNumber") != self.config.serial_number
+            or credentials.get("checkCode") != self.config.check_code
+        ):
+            return web.json_response({"code": 1, "message": "Check code error"})
+        self.printer.advance()
+        return web.json_response(
+            {"code": 0, "message": "Success", "detail": self.printer.detail()}
+        )
+
+    async def _handle_upload(self, request: web.Request) -> web.Response:
+        self.http_requests += 1
+        if (
+            request.headers.get("serialNumber") != self.config.serial_number
+            or request.headers.get("checkCode") != self.config.check_code
+        ):
+            return web.json_response({"code": 1, "message": "Check code error"})
+        name, size = None, 0
+        try:
+            reader = await request.multipart()
+            async for part in reader:
+                if part.name == "gcodeFile":
+                    name = part.filename
+                    while chunk := await part.read_chunk():
+                        size += len(chunk)
+        except ConnectionResetError:
+            # Aborted by the client: like the printer, discard the partial file.
+            return web.Response(status=400)
+        await self._delay()
+        if not name or str(size) != request.headers.get("fileSize"):
+            return web.json_response({"code": 1, "message": "Upload incomplete"})
+        path = f"/data/user/{name}"
+        self.printer.disk_space += self.printer.files.get(path, 0.0)
+        self.printer.files[path] = size / 1e9
+        self.printer.disk_space -= size / 1e9
+        return web.json_response({"code": 0, "message": "Success"})
+
+    async def _handle_mcode_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        buffer = b""
+        try:
+            while True:
+                chunk = await reader.read(4096)
+                if not chunk:
+                    break
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                commands = [
+                    line.decode("utf-8", errors="replace").strip() for line in lines
+                ]
+                commands = [command for command in commands if command.startswith("~")]
+                if not self.config.pipelining:
+                    # Firmware that reads one command per packet drops the rest
+                    commands = commands[:1]
+                for command in commands:
+                    self.mcode_commands += 1
+                    await self._delay()
+                    reply, payload = self.printer.handle_command_parts(command)
+                    if payload and self.config.payload_delay:
+                        writer.write(reply)
+                        await writer.drain()
+                        await asyncio.sleep(self.config.payload_delay)
+                        reply = b""
+                    writer.write(reply + payload)
+                    await writer.drain()
+        except (ConnectionResetError, BrokenPipeError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_camera(self, request: web.Request) -> web.StreamResponse:
+        action = request.query.get("action", "stream")
+        if action == "snapshot":
+            await self._delay()
+            return web.Response(body=self._frame(0), content_type="image/jpeg")
+        if action != "stream":
+            raise web.HTTPNotFound()
+
+        response = web.StreamResponse(
+            headers={
+                "Content-Type": f"multipart/x-mixed-replace;boundary={MJPEG_BOUNDARY}"
+            }
+        )
+        await response.prepare(request)
+        frame_number = 0
+        try:
+            while True:
+                frame = self._frame(frame_number)
+                await response.write(
+                    f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(frame)}\r\n\r\n".encode() + frame + b"\r\n"
+                )
+                frame_number += 1
+                await asyncio.sleep(1 / self.config.fps)
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        return response
+
+    @staticmethod
+    def _frame(number: int) -> bytes:
+        """Return the JPEG frame with its number in a comment (COM) segment."""
+        comment = f"frame {number}".encode()
+        segment = b"\xff\xfe" + (len(comment) + 2).to_bytes(2, "big") + comment
+        return _FRAME_JPEG[:2] + segment + _FRAME_JPEG[2:]
+
+
+async def serve(config: SimulatorConfig) -> None:
+    simulator = PrinterSimulator(config)
+    await simulator.start()
+    print(
+        f"Simulating an Adventurer 5M ({config.variant}) on {config.host}: "
+        f"HTTP {config.http_port}, M-code {config.mcode_port}"
+        + (f", camera {config.camera_port}" if simulator.printer.is_pro else "")
+    )
+    print(f"Serial number {config.serial_number}, check code {config.check_code}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Simulate a Flashforge Adventurer 5M on the local network"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind")
+    parser.add_argument("--http-port", type=int, default=HTTP_PORT)
+    parser.add_argument("--mcode-port", type=int, default=MCODE_PORT)
+    parser.add_argument("--camera-port", type=int, default=CAMERA_PORT)
+    parser.add_argument(
+        "--variant", choices=[VARIANT_PRO, VARIANT_NON_PRO], default=VARIANT_PRO
+    )
+    parser.add_argument("--serial", default=SimulatorConfig.serial_number)
+    parser.add_argument("--check-code", default=SimulatorConfig.check_code)
+    parser.add_argument(
+        "--files", type=int, default=20, help="Number of files on the printer"
+    )
+    parser.add_argument(
+        "--print-seconds",
+        type=float,
+        default=1800.0,
+        help="Printing time of a job once the heaters are at temperature",
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="Simulated seconds per real second"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to every reply"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Random extra latency, in seconds"
+    )
+    parser.add_argument(
+        "--no-pipelining",
+        action="store_true",
+        help="Answer only the first of several M-codes sent in one write",
+    )
+    parser.add_argument(
+        "--payload-delay",
+        type=float,
+        default=0.0,
+        help="Seconds between the 'ok' line and the M661 listing, sent separately",
+    )
+    parser.add_argument("--fps", type=float, default=10.0, help="MJPEG frame rate")
+    args = parser.parse_args()
+
+    config = SimulatorConfig(
+        host=args.host,
+        http_port=args.http_port,
+        mcode_port=args.mcode_port,
+        camera_port=args.camera_port,
+        variant=args.variant,
+        serial_number=args.serial,
+        check_code=args.check_code,
+        file_count=args.files,
+        print_seconds=args.print_seconds,
+        speed=args.speed,
+        latency=args.latency,
+        jitter=args.jitter,
+        pipelining=not args.no_pipelining,
+        payload_delay=args.payload_delay,
+        fps=args.fps,
+    )
+    try:
+        asyncio.run(serve(config))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 """Select platform for Flashforge Adventurer 5M PRO integration."""
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
@@ -15,6 +15,7 @@ from .const import (
     API_ATTR_PRINT_FILE_NAME,
     PRINTING_STATES,
     API_ATTR_DETAIL,
+    DATA_KEY_FILE_ANALYSIS,
 )
 from .coordinator import FlashforgeDataUpdateCoordinator
 from .entity import FlashforgeEntity
@@ -39,12 +40,22 @@ async def async_setup_entry(
 class FlashforgePrintFileSelect(FlashforgeEntity, SelectEntity):
     """Representation of a Select entity for choosing a file to print."""
 
+    _data_keys = frozenset(
+        {
+            "printable_files",
+            f"{API_ATTR_DETAIL}.{API_ATTR_STATUS}",
+            f"{API_ATTR_DETAIL}.{API_ATTR_PRINT_FILE_NAME}",
+            DATA_KEY_FILE_ANALYSIS,
+        }
+    )
+
     def __init__(self, coordinator: FlashforgeDataUpdateCoordinator) -> None:
         """Initialize the select entity."""
         super().__init__(coordinator, name_suffix="Print File", unique_id_key="print_file_select")
         self._attr_icon: str = "mdi:file-document-outline" # Using a more generic file icon
         self._attr_options: List[str] = []
         self._attr_current_option: Optional[str] = None
+        self._attr_extra_state_attributes: Dict[str, Any] = {}
         self._update_attributes_from_coordinator() # Initial update
 
     @callback
@@ -58,6 +69,17 @@ class FlashforgePrintFileSelect(FlashforgeEntity, SelectEntity):
         if self.coordinator.data:
             # Update options (list of printable files)
             self._attr_options = self.coordinator.data.get("printable_files", [])
+            # Estimates (and whether there is a preview) of files uploaded or analysed here
+            estimates = {}
+            for option_path in self._attr_options:
+                analysis = self.coordinator.gcode_analyses.for_path(option_path)
+                if analysis is not None:
+                    thumbnail = self.coordinator.thumbnails.for_path(option_path)
+                    estimates[option_path] = {
+                        **analysis.summary(),
+                        "preview": thumbnail.content_type if thumbnail else None,
+                    }
+            self._attr_extra_state_attributes = {"file_estimates": estimates}
 
             # Update current_option
             detail_data = self.coordinator.data.get(API_ATTR_DETAIL, {})
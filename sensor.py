@@ -13,14 +13,15 @@ from homeassistant.const import (
     UnitOfSpeed,
     UnitOfTime,
     UnitOfInformation,
+    UnitOfDataRate,
     PERCENTAGE,
     REVOLUTIONS_PER_MINUTE,
     CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from typing import Dict, Any  # Import Dict and Any for type hinting
-from .const import DOMAIN
+from .const import API_ATTR_DETAIL, DOMAIN
 from .coordinator import FlashforgeDataUpdateCoordinator
 from .entity import FlashforgeEntity
 
@@ -348,6 +349,10 @@ async def async_setup_entry(
         else:
             _LOGGER.debug(f"Skipping sensor {attribute_key}, no data found.")
 
+    # Upload sensors exist before the first upload; they show nothing until then.
+    sensors_to_add.append(FlashforgeUploadProgressSensor(coordinator))
+    sensors_to_add.append(FlashforgeUploadThroughputSensor(coordinator))
+
     if sensors_to_add:
         async_add_entities(sensors_to_add)
 
@@ -377,10 +382,15 @@ class FlashforgeSensor(FlashforgeEntity, SensorEntity):
         self._attr_suggested_unit_of_measurement = PERCENTAGE if is_percentage else unit
         self._attr_extra_state_attributes: Dict[str, Any] = {}
         self._attr_native_value: Any = None
+        self._data_keys = frozenset(
+            {attribute_key if is_top_level else f"{API_ATTR_DETAIL}.{attribute_key}"}
+        )
 
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
         self._attr_available = self.coordinator.last_update_success
+        if not self._should_write_state():
+            return
         raw_value = None
         if self.coordinator.data:
             if self._is_top_level:
@@ -416,3 +426,68 @@ class FlashforgeSensor(FlashforgeEntity, SensorEntity):
     def native_value(self) -> Any:
         """Return the sensor value."""
         return self._attr_native_value
+
+
+class FlashforgeUploadSensor(FlashforgeEntity, SensorEntity):
+    """Base for sensors showing the latest file upload (upload_file service)."""
+
+    # Updated by the upload listener below; polls only change availability.
+    _data_keys = frozenset()
+
+    def __init__(
+        self, coordinator: FlashforgeDataUpdateCoordinator, name: str, key: str
+    ) -> None:
+        super().__init__(coordinator, name_suffix=name, unique_id_key=key)
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to upload progress as well as coordinator updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_upload_listener(self._handle_upload_progress)
+        )
+
+    @callback
+    def _handle_upload_progress(self) -> None:
+        self.async_write_ha_state()
+
+
+class FlashforgeUploadProgressSensor(FlashforgeUploadSensor):
+    """Share of the latest upload sent so far, with its details as attributes."""
+
+    _attr_icon = "mdi:upload"
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator: FlashforgeDataUpdateCoordinator) -> None:
+        super().__init__(coordinator, "Upload Progress", "upload_progress")
+
+    @property
+    def native_value(self) -> Any:
+        """Return the upload progress in percent."""
+        progress = self.coordinator.upload_progress
+        return progress.percent if progress else None
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the file, state, byte counts, checksum and error of the upload."""
+        progress = self.coordinator.upload_progress
+        return progress.as_dict() if progress else {}
+
+
+class FlashforgeUploadThroughputSensor(FlashforgeUploadSensor):
+    """Average throughput of the latest upload."""
+
+    _attr_icon = "mdi:speedometer"
+    _attr_device_class = SensorDeviceClass.DATA_RATE
+    _attr_native_unit_of_measurement = UnitOfDataRate.KILOBYTES_PER_SECOND
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator: FlashforgeDataUpdateCoordinator) -> None:
+        super().__init__(coordinator, "Upload Throughput", "upload_throughput")
+
+    @property
+    def native_value(self) -> Any:
+        """Return the upload's average throughput so far."""
+        progress = self.coordinator.upload_progress
+        rate = progress.bytes_per_second if progress else None
+        return round(rate / 1000, 1) if rate else None
@@ -0,0 +1,166 @@
+"""Preview images embedded in .gx and sliced .gcode files.
+
+- .gx files carry a bitmap between their header and the G-code (see
+  gx_file.py);
+- slicers such as PrusaSlicer, OrcaSlicer and Cura write base64 blocks
+  ('; thumbnail begin 300x300 12345' ... '; thumbnail end') into the
+  comments at the top of .gcode files. The largest PNG or JPEG is used.
+
+Only the start of a file is read, never the G-code itself. Decoded images
+are cached by file content hash with a cap on their total size, so each
+file is decoded once and entities never touch the disk.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import posixpath
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .gx_file import GX_HEADER_SIZE, parse_gx_header
+
+# Bytes read from the start of a .gcode file when looking for thumbnails
+HEADER_READ_LIMIT = 1024 * 1024
+
+_THUMBNAIL_BLOCK = re.compile(
+    rb"^; ?thumbnail(?:_(?:PNG|JPG|QOI))? begin (\d+)x(\d+) \d+\r?\n(.*?)^; ?thumbnail(?:_\w+)? end",
+    re.MULTILINE | re.DOTALL,
+)
+_CONTENT_TYPES = {
+    b"\x89PNG": "image/png",
+    b"\xff\xd8\xff": "image/jpeg",
+    b"BM": "image/bmp",
+}
+
+
+@dataclass(frozen=True)
+class Thumbnail:
+    """A decoded preview image."""
+
+    content_type: str
+    data: bytes
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+def _content_type(data: bytes) -> Optional[str]:
+    for magic, content_type in _CONTENT_TYPES.items():
+        if data.startswith(magic):
+            return content_type
+    return None
+
+
+def _from_gcode_comments(header: bytes) -> Optional[Thumbnail]:
+    best: Optional[Thumbnail] = None
+    for match in _THUMBNAIL_BLOCK.finditer(header):
+        width, height = int(match.group(1)), int(match.group(2))
+        if best is not None and width * height <= (best.width or 0) * (
+            best.height or 0
+        ):
+            continue
+        encoded = b"".join(
+            line.lstrip(b"; ").strip() for line in match.group(3).splitlines()
+        )
+        try:
+            data = base64.b64decode(encoded, validate=True)
+        except (binascii.Error, ValueError):
+            continue
+        content_type = _content_type(data)
+        # QOI and other formats browsers cannot show are skipped.
+        if content_type in ("image/png", "image/jpeg"):
+            best = Thumbnail(content_type, data, width, height)
+    return best
+
+
+def extract_thumbnail(path: str) -> Optional[Thumbnail]:
+    """Read the preview image of a local .gx or .gcode file (run in the executor)."""
+    with open(path, "rb") as handle:
+        head = handle.read(GX_HEADER_SIZE)
+        gx_header = parse_gx_header(head)
+        if gx_header is not None:
+            handle.seek(gx_header.thumbnail_offset)
+            data = handle.read(gx_header.thumbnail_size)
+            if _content_type(data) != "image/bmp":
+                return None
+            width = int.from_bytes(data[18:22], "little", signed=True)
+            height = abs(int.from_bytes(data[22:26], "little", signed=True))
+            return Thumbnail("image/bmp", data, width, height)
+        return _from_gcode_comments(head + handle.read(HEADER_READ_LIMIT - len(head)))
+
+
+def _describe(thumbnail: Optional[Thumbnail]) -> Optional[dict[str, Any]]:
+    if thumbnail is None:
+        return None
+    return {
+        "content_type": thumbnail.content_type,
+        "width": thumbnail.width,
+        "height": thumbnail.height,
+        "bytes": len(thumbnail.data),
+    }
+
+
+class ThumbnailCache:
+    """LRU cache of thumbnails by content hash, plus the hash of each printer file."""
+
+    def __init__(self, max_bytes: int) -> None:
+        """Initialize an empty cache holding up to max_bytes of image data."""
+        self._max_bytes = max_bytes
+        self._size = 0
+        # MD5 -> thumbnail; None records a file without one, so it is not read again
+        self._thumbnails: OrderedDict[str, Optional[Thumbnail]] = OrderedDict()
+        # Printer path -> MD5 of the local file it was uploaded or analysed from
+        self._paths: dict[str, str] = {}
+        self.latest_path: Optional[str] = None
+
+    def __contains__(self, md5: object) -> bool:
+        return md5 in self._thumbnails
+
+    def put(self, md5: str, thumbnail: Optional[Thumbnail]) -> None:
+        """Cache the thumbnail of a content hash (None if the file has none)."""
+        previous = self._thumbnails.pop(md5, None)
+        if previous is not None:
+            self._size -= len(previous.data)
+        self._thumbnails[md5] = thumbnail
+        if thumbnail is not None:
+            self._size += len(thumbnail.data)
+        while self._size > self._max_bytes and len(self._thumbnails) > 1:
+            _, evicted = self._thumbnails.popitem(last=False)
+            if evicted is not None:
+                self._size -= len(evicted.data)
+
+    def link(self, printer_path: str, md5: str) -> None:
+        """Record that a printer file has the content with this hash."""
+        self._paths[printer_path] = md5
+        self.latest_path = printer_path
+
+    def for_path(self, printer_path: str) -> Optional[Thumbnail]:
+        """Return the thumbnail of a printer file, if known and still cached."""
+        md5 = self._paths.get(printer_path)
+        if md5 is None or md5 not in self._thumbnails:
+            return None
+        self._thumbnails.move_to_end(md5)
+        return self._thumbnails[md5]
+
+    def path_for_name(self, file_name: str) -> Optional[str]:
+        """Return the known printer path of a file name (as in printFileName)."""
+        name = posixpath.basename(file_name)
+        for printer_path in self._paths:
+            if posixpath.basename(printer_path) == name:
+                return printer_path
+        return None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot for diagnostics."""
+        return {
+            "bytes": self._size,
+            "max_bytes": self._max_bytes,
+            "files": {
+                printer_path: _describe(self._thumbnails[md5])
+                for printer_path, md5 in self._paths.items()
+                if md5 in self._thumbnails
+            },
+        }
@@ -0,0 +1,256 @@
+"""Layer-triggered timelapse recording.
+
+While a print runs, one frame is taken per layer (printLayer in /detail
+changes) or every N seconds, and appended to an MJPEG file: the JPEG frames
+back to back, which ffmpeg and VLC play as they are. When the print ends, an
+index of the frames (offset, length, time and layer) is written next to it
+as JSON, so players and scripts can seek without scanning the file.
+
+Frames come from the shared camera connection (see mjpeg_proxy.py), so
+recording never opens a connection of its own. A single background task
+takes and writes one frame at a time, with file access in the executor.
+Layers that change while a frame is still being written are skipped rather
+than queued, which keeps memory use at one frame however long the print.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import posixpath
+import re
+import time
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from .mjpeg_proxy import MjpegProxy
+
+_LOGGER = logging.getLogger(__name__)
+
+TIMELAPSE_EXTENSION = ".mjpeg"
+TIMELAPSE_INDEX_EXTENSION = ".json"
+
+_UNSAFE_NAME_CHARACTERS = re.compile(r"[^\w.-]+")
+
+
+def recording_name(print_file: Optional[str], started: datetime) -> str:
+    """Return the file name (without extension) of a recording."""
+    stem = posixpath.splitext(posixpath.basename(print_file or ""))[0]
+    stem = _UNSAFE_NAME_CHARACTERS.sub("_", stem).strip("_") or "print"
+    return f"{started:%Y%m%d-%H%M%S}_{stem}"
+
+
+class TimelapseWriter:
+    """Append-only MJPEG file plus its index; every method runs in the executor."""
+
+    def __init__(self, path: str, print_file: Optional[str]) -> None:
+        """Initialize a writer for path; nothing is opened yet."""
+        self.path = path
+        self.index_path = os.path.splitext(path)[0] + TIMELAPSE_INDEX_EXTENSION
+        self._print_file = print_file
+        self._handle = None
+        self.size = 0
+        # Index columns, one entry per frame
+        self.offsets: list[int] = []
+        self.lengths: list[int] = []
+        self.times: list[float] = []
+        self.layers: list[Optional[int]] = []
+
+    def open(self) -> None:
+        """Create the directory and open the file for appending."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._handle = open(self.path, "ab")
+        self.size = self._handle.tell()
+
+    def write(self, image: bytes, timestamp: float, layer: Optional[int]) -> None:
+        """Append one JPEG frame and record it in the index."""
+        self._handle.write(image)
+        self._handle.flush()
+        self.offsets.append(self.size)
+        self.lengths.append(len(image))
+        self.times.append(round(timestamp, 3))
+        self.layers.append(layer)
+        self.size += len(image)
+
+    def close(self) -> None:
+        """Close the file and write the index (replacing it atomically)."""
+        if self._handle is None:
+            return
+        self._handle.close()
+        self._handle = None
+        index = {
+            "version": 1,
+            "video": os.path.basename(self.path),
+            "print_file": self._print_file,
+            "content_type": "image/jpeg",
+            "frames": len(self.offsets),
+            "bytes": self.size,
+            "offsets": self.offsets,
+            "lengths": self.lengths,
+            "times": self.times,
+            "layers": self.layers,
+        }
+        temporary = self.index_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(index, handle, separators=(",", ":"))
+        os.replace(temporary, self.index_path)
+
+
+class TimelapseRecorder:
+    """Starts, feeds and finishes a recording from the printer status of each poll."""
+
+    def __init__(
+        self,
+        proxy: MjpegProxy,
+        run_in_executor: Callable[..., Any],
+        directory: str,
+        interval: float,
+        snapshot_max_age: float,
+        snapshot_timeout: float,
+    ) -> None:
+        """Initialize the recorder; interval 0 takes one frame per layer."""
+        self._proxy = proxy
+        self._run_in_executor = run_in_executor
+        self._directory = directory
+        self._interval = interval
+        self._snapshot_max_age = snapshot_max_age
+        self._snapshot_timeout = snapshot_timeout
+        self._task: Optional[asyncio.Task] = None
+        # Set when a frame is due (per layer mode) and when the recording ends
+        self._wake = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._writer: Optional[TimelapseWriter] = None
+        self._paused = False
+        self._layer: Optional[int] = None
+        self._last_sequence = 0
+        self.frames_skipped = 0
+        self.frames_missed = 0
+        self.last_recording: Optional[dict[str, Any]] = None
+
+    @property
+    def recording(self) -> bool:
+        """True while a recording is open."""
+        return self._task is not None
+
+    def update(
+        self, printing: bool, paused: bool, layer: Any, print_file: Optional[str]
+    ) -> None:
+        """Follow the printer status of a poll: start, feed, pause or finish the recording."""
+        if not printing and not paused:
+            if self._task is not None:
+                self._finish()
+            return
+        try:
+            layer = int(layer)
+        except (TypeError, ValueError):
+            layer = None
+        if self._task is None:
+            if not printing:
+                # Paused prints are only continued, not started
+                return
+            self._start(print_file)
+        self._paused = paused
+        if layer is not None and layer != self._layer:
+            self._layer = layer
+            if not self._interval and not paused:
+                if self._wake.is_set():
+                    # The previous layer's frame was not taken yet
+                    self.frames_skipped += 1
+                self._wake.set()
+
+    def _start(self, print_file: Optional[str]) -> None:
+        name = recording_name(print_file, datetime.now())
+        self._writer = TimelapseWriter(
+            os.path.join(self._directory, name + TIMELAPSE_EXTENSION), print_file
+        )
+        # A finishing recording keeps its own events; a new print gets new ones.
+        self._wake = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._layer = None
+        _LOGGER.info(f"Timelapse recording started: {self._writer.path}")
+        self._task = asyncio.get_running_loop().create_task(
+            self._run(self._writer, self._wake, self._stop)
+        )
+
+    def _finish(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._task = None
+
+    async def async_close(self) -> None:
+        """Finish an open recording and wait for its index to be written."""
+        task = self._task
+        if task is None:
+            return
+        self._finish()
+        await task
+
+    async def _run(
+        self, writer: TimelapseWriter, wake: asyncio.Event, stop: asyncio.Event
+    ) -> None:
+        """Take and write frames until the recording is finished."""
+        started = time.time()
+        try:
+            await self._run_in_executor(writer.open)
+            while not stop.is_set():
+                if self._interval:
+                    try:
+                        await asyncio.wait_for(wake.wait(), self._interval)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await wake.wait()
+                wake.clear()
+                if stop.is_set():
+                    break
+                if self._paused:
+                    continue
+                await self._capture(writer)
+        except OSError as err:
+            _LOGGER.error(f"Timelapse recording to {writer.path} failed: {err}")
+        finally:
+            try:
+                await self._run_in_executor(writer.close)
+            except OSError as err:
+                _LOGGER.error(
+                    f"Could not write the timelapse index {writer.index_path}: {err}"
+                )
+            self.last_recording = {
+                "file": os.path.basename(writer.path),
+                "frames": len(writer.offsets),
+                "bytes": writer.size,
+                "duration_seconds": round(time.time() - started),
+            }
+            _LOGGER.info(
+                f"Timelapse recording finished: {writer.path} ({len(writer.offsets)} frames)"
+            )
+
+    async def _capture(self, writer: TimelapseWriter) -> None:
+        layer = self._layer
+        # Keep the camera connected until the next frame is due at least
+        snapshot = await self._proxy.async_snapshot(
+            self._snapshot_max_age,
+            self._snapshot_timeout,
+            max(self._interval, self._snapshot_timeout),
+        )
+        if snapshot is None or snapshot[0] == self._last_sequence:
+            # No frame, or the camera stalled on the one already written
+            self.frames_missed += 1
+            return
+        self._last_sequence, image = snapshot
+        await self._run_in_executor(writer.write, image, time.time(), layer)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot for diagnostics."""
+        writer = self._writer if self._task is not None else None
+        return {
+            "mode": f"every {self._interval:g} s" if self._interval else "per layer",
+            "recording": os.path.basename(writer.path) if writer else None,
+            "frames": len(writer.offsets) if writer else None,
+            "bytes": writer.size if writer else None,
+            "frames_skipped": self.frames_skipped,
+            "frames_missed": self.frames_missed,
+            "last_recording": self.last_recording,
+        }